@@ -0,0 +1,157 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "color_message", "sample_rate",
+}
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Parse per-module levels such as "email_outbox=DEBUG,pymongo=WARNING" """
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, `extra=` fields and exception text"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every record at INFO and above; keep DEBUG records with probability `sample_rate`
+
+    A call site can override the rate for one high-volume event with
+    `logger.debug(..., extra={"sample_rate": 0.01})`.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        if random.random() < getattr(record, "sample_rate", self.sample_rate):
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later) but leave all formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class QueueLogging:
+    """Log records are enqueued on the caller's thread and formatted/written by a QueueListener thread
+
+    Handlers on the event loop only copy the record and put it on a queue, so slow
+    stdout/stderr or JSON encoding never blocks request handling.
+    """
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        json_output: bool = True,
+        module_levels: Optional[Dict[str, str]] = None,
+        debug_sample_rate: float = 1.0,
+        stream: Optional[TextIO] = None,
+    ):
+        self.level = level.upper()
+        self.module_levels = module_levels or {}
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.sampler = SamplingFilter(debug_sample_rate)
+        self.handler = _QueueHandler(self.queue)
+        self.handler.addFilter(self.sampler)
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JSONFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+        self.listener = QueueListener(self.queue, output, respect_handler_level=True)
+        self._lock = threading.Lock()
+        self._running = False
+
+    def install(self, root: Optional[logging.Logger] = None):
+        """Route `root` (the root logger by default) through the queue and apply per-module levels"""
+        root = root or logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        for name, level in self.module_levels.items():
+            logging.getLogger(name).setLevel(level)
+
+    def capture(self, names: Iterable[str]):
+        """Send loggers that were configured with their own handlers (e.g. uvicorn's) through the queue too"""
+        for name in names:
+            target = logging.getLogger(name)
+            for handler in list(target.handlers):
+                target.removeHandler(handler)
+            target.propagate = True
+
+    def start(self):
+        with self._lock:
+            if not self._running:
+                self.listener.start()
+                self._running = True
+
+    def stop(self):
+        """Flush queued records and stop the listener thread (safe to call more than once)"""
+        with self._lock:
+            if self._running:
+                self.listener.stop()
+                self._running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": self.queue.qsize(),
+            "debug_sampled_out": self.sampler.sampled_out,
+        }
+
+
+def configure_logging(**kwargs) -> QueueLogging:
+    """Install queue-based logging on the root logger and start its listener"""
+    pipeline = QueueLogging(**kwargs)
+    pipeline.install()
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    return pipeline
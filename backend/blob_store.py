@@ -0,0 +1,177 @@
+import abc
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+# Blob keys are "<sha256 hex>.<extension>", e.g. "9f86d0...0a08.png"
+BLOB_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,8}$")
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_key(data: bytes, content_type: str) -> str:
+    """Content-addressed key for a blob"""
+    extension = (mimetypes.guess_extension(content_type) or ".bin").lstrip(".")
+    return f"{hashlib.sha256(data).hexdigest()}.{extension}"
+
+def blob_content_type(key: str) -> str:
+    """Content type implied by a blob key's extension"""
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+def blob_url(key: str) -> str:
+    """Relative URL the API serves a blob from"""
+    return f"/api/blobs/{key}"
+
+def is_valid_blob_key(key: str) -> bool:
+    return bool(BLOB_KEY_PATTERN.match(key))
+
+def blob_key_from_url(url: Optional[str]) -> Optional[str]:
+    """Key of a blob URL produced by blob_url, or None for anything else"""
+    prefix = blob_url("")
+    if not url or not url.startswith(prefix) or not is_valid_blob_key(url[len(prefix):]):
+        return None
+    return url[len(prefix):]
+
+
+class BlobRecords:
+    """Who may read each blob, recorded when it is stored
+
+    Identical content shares a key and therefore a record: a blob is private once any
+    private upload produced it, and every uploader of that content is an owner.
+    Blobs without a record (stored before records existed) are treated as private
+    to admins until migrate_blobs.py backfills them.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def record(self, key: str, private: bool, owner_id: Optional[str] = None):
+        update = {"$setOnInsert": {"created_at": datetime.utcnow()}}
+        if private:
+            update["$set"] = {"private": True}
+            if owner_id:
+                update["$addToSet"] = {"owner_ids": owner_id}
+        else:
+            update["$setOnInsert"]["private"] = False
+        await self.db.blob_records.update_one({"_id": key}, update, upsert=True)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await self.db.blob_records.find_one({"_id": key})
+
+
+def is_public_blob(record: Optional[dict]) -> bool:
+    return record is not None and not record.get("private")
+
+def can_read_blob(record: Optional[dict], user: dict) -> bool:
+    """Whether an authenticated user may read a blob with this record"""
+    if is_public_blob(record) or user.get("role") == "admin":
+        return True
+    return record is not None and user["id"] in record.get("owner_ids", [])
+
+
+class BlobStore(abc.ABC):
+    """Content-addressed storage for uploaded images; identical content is stored once"""
+
+    @abc.abstractmethod
+    async def put(self, data: bytes, content_type: str) -> str:
+        """Store bytes and return their key"""
+
+    @abc.abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Size in bytes, or None when the blob does not exist"""
+
+    @abc.abstractmethod
+    def stream(self, key: str) -> AsyncIterator[bytes]:
+        """Iterate over the blob's bytes in chunks"""
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem, sharded by the first hash bytes"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        key = blob_key(data, content_type)
+        await asyncio.to_thread(self._write, key, data)
+        return key
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return (await asyncio.to_thread(self._path(key).stat)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        handle = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(handle.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            handle.close()
+
+
+class GridFSBlobStore(BlobStore):
+    """Blob store in MongoDB GridFS, for deployments without a shared filesystem"""
+
+    def __init__(self, db, bucket_name: str = "blobs"):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+        self.db = db
+        self.bucket_name = bucket_name
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+
+    async def _find(self, key: str) -> Optional[dict]:
+        return await self.db[f"{self.bucket_name}.files"].find_one({"filename": key})
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        key = blob_key(data, content_type)
+        if await self._find(key) is None:
+            await self.bucket.upload_from_stream(key, data, metadata={"contentType": content_type})
+        return key
+
+    async def size(self, key: str) -> Optional[int]:
+        file_doc = await self._find(key)
+        return file_doc["length"] if file_doc else None
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream_by_name(key)
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+
+
+def create_blob_store(backend: str, db=None, root: Optional[Path] = None) -> BlobStore:
+    """Build the configured blob store ("local" or "gridfs")"""
+    if backend == "gridfs":
+        return GridFSBlobStore(db)
+    if backend == "local":
+        return LocalBlobStore(root)
+    raise ValueError(f"Unknown blob store backend: {backend}")
@@ -0,0 +1,182 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+BOOKING_CREATED = "created"
+PAYMENT_PROOF_UPLOADED = "payment_proof_uploaded"
+STATUS_CHANGED = "status_changed"
+
+# Upper bounds (seconds) of the time-to-approval histogram; the last bucket is open-ended
+APPROVAL_LATENCY_BUCKETS: Sequence[float] = (
+    60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400, 2 * 86400, 7 * 86400, float("inf"),
+)
+APPROVAL_LATENCY_ID = "approval_latency"
+SYSTEM_ACTOR = "system"
+
+
+def histogram_percentile(counts: Sequence[int], bounds: Sequence[float], q: float) -> Optional[float]:
+    """Estimate the q-quantile from bucket counts, interpolating linearly inside the bucket"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen, lower = 0, 0.0
+    for count, upper in zip(counts, bounds):
+        if count and seen + count >= rank:
+            if upper == float("inf"):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        lower = upper
+    return lower
+
+
+class BookingEventLog:
+    """Append-only history of booking changes, plus counters derived from it as it is written
+
+    Every creation, payment proof upload and status transition becomes one
+    `booking_events` document, never updated afterwards. Approval latency is kept
+    as a histogram and admin throughput as per-admin daily counters in
+    `booking_analytics`, both updated with `$inc` so analytics never rescan bookings.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _event(self, booking: dict, event_type: str, actor_id: Optional[str], **fields) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "booking_id": booking["id"],
+            "event_id": booking.get("event_id"),
+            "type": event_type,
+            "actor_id": actor_id or SYSTEM_ACTOR,
+            "at": datetime.utcnow(),
+            **fields,
+        }
+
+    async def _append(self, booking: dict, event_type: str, actor_id: Optional[str], **fields) -> dict:
+        event = self._event(booking, event_type, actor_id, **fields)
+        await self.db.booking_events.insert_one(event)
+        event.pop("_id", None)
+        return event
+
+    async def booking_created(self, booking: dict, actor_id: Optional[str]) -> dict:
+        return await self._append(booking, BOOKING_CREATED, actor_id, to_status=booking.get("status"))
+
+    async def payment_proof_uploaded(self, booking: dict, actor_id: Optional[str],
+                                     payment_proof_url: str, utr_number: str) -> dict:
+        return await self._append(
+            booking, PAYMENT_PROOF_UPLOADED, actor_id,
+            data={"payment_proof_url": payment_proof_url, "utr_number": utr_number},
+        )
+
+    async def status_changed(self, booking: dict, new_status: str, actor_id: Optional[str],
+                             admin_notes: Optional[str] = None) -> dict:
+        """Log a transition of `booking` (as it was before the change) and update the analytics"""
+        return (await self.statuses_changed([booking], new_status, actor_id, admin_notes))[0]
+
+    async def statuses_changed(self, bookings: List[dict], new_status: str, actor_id: Optional[str],
+                               admin_notes: Optional[str] = None) -> List[dict]:
+        """Log the same transition for many bookings with one insert and one update per counter"""
+        events = [
+            self._event(
+                booking, STATUS_CHANGED, actor_id,
+                from_status=booking.get("status"), to_status=new_status,
+                data={"admin_notes": admin_notes} if admin_notes else {},
+            )
+            for booking in bookings
+        ]
+        if not events:
+            return []
+        await self.db.booking_events.insert_many(events)
+        for event in events:
+            event.pop("_id", None)
+        await self._count_transitions(bookings, new_status, events)
+        return events
+
+    async def _count_transitions(self, bookings: List[dict], new_status: str, events: List[dict]):
+        per_day: Dict[str, int] = {}
+        for event in events:
+            day = event["at"].strftime("%Y-%m-%d")
+            per_day[day] = per_day.get(day, 0) + 1
+        actor_id = events[0]["actor_id"]
+        # Transitions made by the system (waitlist promotions) are not admin throughput
+        if actor_id != SYSTEM_ACTOR:
+            for day, count in per_day.items():
+                await self.db.booking_analytics.update_one(
+                    {"_id": f"admin:{actor_id}:{day}"},
+                    {
+                        "$inc": {f"transitions.{new_status}": count, "total": count},
+                        "$set": {"kind": "admin_throughput", "admin_id": actor_id, "day": day},
+                    },
+                    upsert=True,
+                )
+
+        if new_status != "approved":
+            return
+        latencies = [
+            (event["at"] - booking["created_at"]).total_seconds()
+            for booking, event in zip(bookings, events)
+            if booking.get("status") != "approved" and booking.get("created_at")
+        ]
+        if not latencies:
+            return
+        increments: Dict[str, float] = {"count": len(latencies), "sum_seconds": sum(latencies)}
+        for latency in latencies:
+            bucket = next(i for i, bound in enumerate(APPROVAL_LATENCY_BUCKETS) if latency <= bound)
+            increments[f"buckets.{bucket}"] = increments.get(f"buckets.{bucket}", 0) + 1
+        await self.db.booking_analytics.update_one(
+            {"_id": APPROVAL_LATENCY_ID},
+            {
+                "$inc": increments,
+                "$min": {"min_seconds": min(latencies)},
+                "$max": {"max_seconds": max(latencies)},
+            },
+            upsert=True,
+        )
+
+    async def timeline(self, booking_id: str) -> List[dict]:
+        """Every logged event of a booking, oldest first"""
+        # Timestamps are stored with millisecond precision; _id orders events within one
+        events = await self.db.booking_events.find(
+            {"booking_id": booking_id}
+        ).sort([("at", 1), ("_id", 1)]).to_list(None)
+        for event in events:
+            del event["_id"]
+        return events
+
+    async def approval_latency(self) -> Dict[str, Any]:
+        """Time-to-approval distribution estimated from the histogram"""
+        doc = await self.db.booking_analytics.find_one({"_id": APPROVAL_LATENCY_ID}) or {}
+        buckets = doc.get("buckets", {})
+        counts = [buckets.get(str(i), 0) for i in range(len(APPROVAL_LATENCY_BUCKETS))]
+        count = doc.get("count", 0)
+        percentiles = {}
+        for q in (50, 90, 99):
+            estimate = histogram_percentile(counts, APPROVAL_LATENCY_BUCKETS, q / 100)
+            if estimate is not None:
+                # Interpolation can overshoot the observed range when a bucket is sparse
+                estimate = min(max(estimate, doc["min_seconds"]), doc["max_seconds"])
+            percentiles[f"p{q}_seconds"] = estimate
+        return {
+            "count": count,
+            "mean_seconds": doc["sum_seconds"] / count if count else None,
+            "min_seconds": doc.get("min_seconds"),
+            "max_seconds": doc.get("max_seconds"),
+            **percentiles,
+            "buckets": [
+                {"le_seconds": None if bound == float("inf") else bound, "count": bucket_count}
+                for bound, bucket_count in zip(APPROVAL_LATENCY_BUCKETS, counts)
+            ],
+        }
+
+    async def admin_throughput(self, days: int = 30) -> List[dict]:
+        """Transitions per admin over the last `days` days, busiest first"""
+        since = (datetime.utcnow() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        totals: Dict[str, Dict[str, Any]] = {}
+        async for doc in self.db.booking_analytics.find({"kind": "admin_throughput", "day": {"$gte": since}}):
+            admin = totals.setdefault(doc["admin_id"], {"admin_id": doc["admin_id"], "total": 0, "transitions": {}})
+            admin["total"] += doc.get("total", 0)
+            for status, count in doc.get("transitions", {}).items():
+                admin["transitions"][status] = admin["transitions"].get(status, 0) + count
+        return sorted(totals.values(), key=lambda admin: admin["total"], reverse=True)
@@ -0,0 +1,21 @@
+import asyncio
+from typing import Any, Awaitable, List, Optional
+
+
+async def gather_with_timeout(*awaitables: Awaitable, timeout: Optional[float] = None) -> List[Any]:
+    """Run independent awaitables concurrently, each bounded by `timeout` seconds
+
+    Results come back in argument order. If any call fails or times out, the
+    others are cancelled and the first error is raised.
+    """
+    tasks = [
+        asyncio.ensure_future(asyncio.wait_for(aw, timeout) if timeout else aw)
+        for aw in awaitables
+    ]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from concurrency import gather_with_timeout
+
+STATS_ID = "global"
+COUNTER_FIELDS = ("total_users", "total_events", "total_bookings", "approved_revenue")
+COUNTER_MAPS = ("status_counts", "event_revenue")
+RECONCILE_ATTEMPTS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardStats:
+    """Materialized admin dashboard counters kept current with $inc on every write
+
+    A single document in `dashboard_stats` holds totals, per-status booking counts,
+    approved revenue and approved revenue per event. `reconcile()` recomputes it from
+    the source collections to correct any drift (e.g. a crash between a booking write
+    and its counter update). Every write bumps `version`, and reconcile applies its
+    correction as a delta guarded by the version it read, so increments racing with it
+    are never overwritten.
+    """
+
+    def __init__(self, db, reconcile_interval: float = 600.0, query_timeout: Optional[float] = None):
+        self.db = db
+        self.reconcile_interval = reconcile_interval
+        self.query_timeout = query_timeout
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return self.db.dashboard_stats
+
+    async def _inc(self, increments: Dict[str, float]):
+        await self.collection.update_one(
+            {"_id": STATS_ID},
+            {"$inc": {**increments, "version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def user_created(self):
+        await self._inc({"total_users": 1})
+
+    async def event_created(self):
+        await self._inc({"total_events": 1})
+
+    async def booking_created(self, status: str = "pending"):
+        await self._inc({"total_bookings": 1, f"status_counts.{status}": 1})
+
+    async def booking_status_changed(self, event_id: str, amount: float, old_status: str, new_status: str):
+        await self.booking_statuses_changed([(event_id, amount, old_status, new_status)])
+
+    async def booking_statuses_changed(self, changes: Iterable[Tuple[str, float, str, str]]):
+        """Apply many (event_id, amount, old_status, new_status) transitions in one update"""
+        increments: Dict[str, float] = {}
+
+        def add(key: str, value: float):
+            increments[key] = increments.get(key, 0) + value
+
+        for event_id, amount, old_status, new_status in changes:
+            if old_status == new_status:
+                continue
+            add(f"status_counts.{old_status}", -1)
+            add(f"status_counts.{new_status}", 1)
+            if new_status == "approved":
+                add("approved_revenue", amount)
+                add(f"event_revenue.{event_id}", amount)
+            elif old_status == "approved":
+                add("approved_revenue", -amount)
+                add(f"event_revenue.{event_id}", -amount)
+        if increments:
+            await self._inc(increments)
+
+    async def _recompute(self) -> dict:
+        status_rows, revenue_rows, total_users, total_events = await gather_with_timeout(
+            self.db.bookings.aggregate([
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]).to_list(None),
+            self.db.bookings.aggregate([
+                {"$match": {"status": "approved"}},
+                {"$group": {"_id": "$event_id", "revenue": {"$sum": "$amount"}}},
+            ]).to_list(None),
+            self.db.users.count_documents({}),
+            self.db.events.count_documents({}),
+            timeout=self.query_timeout,
+        )
+        status_counts = {row["_id"]: row["count"] for row in status_rows if row["_id"]}
+        event_revenue = {row["_id"]: row["revenue"] for row in revenue_rows if row["_id"]}
+        return {
+            "total_users": total_users,
+            "total_events": total_events,
+            "total_bookings": sum(status_counts.values()),
+            "status_counts": status_counts,
+            "approved_revenue": sum(event_revenue.values()),
+            "event_revenue": event_revenue,
+        }
+
+    @staticmethod
+    def _counters(stats: dict) -> Dict[str, float]:
+        """Counters keyed by their dotted update path"""
+        counters = {field: stats.get(field) or 0 for field in COUNTER_FIELDS}
+        for field in COUNTER_MAPS:
+            for key, value in (stats.get(field) or {}).items():
+                counters[f"{field}.{key}"] = value
+        return counters
+
+    async def reconcile(self) -> dict:
+        """Recompute every counter from the source collections and correct the stored ones"""
+        for _ in range(RECONCILE_ATTEMPTS):
+            observed = await self.collection.find_one({"_id": STATS_ID})
+            stats = await self._recompute()
+            now = datetime.utcnow()
+            if observed is None:
+                try:
+                    await self.collection.insert_one(
+                        {"_id": STATS_ID, **stats, "version": 0, "updated_at": now, "reconciled_at": now}
+                    )
+                except DuplicateKeyError:
+                    continue
+                return await self.collection.find_one({"_id": STATS_ID}, {"_id": 0})
+
+            current, expected = self._counters(observed), self._counters(stats)
+            update = {
+                "$inc": {"version": 1},
+                "$set": {"updated_at": now, "reconciled_at": now},
+            }
+            for key, value in expected.items():
+                if value != current.get(key, 0):
+                    update["$inc"][key] = value - current.get(key, 0)
+            stale = {key: "" for key in current if key not in expected}
+            if stale:
+                update["$unset"] = stale
+            # Matches only if no $inc landed since `observed` was read; otherwise start over
+            result = await self.collection.update_one({"_id": STATS_ID, "version": observed.get("version")}, update)
+            if result.matched_count:
+                return await self.collection.find_one({"_id": STATS_ID}, {"_id": 0})
+
+        logger.warning("Dashboard stats kept changing during reconciliation; retrying next interval")
+        return await self.collection.find_one({"_id": STATS_ID}, {"_id": 0})
+
+    async def read(self) -> dict:
+        """Current counters, bootstrapping them from the collections on first use"""
+        stats = await self.collection.find_one({"_id": STATS_ID}, {"_id": 0})
+        if stats is None or "reconciled_at" not in stats:
+            stats = await self.reconcile()
+        return stats
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Dashboard stats reconciliation failed")
+            await asyncio.sleep(self.reconcile_interval)
+
+    def start(self):
+        """Start the periodic reconciler on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic reconciler"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from smtp_pool import SMTPConnectionPool
+
+# Outbox message states
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_SENT = "sent"
+OUTBOX_DEAD = "dead"
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxWorker:
+    """Drains the Mongo-backed email outbox in the background with retries and dead-lettering"""
+
+    def __init__(
+        self,
+        db,
+        settings_loader: Callable[[], Awaitable[dict]],
+        smtp_pool: Optional[SMTPConnectionPool] = None,
+        batch_size: int = 50,
+        poll_interval: float = 5.0,
+        max_attempts: int = 5,
+        backoff_base: float = 30.0,
+        backoff_max: float = 3600.0,
+        lock_timeout: float = 300.0,
+    ):
+        self.db = db
+        self.settings_loader = settings_loader
+        self.smtp_pool = smtp_pool or SMTPConnectionPool()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock_timeout = lock_timeout
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"enqueued": 0, "sent": 0, "retried": 0, "dead": 0}
+
+    @property
+    def collection(self):
+        return self.db.email_outbox
+
+    def _new_message(self, to_email: str, subject: str, body: str, now: datetime) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "status": OUTBOX_PENDING,
+            "attempts": 0,
+            "last_error": None,
+            "created_at": now,
+            "next_attempt_at": now,
+            "locked_until": None,
+            "sent_at": None,
+        }
+
+    async def enqueue(self, to_email: str, subject: str, body: str) -> str:
+        """Persist an email in the outbox and wake the sender"""
+        message = self._new_message(to_email, subject, body, datetime.utcnow())
+        await self.collection.insert_one(message)
+        self._stats["enqueued"] += 1
+        self._wakeup.set()
+        return message["id"]
+
+    async def enqueue_many(self, messages: List[Tuple[str, str, str]]) -> int:
+        """Persist a batch of (to_email, subject, body) emails with a single insert"""
+        if not messages:
+            return 0
+        now = datetime.utcnow()
+        docs = [self._new_message(to_email, subject, body, now) for to_email, subject, body in messages]
+        await self.collection.insert_many(docs, ordered=False)
+        self._stats["enqueued"] += len(docs)
+        self._wakeup.set()
+        return len(docs)
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait before retry number `attempts`"""
+        return min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": OUTBOX_PENDING, "next_attempt_at": {"$lte": now}},
+                {"status": OUTBOX_SENDING, "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {
+                "status": OUTBOX_SENDING,
+                "locked_until": now + timedelta(seconds=self.lock_timeout),
+            }},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _mark_sent(self, message_ids: List[str]):
+        await self.collection.update_many(
+            {"id": {"$in": message_ids}},
+            {"$set": {"status": OUTBOX_SENT, "sent_at": datetime.utcnow(), "locked_until": None},
+             "$inc": {"attempts": 1}},
+        )
+        self._stats["sent"] += len(message_ids)
+
+    async def _mark_failed(self, message: dict, error: Exception):
+        attempts = message.get("attempts", 0) + 1
+        update: Dict[str, Any] = {"attempts": attempts, "last_error": str(error), "locked_until": None}
+        if attempts >= self.max_attempts:
+            update["status"] = OUTBOX_DEAD
+            update["dead_at"] = datetime.utcnow()
+            self._stats["dead"] += 1
+        else:
+            update["status"] = OUTBOX_PENDING
+            update["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=self.backoff(attempts))
+            self._stats["retried"] += 1
+        await self.collection.update_one({"id": message["id"]}, {"$set": update})
+
+    async def _send_batch(self, batch: List[dict]):
+        try:
+            smtp_settings = await self.settings_loader()
+            errors = await asyncio.to_thread(
+                self.smtp_pool.send_batch,
+                smtp_settings,
+                [(m["to_email"], m["subject"], m["body"]) for m in batch],
+            )
+        except Exception as e:
+            errors = [e] * len(batch)
+        sent_ids = [message["id"] for message, error in zip(batch, errors) if error is None]
+        if sent_ids:
+            await self._mark_sent(sent_ids)
+        for message, error in zip(batch, errors):
+            if error is not None:
+                logger.warning("Email sending failed: %s", error, extra={"message_id": message["id"]})
+                await self._mark_failed(message, error)
+
+    async def drain(self) -> int:
+        """Send every message that is currently due, one SMTP session per batch; returns how many were processed"""
+        processed = 0
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                message = await self._claim()
+                if message is None:
+                    break
+                batch.append(message)
+            if not batch:
+                return processed
+            await self._send_batch(batch)
+            processed += len(batch)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox drain failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the background sender on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background sender"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.smtp_pool.close)
+
+    async def queue_depth(self) -> Dict[str, int]:
+        """Messages waiting for delivery, being sent and dead-lettered"""
+        statuses = (OUTBOX_PENDING, OUTBOX_SENDING, OUTBOX_DEAD)
+        counts = await asyncio.gather(*(self.collection.count_documents({"status": s}) for s in statuses))
+        return dict(zip(statuses, counts))
+
+    def stats(self) -> Dict[str, Any]:
+        """In-process delivery counters"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            **self._stats,
+            "smtp_pool": self.smtp_pool.stats(),
+        }
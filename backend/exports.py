@@ -0,0 +1,74 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+from serialization import dump_json
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# Rows are grouped into chunks of about this size before being written to the socket
+FLUSH_BYTES = 64 * 1024
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dump_json(value).decode()
+    return value
+
+async def ndjson_rows(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """One JSON document per line"""
+    buffer = bytearray()
+    async for doc in docs:
+        buffer += dump_json(doc)
+        buffer += b"\n"
+        if len(buffer) >= FLUSH_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+async def csv_rows(docs: AsyncIterator[dict], columns: List[str]) -> AsyncIterator[bytes]:
+    """A header line followed by one row per document; nested values are JSON-encoded"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    async for doc in docs:
+        writer.writerow([_csv_value(doc.get(column)) for column in columns])
+        if out.tell() >= FLUSH_BYTES:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode()
+
+async def _documents(cursor, transform: Optional[Callable[[dict], dict]]) -> AsyncIterator[dict]:
+    try:
+        async for doc in cursor:
+            yield transform(doc) if transform else doc
+    finally:
+        # Client went away mid-export: release the server-side cursor
+        close = getattr(cursor, "close", None)
+        if close is not None:
+            result = close()
+            if hasattr(result, "__await__"):
+                await result
+
+def export_response(
+    cursor,
+    export_format: str,
+    columns: List[str],
+    filename: str,
+    transform: Optional[Callable[[dict], dict]] = None,
+) -> StreamingResponse:
+    """Stream a Mongo cursor as NDJSON or CSV without holding the result set in memory"""
+    docs = _documents(cursor, transform)
+    rows = csv_rows(docs, columns) if export_format == "csv" else ndjson_rows(docs)
+    headers: Dict[str, str] = {"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    return StreamingResponse(rows, media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers)
@@ -0,0 +1,70 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class FirebaseDisabled(Exception):
+    pass
+
+
+class FirebaseApp:
+    """Firebase Admin SDK app that is imported and initialized on first use
+
+    `firebase_admin` pulls in google-auth, requests and the gRPC/HTTP transports, so
+    importing it at module load costs every worker a noticeable cold start. Nothing is
+    imported until `get()` (or `auth()`) is called, and only when the feature is enabled.
+    Credentials come from a service-account JSON file when `credentials_path` is set,
+    otherwise from `credentials_config`.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        credentials_path: Optional[str] = None,
+        credentials_config: Optional[Dict[str, Any]] = None,
+    ):
+        self.enabled = enabled
+        self.credentials_path = credentials_path
+        self.credentials_config = credentials_config
+        self._app = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _credentials(self) -> Dict[str, Any]:
+        if self.credentials_path:
+            return json.loads(Path(self.credentials_path).read_text())
+        return self.credentials_config or {}
+
+    def get(self):
+        """Return the initialized Firebase app, initializing it on the first call (blocking)"""
+        if not self.enabled:
+            raise FirebaseDisabled("Firebase is disabled (set FIREBASE_ENABLED=true)")
+        if self._app is not None:
+            return self._app
+        with self._lock:
+            if self._app is None:
+                import firebase_admin
+                from firebase_admin import credentials
+
+                try:
+                    self._app = firebase_admin.initialize_app(credentials.Certificate(self._credentials()))
+                    self._error = None
+                except Exception as e:
+                    self._error = str(e)
+                    raise
+        return self._app
+
+    def auth(self):
+        """Return the `firebase_admin.auth` module bound to an initialized app"""
+        self.get()
+        from firebase_admin import auth
+
+        return auth
+
+    @property
+    def initialized(self) -> bool:
+        return self._app is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "initialized": self.initialized, "last_error": self._error}
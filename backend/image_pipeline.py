@@ -0,0 +1,170 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class ImageProfile:
+    """How one upload class is normalised before storage"""
+    format: str
+    content_type: str
+    max_dimension: int
+    quality: Optional[int] = None
+
+
+# QR codes must stay lossless to remain scannable; payment proofs are photos/screenshots
+IMAGE_PROFILES: Dict[str, ImageProfile] = {
+    "qr_code": ImageProfile(format="PNG", content_type="image/png", max_dimension=1024),
+    "payment_proof": ImageProfile(format="WEBP", content_type="image/webp", max_dimension=1600, quality=80),
+}
+
+
+@dataclass
+class ProcessedImage:
+    data: bytes
+    content_type: str
+    width: int
+    height: int
+    cpu_time: float
+
+
+class InvalidImage(Exception):
+    """Raised when the upload cannot be decoded as an image"""
+
+
+class ImageTooLarge(Exception):
+    """Raised when the upload exceeds the byte or pixel limits"""
+
+
+def process_image(
+    source: Union[bytes, str, BinaryIO], profile: ImageProfile, max_pixels: int
+) -> Tuple[bytes, int, int, float]:
+    """Decode, bound, downscale and re-encode one image given as bytes, a path or a file (runs in a worker)"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    started = time.process_time()
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        image = Image.open(BytesIO(source) if isinstance(source, bytes) else source)
+        # The header is parsed lazily, so this check happens before any pixels are decoded
+        width, height = image.size
+        if width * height > max_pixels:
+            raise ImageTooLarge(f"Image has {width * height} pixels, limit is {max_pixels}")
+        if image.format == "JPEG":
+            image.draft("RGB", (profile.max_dimension, profile.max_dimension))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((profile.max_dimension, profile.max_dimension), Image.LANCZOS)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e))
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise InvalidImage(str(e))
+
+    if profile.format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA", "L", "LA", "P", "1"):
+        image = image.convert("RGBA")
+
+    output = BytesIO()
+    save_options: Dict[str, Any] = {"optimize": True} if profile.format in ("PNG", "JPEG") else {}
+    if profile.quality is not None:
+        save_options["quality"] = profile.quality
+    image.save(output, format=profile.format, **save_options)
+    return output.getvalue(), image.width, image.height, time.process_time() - started
+
+
+class ImagePipeline:
+    """Runs image normalisation on a bounded worker pool with size guards"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_pixels: int = 40_000_000,
+        use_processes: bool = True,
+        profiles: Optional[Dict[str, ImageProfile]] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.use_processes = use_processes
+        self.profiles = profiles or IMAGE_PROFILES
+        self._executor: Executor = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # Caps uploads held in memory while waiting for a worker
+        self._slots = asyncio.Semaphore(max_workers + max_queue)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image")
+        return self._executor
+
+    async def process(
+        self, source: Union[bytes, str, BinaryIO], profile_name: str, size: Optional[int] = None
+    ) -> ProcessedImage:
+        """Normalise an uploaded image (bytes, a path, or an open binary file) according to a profile"""
+        if size is None:
+            if isinstance(source, bytes):
+                size = len(source)
+            elif isinstance(source, str):
+                size = os.path.getsize(source)
+            else:
+                size = source.seek(0, os.SEEK_END)
+                source.seek(0)
+        if size > self.max_bytes:
+            raise ImageTooLarge(f"Upload is {size} bytes, limit is {self.max_bytes}")
+        profile = self.profiles[profile_name]
+        async with self._slots:
+            if self.use_processes and not isinstance(source, (bytes, str)):
+                # An open file cannot be sent to a worker process, so its bytes are sent instead
+                source = await asyncio.to_thread(source.read)
+            loop = asyncio.get_running_loop()
+            try:
+                output, width, height, cpu_time = await loop.run_in_executor(
+                    self._get_executor(), process_image, source, profile, self.max_pixels
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool for the next upload
+                self.shutdown()
+                raise
+        self._record(profile_name, size, len(output), cpu_time)
+        return ProcessedImage(output, profile.content_type, width, height, cpu_time)
+
+    def _record(self, profile_name: str, input_bytes: int, output_bytes: int, cpu_time: float):
+        with self._lock:
+            stats = self._stats.setdefault(
+                profile_name, {"count": 0, "input_bytes": 0, "output_bytes": 0, "cpu_time_total": 0.0}
+            )
+            stats["count"] += 1
+            stats["input_bytes"] += input_bytes
+            stats["output_bytes"] += output_bytes
+            stats["cpu_time_total"] += cpu_time
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-profile processing counters"""
+        with self._lock:
+            return {
+                "executor": "process" if self.use_processes else "thread",
+                "max_workers": self.max_workers,
+                "profiles": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
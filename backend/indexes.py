@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index the application relies on"""
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+
+    @property
+    def name(self) -> str:
+        # Same naming scheme MongoDB uses for unnamed indexes
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        return IndexModel(list(self.keys), name=self.name, unique=self.unique)
+
+
+# Indexes backing the hot queries in server.py
+INDEX_REGISTRY: List[IndexSpec] = [
+    # Login and authentication
+    IndexSpec("users", (("email", 1),), unique=True),
+    IndexSpec("users", (("id", 1),), unique=True),
+    # Event lookups and the upcoming-events listing
+    IndexSpec("events", (("id", 1),), unique=True),
+    IndexSpec("events", (("date", 1), ("time", 1), ("id", 1))),
+    # Booking lookups, per-user lists, the admin queue, per-event counts and waitlist promotion
+    IndexSpec("bookings", (("id", 1),), unique=True),
+    IndexSpec("bookings", (("user_id", 1), ("created_at", -1))),
+    IndexSpec("bookings", (("status", 1), ("created_at", -1))),
+    IndexSpec("bookings", (("event_id", 1), ("status", 1), ("waitlist_position", 1))),
+    IndexSpec("bookings", (("created_at", -1), ("id", -1))),
+    # Booking history: per-booking timelines, time-range audits and analytics
+    IndexSpec("booking_events", (("id", 1),), unique=True),
+    IndexSpec("booking_events", (("booking_id", 1), ("at", 1))),
+    IndexSpec("booking_events", (("at", 1),)),
+    IndexSpec("booking_analytics", (("kind", 1), ("day", 1))),
+    # Email outbox claiming
+    IndexSpec("email_outbox", (("id", 1),), unique=True),
+    IndexSpec("email_outbox", (("status", 1), ("next_attempt_at", 1))),
+    # Captured request profiles (admin profiling API)
+    IndexSpec("request_profiles", (("id", 1),), unique=True),
+    IndexSpec("request_profiles", (("created_at", -1),)),
+]
+
+
+def _live_key(index: dict) -> List[Tuple[str, Any]]:
+    # Indexes created from the shell may report directions as doubles (1.0)
+    return [(field, int(direction) if isinstance(direction, float) else direction)
+            for field, direction in index["key"].items()]
+
+def _by_collection(registry: Sequence[IndexSpec]) -> Dict[str, List[IndexSpec]]:
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for spec in registry:
+        grouped.setdefault(spec.collection, []).append(spec)
+    return grouped
+
+async def ensure_indexes(db, registry: Sequence[IndexSpec] = INDEX_REGISTRY) -> Dict[str, Any]:
+    """Create every registered index; failures (e.g. duplicates blocking a unique index) are reported, not raised"""
+    created, failed = [], []
+    for collection, specs in _by_collection(registry).items():
+        for spec in specs:
+            try:
+                await db[collection].create_indexes([spec.model()])
+                created.append(f"{collection}.{spec.name}")
+            except OperationFailure as e:
+                failed.append({"index": f"{collection}.{spec.name}", "error": str(e)})
+    return {"applied": created, "failed": failed}
+
+async def index_drift(db, registry: Sequence[IndexSpec] = INDEX_REGISTRY) -> Dict[str, List[Any]]:
+    """Compare the live indexes with the registry"""
+    missing, mismatched, unexpected = [], [], []
+    for collection, specs in _by_collection(registry).items():
+        live = {index["name"]: index async for index in db[collection].list_indexes()}
+        expected = {spec.name: spec for spec in specs}
+        for name, spec in expected.items():
+            index = live.get(name)
+            if index is None:
+                missing.append(f"{collection}.{name}")
+            elif _live_key(index) != list(spec.keys) or bool(index.get("unique")) != spec.unique:
+                mismatched.append({
+                    "index": f"{collection}.{name}",
+                    "expected": {"key": list(spec.keys), "unique": spec.unique},
+                    "actual": {"key": _live_key(index), "unique": bool(index.get("unique"))},
+                })
+        unexpected.extend(
+            f"{collection}.{name}" for name in live if name != "_id_" and name not in expected
+        )
+    return {"missing": missing, "mismatched": mismatched, "unexpected": unexpected}
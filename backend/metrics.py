@@ -0,0 +1,276 @@
+import abc
+import logging
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from pymongo import monitoring
+
+from request_context import RequestContext, current_request, current_route
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every labelled series of this metric"""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+
+
+class Gauge(Metric):
+    """Gauge whose values are either set directly or read from `collect` at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help, labelnames)
+        self.collect = collect
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self) -> List[str]:
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return series[-1] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = []
+        for labels, series in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format
+
+    Each worker process keeps its own registry; scrape every worker (or run one per
+    container) the same way as any other multi-process Prometheus target.
+    """
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._refreshers: List[Callable[[], Awaitable[None]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, collect))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def on_scrape(self, refresh: Callable[[], Awaitable[None]]):
+        """Run `refresh` before every render (for gauges that need a database read)"""
+        self._refreshers.append(refresh)
+
+    async def render(self) -> str:
+        for refresh in self._refreshers:
+            try:
+                await refresh()
+            except Exception:
+                # A failed refresh leaves the previous gauge values in place
+                logger.exception("Metrics refresh failed")
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+class HTTPMetrics:
+    """Request counts, latency histograms and in-flight requests per route template"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "Requests currently being served", ("method", "route"),
+            collect=self._in_flight,
+        )
+        self._active: Set[RequestContext] = set()
+
+    def _in_flight(self) -> Dict[Tuple[str, ...], float]:
+        counts: Dict[Tuple[str, ...], float] = {}
+        for context in list(self._active):
+            key = (context.method, context.route)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def started(self, context: RequestContext):
+        self._active.add(context)
+
+    def finished(self, context: RequestContext, status: int):
+        self._active.discard(context)
+        route = context.route
+        self.requests.inc(context.method, route, str(status))
+        self.latency.observe(time.perf_counter() - context.started, context.method, route)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that opens a RequestContext for every HTTP request and records HTTP metrics"""
+
+    def __init__(self, app, http_metrics: HTTPMetrics):
+        self.app = app
+        self.http_metrics = http_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        context = RequestContext(scope)
+        token = current_request.set(context)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.http_metrics.started(context)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.http_metrics.finished(context, status_code)
+            current_request.reset(token)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Counts and times every Mongo command, labelled with the route that issued it
+
+    pymongo publishes these events synchronously on the thread running the command,
+    inside the context Motor copied from the awaiting coroutine.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.commands = registry.counter(
+            "mongo_commands_total", "Mongo commands by issuing route", ("route", "collection", "command", "outcome")
+        )
+        self.latency = registry.histogram(
+            "mongo_command_duration_seconds", "Mongo command latency by issuing route",
+            ("route", "collection", "command"), buckets=MONGO_BUCKETS,
+        )
+        self._collections: Dict[Tuple[Any, int], str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else ""
+            )
+
+    def _finished(self, event, outcome: str):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+        route = current_route()
+        self.commands.inc(route, collection, event.command_name, outcome)
+        self.latency.observe(event.duration_micros / 1e6, route, collection, event.command_name)
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
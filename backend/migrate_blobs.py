@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Move inline base64 images out of event and booking documents into the blob store.
+
+    python migrate_blobs.py [--batch-size 100] [--dry-run]
+
+Also records who may read every referenced blob (see BlobRecords); blobs stored
+before those records existed are only readable by admins until this has run.
+Safe to re-run: only documents that still carry an inline image are moved.
+"""
+import argparse
+import asyncio
+import base64
+import os
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from blob_store import BlobRecords, blob_key_from_url, blob_url, create_blob_store
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# (collection, inline field, url field, private, owner field)
+INLINE_IMAGE_FIELDS = [
+    ("events", "qr_code_base64", "qr_code_url", False, None),
+    ("bookings", "payment_proof_base64", "payment_proof_url", True, "user_id"),
+]
+
+
+def decode_data_uri(data_uri: str):
+    """Split a data:<type>;base64,<payload> URI into (content_type, bytes)"""
+    header, _, payload = data_uri.partition(",")
+    content_type = header[len("data:"):].split(";")[0] if header.startswith("data:") else "image/png"
+    return content_type or "image/png", base64.b64decode(payload)
+
+async def migrate_collection(db, blob_store, collection: str, inline_field: str, url_field: str,
+                             batch_size: int, dry_run: bool) -> int:
+    migrated = 0
+    cursor = db[collection].find(
+        {inline_field: {"$nin": [None, ""]}},
+        {"_id": 1, inline_field: 1},
+        batch_size=batch_size,
+    )
+    async for doc in cursor:
+        content_type, data = decode_data_uri(doc[inline_field])
+        if not dry_run:
+            key = await blob_store.put(data, content_type)
+            await db[collection].update_one(
+                {"_id": doc["_id"]},
+                {"$set": {url_field: blob_url(key)}, "$unset": {inline_field: ""}}
+            )
+        migrated += 1
+    return migrated
+
+async def record_collection(db, blob_records: BlobRecords, collection: str, url_field: str,
+                            private: bool, owner_field: Optional[str], batch_size: int, dry_run: bool) -> int:
+    """Record access for every blob the collection references"""
+    recorded = 0
+    cursor = db[collection].find(
+        {url_field: {"$nin": [None, ""]}},
+        {"_id": 0, url_field: 1, **({owner_field: 1} if owner_field else {})},
+        batch_size=batch_size,
+    )
+    async for doc in cursor:
+        key = blob_key_from_url(doc[url_field])
+        if key is None:
+            continue
+        if not dry_run:
+            await blob_records.record(key, private, doc.get(owner_field) if owner_field else None)
+        recorded += 1
+    return recorded
+
+async def record_replaced_proofs(db, blob_records: BlobRecords, batch_size: int, dry_run: bool) -> int:
+    """Record payment proofs that were replaced by a re-upload and are only left in booking history"""
+    recorded = 0
+    cursor = db.booking_events.find(
+        {"type": "payment_proof_uploaded"}, {"_id": 0, "actor_id": 1, "data": 1}, batch_size=batch_size
+    )
+    async for event in cursor:
+        key = blob_key_from_url((event.get("data") or {}).get("payment_proof_url"))
+        if key is None:
+            continue
+        if not dry_run:
+            await blob_records.record(key, True, event.get("actor_id"))
+        recorded += 1
+    return recorded
+
+async def migrate(batch_size: int, dry_run: bool):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    blob_store = create_blob_store(
+        os.environ.get('BLOB_STORE_BACKEND', 'local'),
+        db=db,
+        root=Path(os.environ.get('BLOB_STORE_PATH', str(ROOT_DIR / 'blobs'))),
+    )
+    blob_records = BlobRecords(db)
+    migrate_action, record_action = ("Would migrate", "Would record") if dry_run else ("Migrated", "Recorded")
+    for collection, inline_field, url_field, private, owner_field in INLINE_IMAGE_FIELDS:
+        migrated = await migrate_collection(db, blob_store, collection, inline_field, url_field, batch_size, dry_run)
+        print(f"{migrate_action} {migrated} {collection} document(s) from {inline_field} to {url_field}")
+        recorded = await record_collection(db, blob_records, collection, url_field, private, owner_field,
+                                           batch_size, dry_run)
+        print(f"{record_action} access for {recorded} {collection} blob reference(s)")
+    recorded = await record_replaced_proofs(db, blob_records, batch_size, dry_run)
+    print(f"{record_action} access for {recorded} payment proof(s) from booking history")
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move inline base64 images into the blob store")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.dry_run))
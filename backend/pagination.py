@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+
+# A sort specification is a list of (field, direction) pairs, direction 1 or -1
+SortSpec = Sequence[Tuple[str, int]]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+def encode_cursor(doc: dict, sort: SortSpec) -> str:
+    """Opaque cursor pointing just after `doc` in `sort` order"""
+    values = [_encode_value(doc.get(field)) for field, _ in sort]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor: str, sort: SortSpec) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, raising 400 when it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(sort):
+            raise ValueError("cursor does not match sort order")
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(sort: SortSpec, values: List[Any]) -> dict:
+    """Filter selecting documents strictly after `values` in `sort` order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def projection_for(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default_exclude: Set[str] = frozenset(),
+    required: Iterable[str] = (),
+) -> Dict[str, int]:
+    """Mongo projection from a comma-separated `fields=` parameter
+
+    Without `fields`, every allowed field except `default_exclude` is returned.
+    Fields needed for cursors are always included.
+    """
+    allowed = list(allowed)
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = sorted(set(requested) - set(allowed))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        requested = [field for field in allowed if field not in default_exclude]
+    projection = {"_id": 0}
+    for field in list(required) + requested:
+        projection[field] = 1
+    return projection
+
+async def fetch_page(collection, query: dict, sort: SortSpec, limit: int,
+                     projection: dict, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one keyset page and the cursor for the next one (None on the last page)"""
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor, sort))]}
+    docs = await collection.find(query, projection).sort(list(sort)).limit(limit + 1).to_list(limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], sort)
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+import bcrypt
+
+
+def hash_password(password: str) -> str:
+    """Hash password using bcrypt"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """Verify password against hash"""
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def _timed_hash(password: str) -> Tuple[str, float]:
+    started = time.perf_counter()
+    result = hash_password(password)
+    return result, time.perf_counter() - started
+
+def _timed_verify(password: str, hashed_password: str) -> Tuple[bool, float]:
+    started = time.perf_counter()
+    result = verify_password(password, hashed_password)
+    return result, time.perf_counter() - started
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing/verification on a bounded worker pool off the event loop"""
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "hash_time_total": 0.0,
+            "hash_time_max": 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise HashingPoolBusy("Password hashing queue is full")
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, hash_time = await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        queue_wait = max(time.perf_counter() - submitted - hash_time, 0.0)
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["queue_wait_total"] += queue_wait
+            self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], queue_wait)
+            self._stats["hash_time_total"] += hash_time
+            self._stats["hash_time_max"] = max(self._stats["hash_time_max"], hash_time)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash password on the worker pool"""
+        return await self._run(_timed_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify password on the worker pool"""
+        return await self._run(_timed_verify, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters and timings (seconds)"""
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = self._in_flight
+        completed = stats["completed"] or 1
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queued": max(in_flight - self.max_workers, 0),
+            "submitted": stats["submitted"],
+            "completed": stats["completed"],
+            "rejected": stats["rejected"],
+            "queue_wait_avg": stats["queue_wait_total"] / completed,
+            "queue_wait_max": stats["queue_wait_max"],
+            "hash_time_avg": stats["hash_time_total"] / completed,
+            "hash_time_max": stats["hash_time_max"],
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+
+class PrincipalCache:
+    """Bounded LRU cache of authenticated users keyed by user id, with a TTL per entry
+
+    Each worker keeps its own entries. Role and status changes go through `invalidate()`,
+    which drops the local entries and bumps a version stamp in `settings_versions`; every
+    worker compares that stamp at most once per `version_check_interval` and empties its
+    cache when it moved, so a revocation reaches all workers within that interval.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_size: int = 10000,
+        ttl: float = 30.0,
+        version_check_interval: float = 1.0,
+        name: str = "principals",
+    ):
+        self.db = db
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._entries: OrderedDict[str, Tuple[float, dict]] = OrderedDict()
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "version_checks": 0, "resets": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    async def _read_version(self) -> int:
+        stamp = await self.db.settings_versions.find_one({"_id": self.name})
+        return stamp["version"] if stamp else 0
+
+    async def _check_version(self) -> bool:
+        """Empty the cache when another worker bumped the version stamp; True if it did"""
+        if time.monotonic() - self._checked_at < self.version_check_interval:
+            return False
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.version_check_interval:
+                return False
+            self._stats["version_checks"] += 1
+            version = await self._read_version()
+            changed = self._version is not None and version != self._version
+            if changed:
+                self._entries.clear()
+                self._stats["resets"] += 1
+            self._version = version
+            self._checked_at = time.monotonic()
+            return changed
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        """Return a copy of the cached principal, or None on miss/expiry"""
+        if self._entries:
+            await self._check_version()
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self._stats["hits"] += 1
+        return dict(entry[1])
+
+    async def put(self, user_id: str, user_data: dict):
+        """Cache a principal, evicting the least recently used entries past max_size"""
+        if not self.enabled:
+            return
+        # The user may have been loaded before the change that moved the stamp
+        if await self._check_version():
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, dict(user_data))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def invalidate(self, *user_ids: str):
+        """Drop the given user ids here and bump the shared version stamp for other workers"""
+        async with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self._stats["invalidations"] += 1
+            stamp = await self.db.settings_versions.find_one_and_update(
+                {"_id": self.name}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+            # Our own bump needs no reset; anything else that moved the stamp does
+            if self._version is not None and stamp["version"] == self._version + 1:
+                self._version = stamp["version"]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "version": self._version,
+            **self._stats,
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+# Where each command keeps the part of the request that decides how it is executed
+QUERY_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+}
+EXPLAINABLE = frozenset(QUERY_FIELDS)
+# Session/cluster bookkeeping that explain must not repeat
+COMMAND_NOISE = frozenset({"lsid", "txnNumber", "autocommit", "startTransaction", "writeConcern"})
+UNPROFILED = frozenset({"explain", "hello", "isMaster", "ismaster", "ping", "endSessions", "killCursors"})
+TOP_SORT_FIELDS = ("total_ms", "count", "max_ms", "avg_ms", "docs_returned")
+MAX_OPEN_CURSORS = 10000
+
+
+def _shape(value: Any) -> Any:
+    """Replace literals with "?" but keep field names, operators and $and/$or structure"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+        return [_shape(item) for item in value]
+    return "?"
+
+def query_shape(command_name: str, command: dict) -> str:
+    """Normalised JSON shape of a command, identical for calls that differ only in values"""
+    field = QUERY_FIELDS.get(command_name)
+    shape: Dict[str, Any] = {}
+    if field is not None:
+        query = command.get(field)
+        if command_name in ("update", "delete") and query:
+            # Bulk writes share one shape per statement form; the first statement stands for the batch
+            query = {key: value for key, value in query[0].items() if key in ("q", "u")}
+        shape[field] = _shape(query) if query is not None else None
+    if command.get("sort"):
+        shape["sort"] = dict(command["sort"])
+    return json.dumps(shape, sort_keys=True, default=str)
+
+def _docs_returned(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if "value" in reply:  # findAndModify
+        return 1 if reply["value"] is not None else 0
+    if isinstance(reply.get("values"), list):  # distinct
+        return len(reply["values"])
+    return int(reply.get("n", 0) or 0)
+
+def plan_summary(explain: dict) -> Dict[str, Any]:
+    """Stages, indexes and whether the winning plan scans the whole collection"""
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        for stage in explain.get("stages") or ():
+            planner = (stage.get("$cursor") or {}).get("queryPlanner")
+            if planner:
+                break
+    planner = planner or {}
+    stages: List[str] = []
+    indexes: List[str] = []
+    pending = [planner.get("winningPlan") or {}]
+    while pending:
+        node = pending.pop()
+        if "queryPlan" in node:  # slot-based engine wraps the classic plan
+            node = node["queryPlan"]
+        if node.get("stage"):
+            stages.append(node["stage"])
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        if node.get("inputStage"):
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages") or ())
+    return {"stages": stages, "indexes": indexes, "collection_scan": "COLLSCAN" in stages}
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Aggregates Mongo commands per (route, collection, command, query shape) and keeps a slow-query log
+
+    Registered on the Motor client; events arrive on the executor thread that ran the
+    command, inside the context Motor copied from the request, so `current_route()`
+    names the endpoint that issued it. Cursor continuations (getMore) are charged to the
+    find/aggregate shape that opened the cursor. When `explain` is on, the first slow
+    call of each shape is explained (queryPlanner verbosity) in the background.
+    """
+
+    def __init__(self, slow_ms: float = 100.0, slow_log_size: int = 200, max_shapes: int = 1000,
+                 explain: bool = False):
+        self.slow_ms = slow_ms
+        self.max_shapes = max_shapes
+        self.explain = explain
+        self.slow_log: deque = deque(maxlen=slow_log_size)
+        self._shapes: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        self._inflight: Dict[Tuple[Any, int], Tuple[Tuple[str, str, str, str], Optional[tuple], Optional[int]]] = {}
+        self._cursors: Dict[int, Tuple[str, str, str, str]] = {}
+        self._explained: set = set()
+        self._dropped_shapes = 0
+        self._lock = threading.Lock()
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, client, loop: asyncio.AbstractEventLoop):
+        """Give the profiler a client and loop to run explains on (called from the app lifespan)"""
+        self._client = client
+        self._loop = loop
+
+    # CommandListener
+
+    def started(self, event):
+        name = event.command_name
+        if name in UNPROFILED:
+            return
+        command = event.command
+        cursor_id = command.get("getMore") if name == "getMore" else None
+        if name == "getMore":
+            with self._lock:
+                key = self._cursors.get(cursor_id)
+            if key is None:
+                key = (current_route(), command.get("collection", ""), name, "{}")
+        else:
+            collection = command.get(name)
+            key = (current_route(), collection if isinstance(collection, str) else "", name, query_shape(name, command))
+        explain_source = (event.database_name, command) if self.explain and name in EXPLAINABLE else None
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = (key, explain_source, cursor_id)
+
+    def succeeded(self, event):
+        self._finished(event, event.reply, failed=False)
+
+    def failed(self, event):
+        self._finished(event, {}, failed=True)
+
+    def _finished(self, event, reply: dict, failed: bool):
+        with self._lock:
+            pending = self._inflight.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        key, explain_source, cursor_id = pending
+        duration_ms = event.duration_micros / 1000
+        docs = 0 if failed else _docs_returned(reply)
+        cursor = reply.get("cursor")
+        open_cursor_id = cursor.get("id") if isinstance(cursor, dict) else None
+        with self._lock:
+            # Remember which shape opened a cursor so its getMores are charged to it
+            if cursor_id is not None and not open_cursor_id:
+                self._cursors.pop(cursor_id, None)
+            elif open_cursor_id and open_cursor_id not in self._cursors:
+                if len(self._cursors) >= MAX_OPEN_CURSORS:
+                    self._cursors.pop(next(iter(self._cursors)))
+                self._cursors[open_cursor_id] = key
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    self._dropped_shapes += 1
+                else:
+                    route, collection, command_name, shape = key
+                    stats = self._shapes[key] = {
+                        "route": route, "collection": collection, "command": command_name, "shape": shape,
+                        "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "docs_returned": 0, "plan": None,
+                    }
+            if stats is not None:
+                stats["count"] += 1
+                stats["errors"] += failed
+                stats["total_ms"] += duration_ms
+                stats["max_ms"] = max(stats["max_ms"], duration_ms)
+                stats["docs_returned"] += docs
+            explain_now = (
+                duration_ms >= self.slow_ms and explain_source is not None and key not in self._explained
+            )
+            if explain_now:
+                self._explained.add(key)
+        if duration_ms >= self.slow_ms:
+            self._record_slow(key, duration_ms, docs, failed)
+            if explain_now:
+                self._schedule_explain(key, *explain_source)
+
+    def _record_slow(self, key, duration_ms: float, docs: int, failed: bool):
+        route, collection, command_name, shape = key
+        entry = {
+            "at": datetime.utcnow(), "route": route, "collection": collection, "command": command_name,
+            "shape": shape, "duration_ms": round(duration_ms, 3), "docs_returned": docs, "failed": failed,
+        }
+        self.slow_log.append(entry)
+        logger.warning("Slow Mongo %s on %s from %s", command_name, collection, route,
+                       extra={"duration_ms": entry["duration_ms"], "shape": shape, "docs_returned": docs})
+
+    # Explain
+
+    def _schedule_explain(self, key, database_name: str, command: dict):
+        if self._client is None or self._loop is None or self._loop.is_closed():
+            return
+        explain_command = {k: v for k, v in command.items() if k not in COMMAND_NOISE and not k.startswith("$")}
+        asyncio.run_coroutine_threadsafe(self._explain(key, database_name, explain_command), self._loop)
+
+    async def _explain(self, key, database_name: str, command: dict):
+        try:
+            result = await self._client[database_name].command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception as e:
+            logger.warning("Explain failed for %s: %s", key[3], e)
+            return
+        summary = plan_summary(result)
+        with self._lock:
+            if key in self._shapes:
+                self._shapes[key]["plan"] = summary
+        if summary["collection_scan"]:
+            logger.warning("Collection scan on %s from %s", key[1], key[0], extra={"shape": key[3]})
+
+    # Reports
+
+    def top(self, limit: int = 20, sort: str = "total_ms") -> Dict[str, Any]:
+        """The `limit` most expensive query shapes by `sort`"""
+        with self._lock:
+            shapes = [dict(stats) for stats in self._shapes.values()]
+            dropped = self._dropped_shapes
+        for stats in shapes:
+            stats["avg_ms"] = round(stats["total_ms"] / stats["count"], 3) if stats["count"] else 0.0
+            stats["total_ms"] = round(stats["total_ms"], 3)
+            stats["max_ms"] = round(stats["max_ms"], 3)
+        shapes.sort(key=lambda stats: stats[sort], reverse=True)
+        return {
+            "shapes": shapes[:limit],
+            "tracked_shapes": len(shapes),
+            "untracked_calls": dropped,
+            "slow_ms": self.slow_ms,
+        }
+
+    def slow_queries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow commands, newest first"""
+        return list(self.slow_log)[::-1][:limit]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self._explained.clear()
+            self._dropped_shapes = 0
+        self.slow_log.clear()
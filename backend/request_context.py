@@ -0,0 +1,37 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+UNMATCHED_ROUTE = "unmatched"
+BACKGROUND_ROUTE = "background"
+
+
+class RequestContext:
+    """Per-request state visible to code that runs on the request's behalf
+
+    Motor runs pymongo calls in executor threads with a copy of the caller's context,
+    so command listeners can read the current request through `current_request`.
+    The route template is resolved lazily: FastAPI only stores the matched route in
+    the ASGI scope after routing, which happens after the middleware created this.
+    """
+
+    __slots__ = ("scope", "method", "started")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.method = scope.get("method", "")
+        self.started = time.perf_counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+
+def current_route() -> str:
+    """Route template of the request being served, or "background" outside a request"""
+    context = current_request.get()
+    return context.route if context is not None else BACKGROUND_ROUTE
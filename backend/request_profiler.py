@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from request_context import UNMATCHED_ROUTE
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "__profile"
+AWAIT_FRAME = "(await)"
+
+logger = logging.getLogger(__name__)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _await_chain(coro) -> List[str]:
+    """Frames of a suspended coroutine chain, outermost first, ending at what it is waiting on"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        if coro is not None and not (hasattr(coro, "cr_frame") or hasattr(coro, "gi_frame")):
+            break
+    labels.append(AWAIT_FRAME)
+    return labels
+
+
+class StackSampler:
+    """Samples one asyncio task from a background thread at a fixed interval
+
+    When the task is running, the sample is the event-loop thread's stack from the
+    task's root coroutine down; when it is suspended, it is the chain of awaiting
+    coroutines ending in "(await)". Stacks of other requests sharing the loop are
+    never counted, and the result is a wall-clock profile of this request only.
+    """
+
+    def __init__(self, task: asyncio.Task, thread_id: int, interval: float = 0.005, max_samples: int = 20000):
+        self.task = task
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_samples = max_samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        coro = self.task.get_coro()
+        root = getattr(coro, "cr_frame", None)
+        if root is None:
+            return
+        frame = sys._current_frames().get(self.thread_id)
+        running = []
+        while frame is not None:
+            running.append(frame)
+            if frame is root:
+                self.stacks[";".join(_label(f) for f in reversed(running))] += 1
+                return
+            frame = frame.f_back
+        self.stacks[";".join(_await_chain(coro))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval) and self.samples < self.max_samples:
+            self._sample()
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def to_collapsed(stacks: List[Dict[str, Any]]) -> str:
+    """Brendan Gregg's collapsed-stack format, as read by flamegraph.pl, speedscope and inferno"""
+    return "".join(f"{entry['stack']} {entry['count']}\n" for entry in stacks)
+
+def to_speedscope(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Speedscope "sampled" profile with one sample per distinct stack, weighted by time"""
+    frames: List[Dict[str, Any]] = []
+    frame_index: Dict[str, int] = {}
+    samples, weights = [], []
+    for entry in profile["stacks"]:
+        sample = []
+        for label in entry["stack"].split(";"):
+            if label not in frame_index:
+                frame_index[label] = len(frames)
+                name, _, location = label.rpartition(" (")
+                file, _, line = location.rstrip(")").rpartition(":")
+                frames.append({"name": name, "file": file, "line": int(line)} if name and line.isdigit() else {"name": label})
+            sample.append(frame_index[label])
+        samples.append(sample)
+        weights.append(entry["count"] * profile["interval_ms"])
+    name = f"{profile['method']} {profile['path']}"
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "vibrant-yoga request profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights,
+        }],
+    }
+
+
+class RequestProfilingMiddleware:
+    """Profiles a request when an admin asks for it with an `X-Profile` header or `__profile=1` query flag
+
+    Requests without the flag pass straight through. Requests with the flag whose bearer
+    token does not belong to an admin are served normally and not profiled. The response
+    carries an `X-Profile-Id` header; the stored profile is fetched from the admin API.
+    Only install this middleware when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app,
+        authorize: Callable[[str], Awaitable[Optional[dict]]],
+        store: Callable[[dict], Awaitable[None]],
+        interval: float = 0.005,
+    ):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self.interval = interval
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        query_string = scope.get("query_string", b"")
+        # Substring check first so requests without the flag are never parsed
+        if PROFILE_QUERY_PARAM.encode() in query_string:
+            if (PROFILE_QUERY_PARAM, "1") in parse_qsl(query_string.decode("latin-1")):
+                return True
+        return any(name == PROFILE_HEADER for name, _ in scope["headers"])
+
+    @staticmethod
+    def _bearer_token(scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                return value[7:].decode("latin-1")
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        token = self._bearer_token(scope)
+        admin = await self.authorize(token) if token else None
+        if admin is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = str(uuid.uuid4())
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = StackSampler(asyncio.current_task(), threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            route = scope.get("route")
+            profile = {
+                "id": profile_id,
+                "created_at": datetime.utcnow(),
+                "admin_id": admin.get("id"),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None) or UNMATCHED_ROUTE,
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "interval_ms": self.interval * 1000,
+                "samples": sampler.samples,
+                "stacks": [{"stack": stack, "count": count} for stack, count in sampler.stacks.most_common()],
+            }
+            try:
+                await self.store(profile)
+            except Exception:
+                logger.exception("Storing request profile failed")
@@ -0,0 +1,144 @@
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+# Bookings in these statuses occupy one of the event's seats
+SEAT_HOLDING_STATUSES = ("pending", "approved")
+WAITLISTED = "waitlisted"
+
+logger = logging.getLogger(__name__)
+
+
+class EventFull(Exception):
+    """Raised when an event has no seats left and no waitlist"""
+
+
+class SeatAllocator:
+    """Per-event seat counter with an ordered waitlist
+
+    Each event document carries `seats_available`, only ever changed with a
+    conditional `$inc`, so concurrent bookings can never take more seats than the
+    event has. Bookings that find no seat get a `waitlist_position` from the
+    event's `waitlist_seq` counter and are promoted in that order whenever a seat
+    is released.
+    """
+
+    def __init__(self, db, on_promoted: Optional[Callable[[dict], Awaitable[None]]] = None):
+        self.db = db
+        self.on_promoted = on_promoted
+
+    async def _initialize(self, event_id: str) -> bool:
+        # Events created before seat tracking: derive the counter from held bookings
+        event_doc = await self.db.events.find_one(
+            {"id": event_id}, {"_id": 0, "capacity": 1, "seats_available": 1}
+        )
+        if event_doc is None:
+            return False
+        if "seats_available" not in event_doc:
+            held = await self.db.bookings.count_documents(
+                {"event_id": event_id, "status": {"$in": list(SEAT_HOLDING_STATUSES)}}
+            )
+            await self.db.events.update_one(
+                {"id": event_id, "seats_available": {"$exists": False}},
+                {"$set": {"seats_available": max(event_doc.get("capacity", 0) - held, 0)}},
+            )
+        return True
+
+    async def _take_seat(self, event_id: str, seats: int = 1) -> bool:
+        event_doc = await self.db.events.find_one_and_update(
+            {"id": event_id, "seats_available": {"$gte": seats}},
+            {"$inc": {"seats_available": -seats}},
+            projection={"_id": 1},
+        )
+        return event_doc is not None
+
+    async def _return_seat(self, event_id: str, seats: int = 1):
+        await self.db.events.update_one({"id": event_id}, {"$inc": {"seats_available": seats}})
+
+    async def acquire(self, event_id: str) -> bool:
+        """Take one seat, returning False when the event is full"""
+        if await self._take_seat(event_id):
+            return True
+        if not await self._initialize(event_id):
+            return False
+        return await self._take_seat(event_id)
+
+    async def acquire_many(self, event_id: str, seats: int) -> int:
+        """Take up to `seats` seats at once, returning how many were taken"""
+        initialized = False
+        while seats > 0:
+            if await self._take_seat(event_id, seats):
+                return seats
+            if not initialized:
+                if not await self._initialize(event_id):
+                    return 0
+                initialized = True
+                continue
+            # Not enough left for all of them: retry with what the event still has
+            event_doc = await self.db.events.find_one({"id": event_id}, {"_id": 0, "seats_available": 1})
+            seats = min(seats, max((event_doc or {}).get("seats_available", 0), 0))
+        return 0
+
+    async def book(self, booking: dict, waitlist_enabled: bool = True) -> dict:
+        """Insert a booking with a seat, or on the waitlist when the event is full"""
+        event_id = booking["event_id"]
+        if await self.acquire(event_id):
+            booking["waitlist_position"] = None
+            try:
+                await self.db.bookings.insert_one(booking)
+            except BaseException:
+                await self._return_seat(event_id)
+                raise
+            return booking
+
+        if not waitlist_enabled:
+            raise EventFull("Event is full")
+
+        event_doc = await self.db.events.find_one_and_update(
+            {"id": event_id},
+            {"$inc": {"waitlist_seq": 1}},
+            projection={"waitlist_seq": 1},
+        )
+        booking["status"] = WAITLISTED
+        booking["waitlist_position"] = event_doc.get("waitlist_seq", 0) + 1
+        await self.db.bookings.insert_one(booking)
+
+        # A seat may have been released between the failed acquire and the insert. If this
+        # booking takes it, the caller records it as a new pending booking, not a promotion.
+        promoted = await self.promote(event_id, skip_hook_for=booking["id"])
+        if any(doc["id"] == booking["id"] for doc in promoted):
+            booking["status"] = SEAT_HOLDING_STATUSES[0]
+            booking["waitlist_position"] = None
+        return booking
+
+    async def release(self, event_id: str, seats: int = 1) -> List[dict]:
+        """Give seats back and promote from the waitlist, returning promoted bookings"""
+        await self._return_seat(event_id, seats)
+        return await self.promote(event_id)
+
+    async def promote(self, event_id: str, skip_hook_for: Optional[str] = None) -> List[dict]:
+        """Move waitlisted bookings into free seats, earliest position first
+
+        `on_promoted` fires for every promoted booking except `skip_hook_for`; its
+        failures are logged, never raised.
+        """
+        promoted = []
+        while await self._take_seat(event_id):
+            booking_doc = await self.db.bookings.find_one_and_update(
+                {"event_id": event_id, "status": WAITLISTED},
+                {"$set": {"status": SEAT_HOLDING_STATUSES[0]}, "$unset": {"waitlist_position": ""}},
+                sort=[("waitlist_position", 1)],
+                projection={"_id": 0},
+            )
+            if booking_doc is None:
+                await self._return_seat(event_id)
+                break
+            booking_doc["status"] = SEAT_HOLDING_STATUSES[0]
+            booking_doc.pop("waitlist_position", None)
+            promoted.append(booking_doc)
+            if self.on_promoted is not None and booking_doc["id"] != skip_hook_for:
+                # The promotion is committed; a failing hook must not strand the remaining free seats
+                try:
+                    await self.on_promoted(booking_doc)
+                except Exception:
+                    logger.exception("Promotion hook failed", extra={"booking_id": booking_doc["id"]})
+        return promoted
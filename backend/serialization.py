@@ -0,0 +1,65 @@
+from typing import Any, Dict, Iterable, List, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dump_json(content: Any) -> bytes:
+    """Encode API content with orjson; datetimes render like datetime.isoformat()"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-rendered response that also accepts ObjectId values and pydantic models
+
+    Routes returning one directly skip FastAPI's response_model validation, so it
+    is meant for documents we wrote ourselves and projected to the model's fields.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def model_defaults(model: Type[BaseModel], exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """Defaults of a model, used to fill fields missing from older documents
+
+    Factory defaults are only included for empty containers; ids and timestamps
+    are always stored, so their factories are never needed here.
+    """
+    exclude = set(exclude)
+    defaults = {}
+    for name, field in model.model_fields.items():
+        if name in exclude or field.is_required():
+            continue
+        if field.default_factory is None:
+            defaults[name] = field.default
+        elif field.default_factory in (dict, list):
+            defaults[name] = field.default_factory()
+    return defaults
+
+def model_fields_projection(model: Type[BaseModel], exclude: Iterable[str] = ()) -> Dict[str, int]:
+    """Mongo projection selecting exactly a model's fields"""
+    exclude = set(exclude)
+    return {name: 1 for name in model.model_fields if name not in exclude}
+
+def as_response_docs(docs: List[dict], defaults: Dict[str, Any], id_from_object_id: bool = False) -> List[dict]:
+    """Shape projected documents for a response without re-validating them
+
+    `id_from_object_id` keeps the historical behaviour of exposing the Mongo
+    `_id` as `id` (see user_id_query in server.py).
+    """
+    shaped = []
+    for doc in docs:
+        if id_from_object_id:
+            doc["id"] = str(doc.pop("_id"))
+        shaped.append({**defaults, **doc})
+    return shaped
@@ -1,38 +1,115 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Header, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
+import secrets
+import time
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 from datetime import datetime, timedelta
-import firebase_admin
-from firebase_admin import credentials, auth as firebase_auth
+from zoneinfo import ZoneInfo
 import json
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import base64
-from io import BytesIO
-from PIL import Image
+from contextlib import asynccontextmanager
 from bson import ObjectId
-import bcrypt
 import jwt
+from password_hashing import PasswordHasher, HashingPoolBusy
+from email_outbox import EmailOutboxWorker
+from smtp_pool import SMTPConnectionPool
+from settings_cache import SettingsCache
+from principal_cache import PrincipalCache
+from response_cache import ResponseCache, CachedResponse, etag_matches
+from exports import export_response
+from serialization import FastJSONResponse, dump_json, model_defaults, model_fields_projection, as_response_docs
+from firebase_app import FirebaseApp
+from app_logging import configure_logging, parse_levels
+from metrics import MetricsRegistry, HTTPMetrics, MetricsMiddleware, MongoCommandMetrics
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from query_profiler import QueryProfiler, TOP_SORT_FIELDS
+from request_profiler import RequestProfilingMiddleware, to_collapsed, to_speedscope
+from blob_store import (
+    create_blob_store, blob_url, blob_key_from_url, blob_content_type, is_valid_blob_key, BlobRecords, is_public_blob, can_read_blob
+)
+from image_pipeline import ImagePipeline, ImageTooLarge, InvalidImage
+from uploads import (
+    hash_upload, UploadTooLarge, ProcessedUploadIndex, UploadSizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
+)
+from pagination import fetch_page, projection_for
+from indexes import ensure_indexes, index_drift
+from dashboard_stats import DashboardStats
+from concurrency import gather_with_timeout
+from seat_allocation import SeatAllocator, EventFull, SEAT_HOLDING_STATUSES
+from booking_events import BookingEventLog
+from pymongo import ReturnDocument, UpdateOne
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Logging (records are formatted and written by a QueueListener thread, off the event loop; flushed at exit)
+log_pipeline = configure_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    json_output=os.environ.get('LOG_FORMAT', 'json').lower() == 'json',
+    module_levels=parse_levels(os.environ.get('LOG_LEVELS', '')),
+    debug_sample_rate=float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '1.0')),
+)
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics for this worker (served from /api/metrics)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+metrics_registry = MetricsRegistry()
+http_metrics = HTTPMetrics(metrics_registry)
+mongo_metrics = MongoCommandMetrics(metrics_registry)
+image_processing_seconds = metrics_registry.histogram(
+    "image_processing_seconds", "Upload normalisation time including worker-pool wait", ("profile",)
+)
+email_queue_depth = metrics_registry.gauge("email_outbox_messages", "Email outbox messages by status", ("status",))
+
+# Mongo query profiler (per-route query shapes and slow-query log; optional explain of slow shapes)
+QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'true').lower() == 'true'
+query_profiler = QueryProfiler(
+    slow_ms=float(os.environ.get('SLOW_QUERY_MS', '100')),
+    slow_log_size=int(os.environ.get('SLOW_QUERY_LOG_SIZE', '200')),
+    max_shapes=int(os.environ.get('QUERY_PROFILER_MAX_SHAPES', '1000')),
+    explain=os.environ.get('QUERY_PROFILER_EXPLAIN', 'false').lower() == 'true',
+)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_listeners = ([mongo_metrics] if METRICS_ENABLED else []) + ([query_profiler] if QUERY_PROFILER_ENABLED else [])
+client = AsyncIOMotorClient(mongo_url, event_listeners=mongo_listeners)
 db = client[os.environ['DB_NAME']]
 
-# Firebase Admin SDK setup with proper credentials
+# Blob store for uploaded images (documents only keep a URL reference)
+blob_store = create_blob_store(
+    os.environ.get('BLOB_STORE_BACKEND', 'local'),
+    db=db,
+    root=Path(os.environ.get('BLOB_STORE_PATH', str(ROOT_DIR / 'blobs'))),
+)
+
+# Image pipeline (decode/resize/re-encode in worker processes)
+image_pipeline = ImagePipeline(
+    max_workers=int(os.environ.get('IMAGE_WORKERS', '2')),
+    max_bytes=int(os.environ.get('IMAGE_MAX_BYTES', str(10 * 1024 * 1024))),
+    max_pixels=int(os.environ.get('IMAGE_MAX_PIXELS', '40000000')),
+    use_processes=os.environ.get('IMAGE_EXECUTOR', 'process') == 'process',
+)
+
+# Uploads are streamed to temp files; identical re-uploads reuse the stored blob
+processed_uploads = ProcessedUploadIndex()
+blob_records = BlobRecords(db)
+# Upload profiles only the uploader and admins may read back
+PRIVATE_IMAGE_PROFILES = {"payment_proof"}
+
+# Firebase Admin SDK credentials (used when FIREBASE_CREDENTIALS does not point at a service-account file)
 firebase_config = {
     "type": "service_account",
     "project_id": "guruze-46446",
@@ -46,20 +123,41 @@ firebase_config = {
     "client_x509_cert_url": "https://www.googleapis.com/robot/v1/metadata/x509/firebase-adminsdk-dummy%40guruze-46446.iam.gserviceaccount.com"
 }
 
-# Initialize Firebase (for production, use real credentials)
-firebase_initialized = False
-try:
-    cred = credentials.Certificate(firebase_config)
-    firebase_admin.initialize_app(cred)
-    firebase_initialized = True
-except Exception as e:
-    print(f"Firebase initialization failed: {e}")
-    firebase_initialized = False
+# Firebase is imported and initialized on first use, and only when enabled; no route needs it yet
+FIREBASE_ENABLED = os.environ.get('FIREBASE_ENABLED', 'false').lower() == 'true'
+FIREBASE_INIT_ON_STARTUP = os.environ.get('FIREBASE_INIT_ON_STARTUP', 'false').lower() == 'true'
+firebase = FirebaseApp(
+    enabled=FIREBASE_ENABLED,
+    credentials_path=os.environ.get('FIREBASE_CREDENTIALS') or None,
+    credentials_config=firebase_config,
+)
 
 # JWT Secret for local authentication
 JWT_SECRET = "vibrant_yoga_secret_key_2025"
 JWT_ALGORITHM = "HS256"
 
+# Authenticated-principal cache (saves a users lookup per request, version-stamped across workers)
+principal_cache = PrincipalCache(
+    db,
+    max_size=int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('PRINCIPAL_CACHE_TTL', '30')),
+    version_check_interval=float(os.environ.get('PRINCIPAL_CACHE_VERSION_CHECK_INTERVAL', '1')),
+)
+
+# Rendered responses of the public event endpoints (cleared on event writes)
+event_response_cache = ResponseCache(
+    max_bytes=int(os.environ.get('EVENT_CACHE_MAX_BYTES', str(16 * 1024 * 1024))),
+    ttl=float(os.environ.get('EVENT_CACHE_TTL', '15')),
+)
+EVENT_CACHE_CONTROL = f"public, max-age={int(event_response_cache.ttl)}"
+
+# Password hashing pool (keeps bcrypt off the event loop)
+password_hasher = PasswordHasher(
+    max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '4')),
+    max_queue=int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', '64')),
+    use_processes=os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread') == 'process',
+)
+
 # Custom JSON Encoder for ObjectId
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
@@ -86,8 +184,40 @@ def serialize_doc(doc: dict) -> dict:
     
     return doc
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers on startup and release resources on shutdown"""
+    log_pipeline.capture(UVICORN_LOGGERS)
+    query_profiler.attach(client, asyncio.get_running_loop())
+    if INDEX_MANAGEMENT_ENABLED:
+        await apply_indexes()
+    if EMAIL_WORKER_ENABLED:
+        email_worker.start()
+    if STATS_RECONCILER_ENABLED:
+        dashboard_stats.start()
+    if FIREBASE_ENABLED and FIREBASE_INIT_ON_STARTUP:
+        try:
+            await asyncio.to_thread(firebase.get)
+        except Exception:
+            logger.exception("Firebase initialization failed")
+    yield
+    await dashboard_stats.stop()
+    await email_worker.stop()
+    client.close()
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
+
+def user_id_query(user_ids: List[str]) -> dict:
+    """Match users by app id or by Mongo _id (serialize_doc exposes _id as the id)"""
+    object_ids = [ObjectId(user_id) for user_id in user_ids if ObjectId.is_valid(user_id)]
+    if not object_ids:
+        return {"id": {"$in": user_ids}}
+    return {"$or": [{"id": {"$in": user_ids}}, {"_id": {"$in": object_ids}}]}
+
 # Create the main app
-app = FastAPI(title="Vibrant Yoga API", version="1.0.0")
+app = FastAPI(
+    title="Vibrant Yoga API", version="1.0.0", lifespan=lifespan, default_response_class=FastJSONResponse
+)
 api_router = APIRouter(prefix="/api")
 
 # Set custom JSON encoder
@@ -95,6 +225,7 @@ app.json_encoder = JSONEncoder
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Models
 class User(BaseModel):
@@ -116,11 +247,13 @@ class Event(BaseModel):
     date: str  # YYYY-MM-DD format
     time: str  # HH:MM format
     pricing: Dict[str, float] = Field(default_factory=dict)  # daily, weekly, monthly prices
-    qr_code_base64: Optional[str] = None
+    qr_code_url: Optional[str] = None
+    qr_code_base64: Optional[str] = None  # legacy inline image, see migrate_blobs.py
     upi_id: Optional[str] = None
     is_online: bool = True
     session_link: Optional[str] = None
     capacity: int = 50
+    seats_available: Optional[int] = None  # maintained by SeatAllocator
     waitlist_enabled: bool = True
     delivery_mode: str = "online"  # online, offline, hybrid
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -132,13 +265,39 @@ class Booking(BaseModel):
     event_id: str
     booking_type: str = "daily"  # daily, weekly, monthly
     amount: float
-    payment_proof_base64: Optional[str] = None
+    payment_proof_url: Optional[str] = None
+    payment_proof_base64: Optional[str] = None  # legacy inline image, see migrate_blobs.py
     utr_number: Optional[str] = None
-    status: str = "pending"  # pending, approved, rejected
+    status: str = "pending"  # pending, approved, rejected, waitlisted
+    waitlist_position: Optional[int] = None  # queue order while waitlisted
     admin_notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     approved_at: Optional[datetime] = None
 
+# Event listing: chronological, "upcoming" judged in the studio's timezone
+EVENTS_TIMEZONE = ZoneInfo(os.environ.get('EVENTS_TIMEZONE', 'Asia/Kolkata'))
+EVENT_LIST_SORT = [("date", 1), ("time", 1), ("id", 1)]
+EVENT_HEAVY_FIELDS = {"qr_code_base64"}
+EVENT_SUMMARY_FIELDS = ["id", "title", "description", "date", "time", "pricing", "capacity", "seats_available", "delivery_mode", "is_online"]
+
+# Listing defaults: newest first, inline images only on request
+BOOKING_LIST_SORT = [("created_at", -1), ("id", -1)]
+BOOKING_HEAVY_FIELDS = {"payment_proof_base64"}
+
+# Streaming exports: cursor batch size, inline images never exported
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+BOOKING_EXPORT_FIELDS = [field for field in Booking.model_fields if field not in BOOKING_HEAVY_FIELDS]
+USER_EXPORT_FIELDS = [field for field in User.model_fields if field != "password_hash"]
+
+# Upper bound on bookings changed by one bulk status request
+BULK_STATUS_MAX_ITEMS = int(os.environ.get('BULK_STATUS_MAX_ITEMS', '1000'))
+
+# Read-side shapes: projected in the query and filled with defaults instead of re-validated
+USER_PROJECTION = model_fields_projection(User, exclude=("id", "password_hash"))
+USER_DEFAULTS = model_defaults(User, exclude=("password_hash",))
+EVENT_PROJECTION = {"_id": 0, **model_fields_projection(Event)}
+EVENT_DEFAULTS = model_defaults(Event)
+
 class SMTPSettings(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     mailer_name: str = "Vibrant Yoga"
@@ -181,19 +340,35 @@ class BookingUpdate(BaseModel):
     status: str
     admin_notes: Optional[str] = None
 
+class BulkBookingStatusUpdate(BaseModel):
+    booking_ids: List[str]
+    status: str
+    admin_notes: Optional[str] = None
+
+class EventNotification(BaseModel):
+    subject: str
+    body: str
+    statuses: List[str] = Field(default_factory=lambda: ["approved"])
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
     user: User
 
 # Utility Functions
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def hash_password_pooled(password: str) -> str:
+    """Hash password on the hashing pool, returning 503 when the pool is saturated"""
+    try:
+        return await password_hasher.hash(password)
+    except HashingPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
-def verify_password(password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password_pooled(password: str, hashed_password: str) -> bool:
+    """Verify password on the hashing pool, returning 503 when the pool is saturated"""
+    try:
+        return await password_hasher.verify(password, hashed_password)
+    except HashingPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
 def create_jwt_token(user_data: dict) -> str:
     """Create JWT token for user"""
@@ -203,7 +378,7 @@ def create_jwt_token(user_data: dict) -> str:
         "role": user_data["role"],
         "exp": datetime.utcnow() + timedelta(days=7)
     }
-    print(f"Creating token with payload: {payload}")
+    logger.debug("Issued JWT", extra={"user_id": payload["user_id"], "role": payload["role"], "sample_rate": 0.01})
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 def verify_jwt_token(token: str) -> dict:
@@ -218,20 +393,34 @@ def verify_jwt_token(token: str) -> dict:
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Token verification error: {str(e)}")
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from JWT token"""
+async def resolve_principal(token: str) -> dict:
+    """Resolve a bearer token to its user, through the principal cache"""
     try:
-        token = credentials.credentials
         payload = verify_jwt_token(token)
         
-        # Get user from database
-        user_doc = await db.users.find_one({"id": payload["user_id"]})
-        if not user_doc:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        return serialize_doc(user_doc)
+        # Get user from the principal cache, falling back to the database
+        user_id = payload["user_id"]
+        user_data = await principal_cache.get(user_id)
+        if user_data is None:
+            user_doc = await db.users.find_one(user_id_query([user_id]))
+            if not user_doc:
+                raise HTTPException(status_code=401, detail="User not found")
+            user_data = serialize_doc(user_doc)
+            user_data.pop("password_hash", None)
+            await principal_cache.put(user_id, user_data)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
+    
+    if user_data.get("status") == "suspended":
+        raise HTTPException(status_code=403, detail="Account suspended")
+    
+    return user_data
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current user from JWT token"""
+    return await resolve_principal(credentials.credentials)
 
 async def get_admin_user(current_user: dict = Depends(get_current_user)):
     """Ensure current user is admin"""
@@ -239,44 +428,147 @@ async def get_admin_user(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+async def load_smtp_settings() -> dict:
+    """Load SMTP settings, falling back to defaults"""
+    smtp_settings_raw = await db.smtp_settings.find_one({})
+    if not smtp_settings_raw:
+        # Use default settings
+        return SMTPSettings().dict()
+    return serialize_doc(smtp_settings_raw)
+
+# SMTP settings cache (invalidated by update_smtp_settings, version-stamped across workers)
+smtp_settings_cache = SettingsCache(
+    db,
+    "smtp_settings",
+    load_smtp_settings,
+    ttl=float(os.environ.get('SMTP_SETTINGS_CACHE_TTL', '300')),
+    version_check_interval=float(os.environ.get('SMTP_SETTINGS_VERSION_CHECK_INTERVAL', '5')),
+)
+
+# Index management (applied from lifespan)
+INDEX_MANAGEMENT_ENABLED = os.environ.get('INDEX_MANAGEMENT_ENABLED', 'true').lower() == 'true'
+
+async def apply_indexes():
+    """Create registered indexes and report drift; never blocks startup on failure"""
+    try:
+        result = await ensure_indexes(db)
+        for failure in result["failed"]:
+            logger.error("Index creation failed for %s: %s", failure['index'], failure['error'])
+        drift = await index_drift(db)
+        if drift["missing"] or drift["mismatched"] or drift["unexpected"]:
+            logger.warning("Index drift detected", extra={"drift": drift})
+    except Exception:
+        logger.exception("Index management failed")
+
+# Per-call timeout for concurrent independent queries in handlers
+QUERY_TIMEOUT = float(os.environ.get('QUERY_TIMEOUT', '10'))
+
+async def fan_out(*awaitables):
+    """Await independent queries together; a slow one fails the request with 504"""
+    try:
+        return await gather_with_timeout(*awaitables, timeout=QUERY_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Database query timed out")
+
+# Materialized dashboard counters (periodically reconciled from lifespan)
+STATS_RECONCILER_ENABLED = os.environ.get('STATS_RECONCILER_ENABLED', 'true').lower() == 'true'
+dashboard_stats = DashboardStats(
+    db,
+    reconcile_interval=float(os.environ.get('STATS_RECONCILE_INTERVAL', '600')),
+    query_timeout=QUERY_TIMEOUT,
+)
+
+# Email outbox (delivery happens in the background worker started from lifespan)
+EMAIL_WORKER_ENABLED = os.environ.get('EMAIL_WORKER_ENABLED', 'true').lower() == 'true'
+email_worker = EmailOutboxWorker(
+    db,
+    smtp_settings_cache.get,
+    smtp_pool=SMTPConnectionPool(
+        max_connections=int(os.environ.get('SMTP_POOL_SIZE', '2')),
+        max_idle=float(os.environ.get('SMTP_POOL_MAX_IDLE', '60')),
+    ),
+    batch_size=int(os.environ.get('EMAIL_BATCH_SIZE', '50')),
+    poll_interval=float(os.environ.get('EMAIL_OUTBOX_POLL_INTERVAL', '5')),
+    max_attempts=int(os.environ.get('EMAIL_MAX_ATTEMPTS', '5')),
+    backoff_base=float(os.environ.get('EMAIL_BACKOFF_BASE', '30')),
+)
+
+async def refresh_email_queue_depth():
+    for outbox_status, count in (await email_worker.queue_depth()).items():
+        email_queue_depth.set(count, outbox_status)
+
+metrics_registry.on_scrape(refresh_email_queue_depth)
+
 async def send_email(to_email: str, subject: str, body: str):
-    """Send email using SMTP settings"""
+    """Queue email in the outbox for background delivery"""
     try:
-        smtp_settings_raw = await db.smtp_settings.find_one({})
-        if not smtp_settings_raw:
-            # Use default settings
-            smtp_settings = SMTPSettings().dict()
-        else:
-            smtp_settings = serialize_doc(smtp_settings_raw)
-        
-        msg = MIMEMultipart()
-        msg['From'] = smtp_settings['email']
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        msg.attach(MIMEText(body, 'html'))
-        
-        server = smtplib.SMTP_SSL(smtp_settings['host'], smtp_settings['port'])
-        server.login(smtp_settings['username'], smtp_settings['password'])
-        server.send_message(msg)
-        server.quit()
-        
+        await email_worker.enqueue(to_email, subject, body)
         return True
-    except Exception as e:
-        print(f"Email sending failed: {e}")
+    except Exception:
+        logger.exception("Email queueing failed", extra={"to_email": to_email})
         return False
 
-def convert_image_to_base64(image_data: bytes) -> str:
-    """Convert image bytes to base64 string"""
+# Append-only booking history and the analytics derived from it
+booking_events = BookingEventLog(db)
+
+async def booking_promoted(booking: dict):
+    """Count, log and announce a booking that moved off the waitlist into a seat"""
+    await dashboard_stats.booking_status_changed(
+        booking["event_id"], booking["amount"], "waitlisted", booking["status"]
+    )
+    await booking_events.status_changed({**booking, "status": "waitlisted"}, booking["status"], None)
+    # Best effort: the promotion is already committed, so a slow lookup only costs the email
     try:
-        image = Image.open(BytesIO(image_data))
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        return f"data:image/png;base64,{img_str}"
-    except Exception as e:
-        print(f"Image conversion failed: {e}")
-        return ""
+        user_doc, event_doc = await gather_with_timeout(
+            db.users.find_one(user_id_query([booking["user_id"]]), {"name": 1, "email": 1}),
+            db.events.find_one({"id": booking["event_id"]}, {"_id": 0, "title": 1, "date": 1, "time": 1}),
+            timeout=QUERY_TIMEOUT,
+        )
+    except Exception:
+        logger.exception("Waitlist promotion email lookup failed", extra={"booking_id": booking["id"]})
+        return
+    if user_doc and event_doc:
+        await send_email(
+            user_doc["email"],
+            "A Spot Opened Up - Vibrant Yoga",
+            f"""
+            <h2>You're Off the Waitlist!</h2>
+            <p>Dear {user_doc['name']},</p>
+            <p>A spot opened up for "{event_doc['title']}" on {event_doc['date']} at {event_doc['time']}.</p>
+            <p>Please upload your payment proof to complete the booking.</p>
+            """
+        )
+
+# Seat counters and waitlists
+seat_allocator = SeatAllocator(db, on_promoted=booking_promoted)
+
+async def store_uploaded_image(file: UploadFile, profile: str, owner_id: Optional[str] = None) -> str:
+    """Normalise an uploaded image and put it in the blob store, returning its URL
+
+    The image pipeline reads the multipart parser's own spooled file; nothing is copied first.
+    Who may read the blob back is recorded with it (see BlobRecords).
+    """
+    try:
+        upload = await hash_upload(file, image_pipeline.max_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"Image too large: {e}")
+    
+    url = processed_uploads.get(profile, upload.sha256)
+    if url is None:
+        try:
+            started = time.perf_counter()
+            image = await image_pipeline.process(file.file, profile, size=upload.size)
+            image_processing_seconds.observe(time.perf_counter() - started, profile)
+        except ImageTooLarge as e:
+            raise HTTPException(status_code=413, detail=f"Image too large: {e}")
+        except InvalidImage as e:
+            logger.warning("Image conversion failed: %s", e, extra={"profile": profile})
+            raise HTTPException(status_code=400, detail="Invalid image file")
+        url = blob_url(await blob_store.put(image.data, image.content_type))
+        processed_uploads.put(profile, upload.sha256, url)
+    
+    await blob_records.record(blob_key_from_url(url), private=profile in PRIVATE_IMAGE_PROFILES, owner_id=owner_id)
+    return url
 
 # Authentication Routes
 @api_router.post("/auth/register", response_model=TokenResponse)
@@ -288,7 +580,7 @@ async def register(request: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    password_hash = hash_password(request.password)
+    password_hash = await hash_password_pooled(request.password)
     
     # Create user
     user_data = User(
@@ -298,6 +590,7 @@ async def register(request: UserCreate):
     )
     
     await db.users.insert_one(user_data.dict())
+    await dashboard_stats.user_created()
     
     # Create token
     token = create_jwt_token(user_data.dict())
@@ -322,7 +615,7 @@ async def login(request: UserLogin):
     if "password_hash" not in user_data:
         raise HTTPException(status_code=401, detail="Invalid credentials - no password hash found")
     
-    if not verify_password(request.password, user_data["password_hash"]):
+    if not await verify_password_pooled(request.password, user_data["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create token
@@ -347,14 +640,8 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 @api_router.get("/users", response_model=List[User])
 async def get_users(current_user: dict = Depends(get_admin_user)):
     """Get all users (admin only)"""
-    users_cursor = db.users.find({})
-    users_raw = await users_cursor.to_list(1000)
-    users = []
-    for user_doc in users_raw:
-        user_data = serialize_doc(user_doc)
-        user_data.pop("password_hash", None)
-        users.append(User(**user_data))
-    return users
+    users = await db.users.find({}, USER_PROJECTION).to_list(1000)
+    return FastJSONResponse(as_response_docs(users, USER_DEFAULTS, id_from_object_id=True))
 
 @api_router.put("/users/{user_id}/role")
 async def update_user_role(
@@ -366,27 +653,101 @@ async def update_user_role(
     if role not in ["user", "admin"]:
         raise HTTPException(status_code=400, detail="Invalid role")
     
-    result = await db.users.update_one(
-        {"id": user_id},
+    user_doc = await db.users.find_one_and_update(
+        user_id_query([user_id]),
         {"$set": {"role": role}}
     )
     
-    if result.matched_count == 0:
+    if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
     
+    await principal_cache.invalidate(user_doc["id"], str(user_doc["_id"]))
     return {"message": "User role updated successfully"}
 
+@api_router.put("/users/{user_id}/status")
+async def update_user_status(
+    user_id: str,
+    status: str,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Suspend or reactivate a user (admin only)"""
+    if status not in ["active", "suspended"]:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    user_doc = await db.users.find_one_and_update(
+        user_id_query([user_id]),
+        {"$set": {"status": status}}
+    )
+    
+    if not user_doc:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    await principal_cache.invalidate(user_doc["id"], str(user_doc["_id"]))
+    return {"message": "User status updated successfully"}
+
 # Event Routes
-@api_router.get("/events", response_model=List[Event])
-async def get_events():
-    """Get all upcoming events"""
-    events_cursor = db.events.find({})
-    events_raw = await events_cursor.to_list(1000)
-    events = []
-    for event_doc in events_raw:
-        event_data = serialize_doc(event_doc)
-        events.append(Event(**event_data))
-    return events
+def event_cache_key(request: Request) -> str:
+    return f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+
+def cached_event_response(entry: CachedResponse, if_none_match: Optional[str]) -> Response:
+    """Serve a cached body, or 304 when the client already has this version"""
+    headers = {"ETag": entry.etag, "Cache-Control": EVENT_CACHE_CONTROL, **entry.headers}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+@api_router.get("/events")
+async def get_events(
+    request: Request,
+    date_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    date_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    include_past: bool = False,
+    delivery_mode: Optional[str] = None,
+    is_online: Optional[bool] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get upcoming events in chronological order
+
+    Pass include_past=true for the full schedule history. Paginated by keyset:
+    pass the X-Next-Cursor response header back as `cursor`.
+    """
+    cache_key = event_cache_key(request)
+    entry = event_response_cache.get(cache_key)
+    if entry is not None:
+        return cached_event_response(entry, if_none_match)
+    
+    conditions: List[dict] = []
+    if not include_past:
+        now = datetime.now(EVENTS_TIMEZONE)
+        today, current_time = now.strftime("%Y-%m-%d"), now.strftime("%H:%M")
+        conditions.append({"$or": [
+            {"date": {"$gt": today}},
+            {"date": today, "time": {"$gte": current_time}},
+        ]})
+    if date_from:
+        conditions.append({"date": {"$gte": date_from}})
+    if date_to:
+        conditions.append({"date": {"$lte": date_to}})
+    if delivery_mode:
+        conditions.append({"delivery_mode": delivery_mode})
+    if is_online is not None:
+        conditions.append({"is_online": is_online})
+    query = {"$and": conditions} if conditions else {}
+    
+    fields = ",".join(EVENT_SUMMARY_FIELDS) if view == "summary" else None
+    projection = projection_for(
+        fields, Event.model_fields, default_exclude=EVENT_HEAVY_FIELDS, required=("id", "date", "time")
+    )
+    events, next_cursor = await fetch_page(db.events, query, EVENT_LIST_SORT, limit, projection, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    # Same defaults as get_event for older documents, limited to the fields this view returns
+    defaults = {field: value for field, value in EVENT_DEFAULTS.items() if field in projection}
+    
+    entry = event_response_cache.put(cache_key, dump_json(as_response_docs(events, defaults)), headers)
+    return cached_event_response(entry, if_none_match)
 
 @api_router.post("/events", response_model=Event)
 async def create_event(
@@ -408,22 +769,30 @@ async def create_event(
         is_online=event.is_online,
         session_link=event.session_link,
         capacity=event.capacity,
+        seats_available=event.capacity,
         delivery_mode=event.delivery_mode,
         created_by=current_user["id"]
     )
     
     await db.events.insert_one(event_data.dict())
+    await dashboard_stats.event_created()
+    event_response_cache.invalidate()
     return event_data
 
 @api_router.get("/events/{event_id}", response_model=Event)
-async def get_event(event_id: str):
+async def get_event(request: Request, event_id: str, if_none_match: Optional[str] = Header(None)):
     """Get event by ID"""
-    event_doc = await db.events.find_one({"id": event_id})
+    cache_key = event_cache_key(request)
+    entry = event_response_cache.get(cache_key)
+    if entry is not None:
+        return cached_event_response(entry, if_none_match)
+    
+    event_doc = await db.events.find_one({"id": event_id}, EVENT_PROJECTION)
     if not event_doc:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    event_data = serialize_doc(event_doc)
-    return Event(**event_data)
+    body = dump_json(as_response_docs([event_doc], EVENT_DEFAULTS)[0])
+    return cached_event_response(event_response_cache.put(cache_key, body), if_none_match)
 
 @api_router.post("/events/{event_id}/qr-code")
 async def upload_qr_code(
@@ -433,26 +802,61 @@ async def upload_qr_code(
 ):
     """Upload QR code for event (admin only)"""
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Convert to base64
-        qr_code_base64 = convert_image_to_base64(file_content)
+        # Store image in the blob store
+        qr_code_url = await store_uploaded_image(file, "qr_code")
         
         # Update event
         result = await db.events.update_one(
             {"id": event_id},
-            {"$set": {"qr_code_base64": qr_code_base64}}
+            {"$set": {"qr_code_url": qr_code_url}, "$unset": {"qr_code_base64": ""}}
         )
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Event not found")
+        event_response_cache.invalidate()
         
-        return {"message": "QR code uploaded successfully"}
+        return {"message": "QR code uploaded successfully", "qr_code_url": qr_code_url}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"File upload failed: {str(e)}")
 
+# Blob Routes
+@api_router.get("/blobs/{key}")
+async def get_blob(
+    key: str,
+    if_none_match: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    """Stream an uploaded image from the blob store"""
+    if not is_valid_blob_key(key):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    
+    # Event images are public; payment proofs only for their uploaders and admins
+    record = await blob_records.get(key)
+    is_public = is_public_blob(record)
+    if not is_public:
+        if credentials is None:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        if not can_read_blob(record, await resolve_principal(credentials.credentials)):
+            raise HTTPException(status_code=403, detail="Not authorized to view this file")
+    
+    # Keys are content hashes, so the content behind a key never changes
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": f"{'public' if is_public else 'private'}, max-age=31536000, immutable",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    size = await blob_store.size(key)
+    if size is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(blob_store.stream(key), media_type=blob_content_type(key), headers=headers)
+
 # Booking Routes
 @api_router.post("/bookings", response_model=Booking)
 async def create_booking(
@@ -480,7 +884,28 @@ async def create_booking(
         amount=amount
     )
     
-    await db.bookings.insert_one(booking_data.dict())
+    # Take a seat atomically, or join the waitlist when the event is full
+    try:
+        booking_data = Booking(**await seat_allocator.book(
+            booking_data.dict(), waitlist_enabled=event_data.get("waitlist_enabled", True)
+        ))
+    except EventFull:
+        raise HTTPException(status_code=409, detail="Event is full")
+    await dashboard_stats.booking_created(booking_data.status)
+    await booking_events.booking_created(booking_data.dict(), current_user["id"])
+    
+    if booking_data.status == "waitlisted":
+        await send_email(
+            to_email=current_user["email"],
+            subject="Waitlist Confirmation - Vibrant Yoga",
+            body=f"""
+            <h2>You're on the Waitlist</h2>
+            <p>Dear {current_user['name']},</p>
+            <p>"{event_data['title']}" on {event_data['date']} at {event_data['time']} is currently full.</p>
+            <p>Your {booking.booking_type} booking is on the waitlist and we'll email you as soon as a spot opens up.</p>
+            """
+        )
+        return booking_data
     
     # Send confirmation email
     await send_email(
@@ -518,41 +943,146 @@ async def upload_payment_proof(
         if not booking_doc:
             raise HTTPException(status_code=404, detail="Booking not found")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Convert to base64
-        payment_proof_base64 = convert_image_to_base64(file_content)
+        # Store image in the blob store
+        payment_proof_url = await store_uploaded_image(file, "payment_proof", owner_id=current_user["id"])
         
         # Update booking
         result = await db.bookings.update_one(
             {"id": booking_id, "user_id": current_user["id"]},
             {"$set": {
-                "payment_proof_base64": payment_proof_base64,
+                "payment_proof_url": payment_proof_url,
                 "utr_number": utr_number
-            }}
+            }, "$unset": {"payment_proof_base64": ""}}
         )
+        await booking_events.payment_proof_uploaded(booking_doc, current_user["id"], payment_proof_url, utr_number)
         
-        return {"message": "Payment proof uploaded successfully"}
+        return {"message": "Payment proof uploaded successfully", "payment_proof_url": payment_proof_url}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"File upload failed: {str(e)}")
 
-@api_router.get("/bookings", response_model=List[Booking])
-async def get_bookings(current_user: dict = Depends(get_current_user)):
-    """Get user's bookings"""
-    if current_user["role"] == "admin":
-        bookings_cursor = db.bookings.find({})
-    else:
-        bookings_cursor = db.bookings.find({"user_id": current_user["id"]})
+def build_booking_query(
+    current_user: dict,
+    booking_status: Optional[str] = None,
+    event_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    booking_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> dict:
+    """Mongo filter for booking listings; non-admins only ever see their own bookings"""
+    query: Dict[str, Any] = {}
+    if current_user["role"] != "admin":
+        query["user_id"] = current_user["id"]
+    elif user_id:
+        query["user_id"] = user_id
+    if booking_status:
+        query["status"] = booking_status
+    if event_id:
+        query["event_id"] = event_id
+    if booking_type:
+        query["booking_type"] = booking_type
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    return query
+
+@api_router.get("/bookings")
+async def get_bookings(
+    booking_status: Optional[str] = Query(None, alias="status"),
+    event_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    booking_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get user's bookings (all bookings for admins), newest first
+
+    Paginated by keyset: pass the X-Next-Cursor response header back as `cursor`.
+    """
+    query = build_booking_query(
+        current_user, booking_status, event_id, user_id, booking_type, created_from, created_to
+    )
+    projection = projection_for(
+        fields, Booking.model_fields, default_exclude=BOOKING_HEAVY_FIELDS, required=("id", "created_at")
+    )
+    bookings, next_cursor = await fetch_page(
+        db.bookings, query, BOOKING_LIST_SORT, limit, projection, cursor
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    
+    return FastJSONResponse(bookings, headers=headers)
+
+@api_router.get("/bookings/counts")
+async def get_booking_counts(current_user: dict = Depends(get_current_user)):
+    """Number of the user's bookings (all bookings for admins), in total and per status"""
+    pipeline = [
+        {"$match": build_booking_query(current_user)},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    by_status = {doc["_id"]: doc["count"] async for doc in db.bookings.aggregate(pipeline)}
+    return {"total": sum(by_status.values()), "by_status": by_status}
+
+@api_router.get("/bookings/{booking_id}/timeline")
+async def get_booking_timeline(booking_id: str, current_user: dict = Depends(get_current_user)):
+    """Get the change history of a booking, oldest first"""
+    query = {"id": booking_id}
+    if current_user["role"] != "admin":
+        query["user_id"] = current_user["id"]
+    
+    booking_doc, timeline = await fan_out(
+        db.bookings.find_one(query, {"_id": 1}),
+        booking_events.timeline(booking_id),
+    )
+    if not booking_doc:
+        raise HTTPException(status_code=404, detail="Booking not found")
     
-    bookings_raw = await bookings_cursor.to_list(1000)
-    bookings = []
-    for booking_doc in bookings_raw:
-        booking_data = serialize_doc(booking_doc)
-        bookings.append(Booking(**booking_data))
+    return FastJSONResponse(timeline)
+
+def booking_status_email(user_data: dict, event_data: dict, booking_data: dict,
+                         new_status: str, admin_notes: Optional[str]) -> Tuple[str, str]:
+    """Subject and body of the email telling a user their booking status changed"""
+    if new_status == "approved":
+        subject = "Booking Approved - Vibrant Yoga"
+        body = f"""
+        <h2>Booking Approved!</h2>
+        <p>Dear {user_data['name']},</p>
+        <p>Your {booking_data['booking_type']} booking for "{event_data['title']}" has been approved.</p>
+        <p><strong>Event Details:</strong></p>
+        <ul>
+            <li>Date: {event_data['date']}</li>
+            <li>Time: {event_data['time']}</li>
+            <li>Booking Type: {booking_data['booking_type'].title()}</li>
+            <li>Amount Paid: ₹{booking_data['amount']}</li>
+        </ul>
+        """
+        if event_data.get('is_online') and event_data.get('session_link'):
+            body += f"<p><strong>Join Link:</strong> <a href='{event_data['session_link']}'>{event_data['session_link']}</a></p>"
+        
+        body += "<p>See you in class!</p>"
+        
+    else:  # rejected
+        subject = "Booking Update - Vibrant Yoga"
+        body = f"""
+        <h2>Booking Update</h2>
+        <p>Dear {user_data['name']},</p>
+        <p>Your {booking_data['booking_type']} booking for "{event_data['title']}" requires attention.</p>
+        """
+        if admin_notes:
+            body += f"<p><strong>Note:</strong> {admin_notes}</p>"
+        
+        body += "<p>Please contact us if you have any questions.</p>"
     
-    return bookings
+    return subject, body
 
 @api_router.put("/bookings/{booking_id}/status")
 async def update_booking_status(
@@ -564,115 +1094,241 @@ async def update_booking_status(
     if update.status not in ["pending", "approved", "rejected"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    # Get booking details
-    booking_doc = await db.bookings.find_one({"id": booking_id})
-    if not booking_doc:
+    current = await db.bookings.find_one({"id": booking_id}, {"_id": 0, "status": 1, "event_id": 1})
+    if not current:
         raise HTTPException(status_code=404, detail="Booking not found")
     
-    booking_data = serialize_doc(booking_doc)
+    # Waitlisted or rejected bookings need a free seat before they can be reinstated
+    needs_seat = update.status in SEAT_HOLDING_STATUSES and current["status"] not in SEAT_HOLDING_STATUSES
+    if needs_seat and not await seat_allocator.acquire(current["event_id"]):
+        raise HTTPException(status_code=409, detail="Event is full")
     
-    # Update booking
+    # Update booking, keeping the previous version for the dashboard counters
     update_data = {"status": update.status}
     if update.admin_notes:
         update_data["admin_notes"] = update.admin_notes
     if update.status == "approved":
         update_data["approved_at"] = datetime.utcnow()
     
-    await db.bookings.update_one(
-        {"id": booking_id},
-        {"$set": update_data}
+    booking_doc = await db.bookings.find_one_and_update(
+        {"id": booking_id, "status": current["status"]},
+        {"$set": update_data, "$unset": {"waitlist_position": ""}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
     )
+    if not booking_doc:
+        if needs_seat:
+            await seat_allocator.release(current["event_id"])
+        raise HTTPException(status_code=409, detail="Booking was updated concurrently, please retry")
+    
+    booking_data = serialize_doc(booking_doc)
+    await dashboard_stats.booking_status_changed(
+        booking_data["event_id"], booking_data["amount"], booking_data["status"], update.status
+    )
+    await booking_events.status_changed(booking_data, update.status, current_user["id"], update.admin_notes)
+    
+    # A rejected booking frees its seat for the head of the waitlist
+    if booking_data["status"] in SEAT_HOLDING_STATUSES and update.status not in SEAT_HOLDING_STATUSES:
+        await seat_allocator.release(booking_data["event_id"])
     
     # Get user and event details for email
-    user_doc = await db.users.find_one({"id": booking_data["user_id"]})
-    event_doc = await db.events.find_one({"id": booking_data["event_id"]})
+    user_doc, event_doc = await fan_out(
+        db.users.find_one(user_id_query([booking_data["user_id"]])),
+        db.events.find_one({"id": booking_data["event_id"]}),
+    )
     
     if user_doc and event_doc:
-        user_data = serialize_doc(user_doc)
-        event_data = serialize_doc(event_doc)
-        
-        if update.status == "approved":
-            subject = "Booking Approved - Vibrant Yoga"
-            body = f"""
-            <h2>Booking Approved!</h2>
-            <p>Dear {user_data['name']},</p>
-            <p>Your {booking_data['booking_type']} booking for "{event_data['title']}" has been approved.</p>
-            <p><strong>Event Details:</strong></p>
-            <ul>
-                <li>Date: {event_data['date']}</li>
-                <li>Time: {event_data['time']}</li>
-                <li>Booking Type: {booking_data['booking_type'].title()}</li>
-                <li>Amount Paid: ₹{booking_data['amount']}</li>
-            </ul>
-            """
-            if event_data.get('is_online') and event_data.get('session_link'):
-                body += f"<p><strong>Join Link:</strong> <a href='{event_data['session_link']}'>{event_data['session_link']}</a></p>"
-            
-            body += "<p>See you in class!</p>"
-            
-        else:  # rejected
-            subject = "Booking Update - Vibrant Yoga"
-            body = f"""
-            <h2>Booking Update</h2>
-            <p>Dear {user_data['name']},</p>
-            <p>Your {booking_data['booking_type']} booking for "{event_data['title']}" requires attention.</p>
-            """
-            if update.admin_notes:
-                body += f"<p><strong>Note:</strong> {update.admin_notes}</p>"
-            
-            body += "<p>Please contact us if you have any questions.</p>"
-        
-        await send_email(user_data['email'], subject, body)
+        subject, body = booking_status_email(
+            serialize_doc(user_doc), serialize_doc(event_doc), booking_data, update.status, update.admin_notes
+        )
+        await send_email(user_doc['email'], subject, body)
     
     return {"message": "Booking status updated successfully"}
 
+@api_router.post("/admin/bookings/bulk-status")
+async def bulk_update_booking_status(
+    update: BulkBookingStatusUpdate,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Apply one status to many bookings with batched writes and queued emails (admin only)
+
+    Each booking gets a result: updated, unchanged, not_found, event_full or
+    conflict (changed by someone else while this request ran).
+    """
+    if update.status not in ["pending", "approved", "rejected"]:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    booking_ids = list(dict.fromkeys(update.booking_ids))
+    if len(booking_ids) > BULK_STATUS_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_STATUS_MAX_ITEMS} bookings per request")
+    
+    projection = projection_for(None, Booking.model_fields, default_exclude=BOOKING_HEAVY_FIELDS)
+    current = {doc["id"]: doc async for doc in db.bookings.find({"id": {"$in": booking_ids}}, projection)}
+    results: Dict[str, str] = {}
+    for booking_id in booking_ids:
+        if booking_id not in current:
+            results[booking_id] = "not_found"
+        elif current[booking_id]["status"] == update.status:
+            results[booking_id] = "unchanged"
+    
+    # Waitlisted or rejected bookings need a free seat before they can be reinstated;
+    # each event's seats are reserved with one conditional $inc, in request order
+    needing_seats: Dict[str, List[str]] = {}
+    for booking_id in booking_ids:
+        booking = current.get(booking_id)
+        if booking_id in results or update.status not in SEAT_HOLDING_STATUSES or booking["status"] in SEAT_HOLDING_STATUSES:
+            continue
+        needing_seats.setdefault(booking["event_id"], []).append(booking_id)
+    seated = set()
+    for event_id, event_booking_ids in needing_seats.items():
+        granted = await seat_allocator.acquire_many(event_id, len(event_booking_ids))
+        seated.update(event_booking_ids[:granted])
+        for booking_id in event_booking_ids[granted:]:
+            results[booking_id] = "event_full"
+    candidates = [current[booking_id] for booking_id in booking_ids if booking_id not in results]
+    
+    # One unordered bulk write; each filter pins the status we read so concurrent edits are
+    # detected, and the token marks which documents this request changed
+    update_token = str(uuid.uuid4())
+    update_data = {"status": update.status, "status_update_token": update_token}
+    if update.admin_notes:
+        update_data["admin_notes"] = update.admin_notes
+    if update.status == "approved":
+        update_data["approved_at"] = datetime.utcnow()
+    settled = set()
+    if candidates:
+        await db.bookings.bulk_write([
+            UpdateOne(
+                {"id": booking["id"], "status": booking["status"]},
+                {"$set": update_data, "$unset": {"waitlist_position": ""}}
+            )
+            for booking in candidates
+        ], ordered=False)
+        settled = {
+            doc["id"] async for doc in db.bookings.find(
+                {"id": {"$in": [booking["id"] for booking in candidates]}, "status_update_token": update_token},
+                {"_id": 0, "id": 1}
+            )
+        }
+    
+    changed, seats_to_release = [], {}
+    for booking in candidates:
+        if booking["id"] in settled:
+            results[booking["id"]] = "updated"
+            changed.append(booking)
+            if booking["status"] in SEAT_HOLDING_STATUSES and update.status not in SEAT_HOLDING_STATUSES:
+                seats_to_release[booking["event_id"]] = seats_to_release.get(booking["event_id"], 0) + 1
+        else:
+            results[booking["id"]] = "conflict"
+            if booking["id"] in seated:
+                seats_to_release[booking["event_id"]] = seats_to_release.get(booking["event_id"], 0) + 1
+    
+    await dashboard_stats.booking_statuses_changed(
+        (booking["event_id"], booking["amount"], booking["status"], update.status) for booking in changed
+    )
+    await booking_events.statuses_changed(changed, update.status, current_user["id"], update.admin_notes)
+    for event_id, seats in seats_to_release.items():
+        await seat_allocator.release(event_id, seats)
+    
+    # Related users and events with one $in query each, emails queued as one batch
+    users, events = await fan_out(
+        db.users.find(
+            user_id_query(list({booking["user_id"] for booking in changed})), {"id": 1, "name": 1, "email": 1}
+        ).to_list(None),
+        db.events.find(
+            {"id": {"$in": list({booking["event_id"] for booking in changed})}},
+            {"_id": 0, "id": 1, "title": 1, "date": 1, "time": 1, "is_online": 1, "session_link": 1}
+        ).to_list(None),
+    )
+    users_by_id = {}
+    for user in users:
+        users_by_id[str(user["_id"])] = users_by_id[user.get("id")] = user
+    events_by_id = {event["id"]: event for event in events}
+    
+    messages = []
+    for booking in changed:
+        user, event = users_by_id.get(booking["user_id"]), events_by_id.get(booking["event_id"])
+        if user and event:
+            subject, body = booking_status_email(user, event, booking, update.status, update.admin_notes)
+            messages.append((user["email"], subject, body))
+    queued = await email_worker.enqueue_many(messages)
+    
+    return {
+        "status": update.status,
+        "updated": len(changed),
+        "queued_emails": queued,
+        "results": [{"booking_id": booking_id, "result": results[booking_id]} for booking_id in booking_ids],
+    }
+
+@api_router.post("/admin/events/{event_id}/notify")
+async def notify_event_bookings(
+    event_id: str,
+    notification: EventNotification,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Queue an email to every booking of an event in the given statuses (admin only)"""
+    event_doc, bookings = await fan_out(
+        db.events.find_one({"id": event_id}, {"_id": 0, "id": 1}),
+        db.bookings.find(
+            {"event_id": event_id, "status": {"$in": notification.statuses}},
+            {"_id": 0, "user_id": 1}
+        ).to_list(None),
+    )
+    if not event_doc:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    user_ids = list({booking["user_id"] for booking in bookings})
+    
+    users_cursor = db.users.find(user_id_query(user_ids), {"_id": 0, "name": 1, "email": 1})
+    messages = [
+        (user["email"], notification.subject, f"<p>Dear {user['name']},</p>{notification.body}")
+        async for user in users_cursor
+    ]
+    queued = await email_worker.enqueue_many(messages)
+    
+    return {"message": "Notifications queued", "queued": queued}
+
 # Admin Dashboard Routes
 @api_router.get("/admin/dashboard")
 async def get_admin_dashboard(current_user: dict = Depends(get_admin_user)):
     """Get admin dashboard data"""
-    total_users = await db.users.count_documents({})
-    total_events = await db.events.count_documents({})
-    total_bookings = await db.bookings.count_documents({})
-    pending_bookings = await db.bookings.count_documents({"status": "pending"})
-    approved_bookings = await db.bookings.count_documents({"status": "approved"})
-    
-    # Calculate revenue
-    revenue_cursor = db.bookings.aggregate([
-        {"$match": {"status": "approved"}},
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$amount"}}}
-    ])
-    revenue_result = await revenue_cursor.to_list(1)
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
-    
-    # Get recent bookings
-    recent_bookings_cursor = db.bookings.find().sort("created_at", -1).limit(10)
-    recent_bookings_raw = await recent_bookings_cursor.to_list(10)
-    recent_bookings = []
-    
-    for booking in recent_bookings_raw:
-        recent_bookings.append(serialize_doc(booking))
+    # Counters and recent bookings are independent reads
+    stats, recent_bookings = await fan_out(
+        dashboard_stats.read(),
+        db.bookings.find(
+            {}, projection_for(None, Booking.model_fields, default_exclude=BOOKING_HEAVY_FIELDS)
+        ).sort(BOOKING_LIST_SORT).limit(10).to_list(10),
+    )
+    status_counts = stats.get("status_counts", {})
     
     return {
-        "total_users": total_users,
-        "total_events": total_events,
-        "total_bookings": total_bookings,
-        "pending_bookings": pending_bookings,
-        "approved_bookings": approved_bookings,
-        "total_revenue": total_revenue,
+        "total_users": stats.get("total_users", 0),
+        "total_events": stats.get("total_events", 0),
+        "total_bookings": stats.get("total_bookings", 0),
+        "pending_bookings": status_counts.get("pending", 0),
+        "approved_bookings": status_counts.get("approved", 0),
+        "waitlisted_bookings": status_counts.get("waitlisted", 0),
+        "total_revenue": stats.get("approved_revenue", 0),
+        "revenue_by_event": stats.get("event_revenue", {}),
         "recent_bookings": recent_bookings
     }
 
+@api_router.get("/admin/booking-analytics")
+async def get_booking_analytics(
+    days: int = Query(30, ge=1, le=366),
+    current_user: dict = Depends(get_admin_user)
+):
+    """Get time-to-approval percentiles and per-admin throughput from the booking event log (admin only)"""
+    approval_latency, admin_throughput = await fan_out(
+        booking_events.approval_latency(),
+        booking_events.admin_throughput(days),
+    )
+    return {"time_to_approval": approval_latency, "admin_throughput": admin_throughput, "days": days}
+
 # SMTP Settings Routes
 @api_router.get("/admin/smtp-settings")
 async def get_smtp_settings(current_user: dict = Depends(get_admin_user)):
     """Get SMTP settings (admin only)"""
-    settings_raw = await db.smtp_settings.find_one({})
-    if not settings_raw:
-        # Return default settings
-        return SMTPSettings().dict()
-    
-    settings = serialize_doc(settings_raw)
-    return settings
+    return await smtp_settings_cache.get()
 
 @api_router.post("/admin/smtp-settings")
 async def update_smtp_settings(
@@ -682,8 +1338,149 @@ async def update_smtp_settings(
     """Update SMTP settings (admin only)"""
     await db.smtp_settings.delete_many({})  # Remove old settings
     await db.smtp_settings.insert_one(settings.dict())
+    await smtp_settings_cache.invalidate()
     return {"message": "SMTP settings updated successfully"}
 
+@api_router.get("/admin/runtime-stats")
+async def get_runtime_stats(current_user: dict = Depends(get_admin_user)):
+    """Get in-process worker pool and cache statistics (admin only)"""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "email_outbox": email_worker.stats(),
+        "smtp_settings_cache": smtp_settings_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "event_response_cache": event_response_cache.stats(),
+        "image_pipeline": image_pipeline.stats(),
+        "firebase": firebase.stats(),
+        "logging": log_pipeline.stats(),
+    }
+
+@api_router.get("/admin/query-profile")
+async def get_query_profile(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("total_ms", pattern=f"^({'|'.join(TOP_SORT_FIELDS)})$"),
+    current_user: dict = Depends(get_admin_user),
+):
+    """Top Mongo query shapes per route, by total time unless `sort` says otherwise (admin only)"""
+    if not QUERY_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Query profiler is disabled")
+    return query_profiler.top(limit, sort)
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(limit: int = Query(50, ge=1, le=1000), current_user: dict = Depends(get_admin_user)):
+    """Most recent Mongo commands slower than SLOW_QUERY_MS, newest first (admin only)"""
+    if not QUERY_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Query profiler is disabled")
+    return query_profiler.slow_queries(limit)
+
+@api_router.delete("/admin/query-profile")
+async def reset_query_profile(current_user: dict = Depends(get_admin_user)):
+    """Clear the collected query shapes and slow-query log (admin only)"""
+    query_profiler.reset()
+    return {"message": "Query profile reset"}
+
+# On-demand request profiling (middleware is only installed when REQUEST_PROFILING_ENABLED=true)
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL_MS', '5')) / 1000
+
+async def profiling_admin(token: str) -> Optional[dict]:
+    """The admin behind a bearer token, or None (the request is then served unprofiled)"""
+    try:
+        user = await resolve_principal(token)
+    except HTTPException:
+        return None
+    return user if user.get("role") == "admin" else None
+
+async def store_request_profile(profile: dict):
+    await db.request_profiles.insert_one(profile)
+
+@api_router.get("/admin/profiles")
+async def list_request_profiles(limit: int = Query(20, ge=1, le=200), current_user: dict = Depends(get_admin_user)):
+    """Recently captured request profiles without their stacks (admin only)"""
+    return await db.request_profiles.find({}, {"_id": 0, "stacks": 0}).sort("created_at", -1).to_list(limit)
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    profile_format: str = Query("speedscope", alias="format", pattern="^(speedscope|collapsed)$"),
+    current_user: dict = Depends(get_admin_user),
+):
+    """A captured profile as speedscope JSON or collapsed stacks for flamegraph tools (admin only)"""
+    profile = await db.request_profiles.find_one({"id": profile_id}, {"_id": 0})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if profile_format == "collapsed":
+        return Response(to_collapsed(profile["stacks"]), media_type="text/plain; charset=utf-8")
+    return to_speedscope(profile)
+
+@api_router.delete("/admin/profiles/{profile_id}")
+async def delete_request_profile(profile_id: str, current_user: dict = Depends(get_admin_user)):
+    """Delete a captured profile (admin only)"""
+    result = await db.request_profiles.delete_one({"id": profile_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"message": "Profile deleted"}
+
+@api_router.post("/admin/dashboard/reconcile")
+async def reconcile_dashboard(current_user: dict = Depends(get_admin_user)):
+    """Recompute dashboard counters from the collections (admin only)"""
+    await dashboard_stats.reconcile()
+    return {"message": "Dashboard counters reconciled"}
+
+@api_router.get("/admin/indexes")
+async def get_index_report(current_user: dict = Depends(get_admin_user)):
+    """Compare live indexes with the index registry (admin only)"""
+    return await index_drift(db)
+
+# Export Routes
+@api_router.get("/admin/export/bookings")
+async def export_bookings(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    booking_status: Optional[str] = Query(None, alias="status"),
+    event_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    booking_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Stream every matching booking as NDJSON or CSV, newest first (admin only)"""
+    query = build_booking_query(
+        current_user, booking_status, event_id, user_id, booking_type, created_from, created_to
+    )
+    cursor = db.bookings.find(
+        query, projection_for(None, BOOKING_EXPORT_FIELDS)
+    ).sort(BOOKING_LIST_SORT).batch_size(EXPORT_BATCH_SIZE)
+    return export_response(cursor, export_format, BOOKING_EXPORT_FIELDS, "bookings")
+
+@api_router.get("/admin/export/users")
+async def export_users(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    role: Optional[str] = None,
+    user_status: Optional[str] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Stream every matching user as NDJSON or CSV, without password hashes (admin only)"""
+    query: Dict[str, Any] = {}
+    if role:
+        query["role"] = role
+    if user_status:
+        query["status"] = user_status
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    
+    def shape(doc: dict) -> dict:
+        return as_response_docs([doc], USER_DEFAULTS, id_from_object_id=True)[0]
+    
+    cursor = db.users.find(query, USER_PROJECTION).batch_size(EXPORT_BATCH_SIZE)
+    return export_response(cursor, export_format, USER_EXPORT_FIELDS, "users", transform=shape)
+
 # Initialize default admin user
 @api_router.post("/admin/init")
 async def initialize_admin():
@@ -697,11 +1494,12 @@ async def initialize_admin():
     admin_data = User(
         name="Admin User",
         email="admin@vibrantyoga.com",
-        password_hash=hash_password("admin123"),
+        password_hash=await hash_password_pooled("admin123"),
         role="admin"
     )
     
     await db.users.insert_one(admin_data.dict())
+    await dashboard_stats.user_created()
     return {"message": "Admin user created successfully"}
 
 # Health check
@@ -710,9 +1508,21 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+@api_router.get("/metrics")
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics for this worker (bearer METRICS_TOKEN when configured)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(await metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Include router
 app.include_router(api_router)
 
+# Refuse oversized uploads before the multipart parser stores them
+app.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=image_pipeline.max_bytes + MULTIPART_OVERHEAD_BYTES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -720,15 +1530,14 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+if REQUEST_PROFILING_ENABLED:
+    app.add_middleware(
+        RequestProfilingMiddleware, authorize=profiling_admin, store=store_request_profile, interval=PROFILE_INTERVAL
+    )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+# Outermost, so the request context covers CORS and error handling too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, http_metrics=http_metrics)
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SettingsCache:
+    """In-process cache for a settings document with TTL and a cross-worker version stamp
+
+    Each worker keeps its own copy. Writers call `invalidate()`, which drops the local
+    copy and bumps a version stamp in `settings_versions`; other workers compare that
+    stamp at most once per `version_check_interval` and reload when it moved.
+    """
+
+    def __init__(
+        self,
+        db,
+        name: str,
+        loader: Callable[[], Awaitable[dict]],
+        ttl: float = 300.0,
+        version_check_interval: float = 5.0,
+    ):
+        self.db = db
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._value: Optional[dict] = None
+        self._version: int = 0
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._stats = {"hits": 0, "loads": 0, "version_checks": 0, "invalidations": 0}
+
+    async def _read_version(self) -> int:
+        stamp = await self.db.settings_versions.find_one({"_id": self.name})
+        return stamp["version"] if stamp else 0
+
+    async def _load(self, now: float):
+        version = await self._read_version()
+        self._value = await self.loader()
+        self._version = version
+        self._loaded_at = self._checked_at = now
+        self._stats["loads"] += 1
+
+    async def get(self) -> dict:
+        """Return the cached settings, reloading when expired or changed elsewhere"""
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < self.version_check_interval:
+            self._stats["hits"] += 1
+            return dict(self._value)
+
+        async with self._lock:
+            now = time.monotonic()
+            if self._value is None or now - self._loaded_at >= self.ttl:
+                await self._load(now)
+            elif now - self._checked_at >= self.version_check_interval:
+                self._stats["version_checks"] += 1
+                if await self._read_version() != self._version:
+                    await self._load(now)
+                else:
+                    self._checked_at = now
+            else:
+                self._stats["hits"] += 1
+            return dict(self._value)
+
+    async def invalidate(self):
+        """Drop the local copy and bump the shared version stamp"""
+        # Under the lock, so a load already in flight cannot put the old value back
+        async with self._lock:
+            self._value = None
+            self._stats["invalidations"] += 1
+            await self.db.settings_versions.update_one(
+                {"_id": self.name}, {"$inc": {"version": 1}}, upsert=True
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters"""
+        return {"cached": self._value is not None, "version": self._version, **self._stats}
@@ -0,0 +1,206 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+# smtplib and email.mime are imported on first send so they stay off the worker start-up path
+if TYPE_CHECKING:
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+
+
+def smtp_errors() -> Tuple[tuple, tuple]:
+    """(errors that reject a single message, errors that mean the session is unusable)"""
+    import smtplib
+
+    return (
+        (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError),
+        (smtplib.SMTPException, OSError),
+    )
+
+def build_message(smtp_settings: dict, to_email: str, subject: str, body: str) -> "MIMEMultipart":
+    """Build an HTML email message from SMTP settings"""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['From'] = smtp_settings['email']
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg
+
+def open_smtp_connection(smtp_settings: dict, timeout: float = 30.0) -> "smtplib.SMTP":
+    """Open an authenticated SMTP connection honouring the configured encryption"""
+    import smtplib
+
+    encryption = (smtp_settings.get('encryption') or 'SSL').upper()
+    if encryption == 'SSL':
+        server = smtplib.SMTP_SSL(smtp_settings['host'], smtp_settings['port'], timeout=timeout)
+    else:
+        server = smtplib.SMTP(smtp_settings['host'], smtp_settings['port'], timeout=timeout)
+        if encryption in ('TLS', 'STARTTLS'):
+            server.starttls()
+    if smtp_settings.get('username') and server.has_extn('auth'):
+        server.login(smtp_settings['username'], smtp_settings['password'])
+    return server
+
+def settings_key(smtp_settings: dict) -> Tuple:
+    """Identity of an SMTP account; pooled sessions are only reused for the same key"""
+    return (
+        smtp_settings.get('host'),
+        smtp_settings.get('port'),
+        smtp_settings.get('username'),
+        smtp_settings.get('password'),
+        (smtp_settings.get('encryption') or 'SSL').upper(),
+    )
+
+
+class PooledConnection:
+    def __init__(self, key: Tuple, server: "smtplib.SMTP"):
+        self.key = key
+        self.server = server
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP sessions alive and reuses them across messages
+
+    All methods are blocking and are meant to be called from worker threads.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 2,
+        max_idle: float = 60.0,
+        max_messages_per_connection: int = 100,
+        timeout: float = 30.0,
+    ):
+        self.max_connections = max_connections
+        self.max_idle = max_idle
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._stats = {"connections_opened": 0, "reconnects": 0, "messages_sent": 0, "messages_failed": 0}
+
+    def _connect(self, smtp_settings: dict, key: Tuple) -> PooledConnection:
+        server = open_smtp_connection(smtp_settings, timeout=self.timeout)
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return PooledConnection(key, server)
+
+    def _is_alive(self, conn: PooledConnection) -> bool:
+        if time.monotonic() - conn.last_used < self.max_idle:
+            return True
+        try:
+            return conn.server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self, smtp_settings: dict) -> PooledConnection:
+        key = settings_key(smtp_settings)
+        stale = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if candidate.key == key:
+                    conn = candidate
+                    break
+                stale.append(candidate)
+        for old in stale:
+            old.close()
+        if conn is not None and not self._is_alive(conn):
+            conn.close()
+            conn = None
+            with self._lock:
+                self._stats["reconnects"] += 1
+        if conn is None:
+            conn = self._connect(smtp_settings, key)
+        return conn
+
+    def _release(self, conn: PooledConnection):
+        conn.last_used = time.monotonic()
+        if conn.messages_sent >= self.max_messages_per_connection:
+            conn.close()
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def send_batch(self, smtp_settings: dict, messages: List[Tuple[str, str, str]]) -> List[Optional[Exception]]:
+        """Send (to_email, subject, body) messages over one session; returns one error (or None) per message"""
+        message_errors, connection_errors = smtp_errors()
+        results: List[Optional[Exception]] = []
+        self._slots.acquire()
+        conn = None
+        try:
+            for index, (to_email, subject, body) in enumerate(messages):
+                msg = build_message(smtp_settings, to_email, subject, body)
+                error = None
+                for attempt in range(2):
+                    try:
+                        if conn is None:
+                            conn = self._acquire(smtp_settings)
+                        conn.server.send_message(msg)
+                        conn.messages_sent += 1
+                        error = None
+                        break
+                    except message_errors as e:
+                        # Rejected by the server; the session itself is still fine
+                        error = e
+                        break
+                    except connection_errors as e:
+                        # Session went stale mid-batch: reopen once and retry this message
+                        error = e
+                        if conn is not None:
+                            conn.close()
+                            conn = None
+                        with self._lock:
+                            self._stats["reconnects"] += 1
+                with self._lock:
+                    self._stats["messages_failed" if error else "messages_sent"] += 1
+                results.append(error)
+                if conn is None and error is not None:
+                    # Could not (re)connect: fail the rest of the batch without hammering the server
+                    remaining = len(messages) - index - 1
+                    results.extend([error] * remaining)
+                    with self._lock:
+                        self._stats["messages_failed"] += remaining
+                    break
+                if conn is not None and conn.messages_sent >= self.max_messages_per_connection:
+                    conn.close()
+                    conn = None
+        finally:
+            if conn is not None:
+                self._release(conn)
+            self._slots.release()
+        return results
+
+    def send(self, smtp_settings: dict, to_email: str, subject: str, body: str):
+        """Send a single message, raising on failure"""
+        error = self.send_batch(smtp_settings, [(to_email, subject, body)])[0]
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Close every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters"""
+        with self._lock:
+            return {"idle_connections": len(self._idle), **self._stats}
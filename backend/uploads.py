@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+CHUNK_SIZE = 64 * 1024
+# Room for multipart boundaries, part headers and small text fields next to the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload is over the size limit"""
+
+
+@dataclass
+class UploadDigest:
+    size: int
+    sha256: str
+
+
+def _hash_file(file: BinaryIO, max_bytes: int, chunk_size: int) -> UploadDigest:
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        digest.update(chunk)
+    file.seek(0)
+    return UploadDigest(size=size, sha256=digest.hexdigest())
+
+async def hash_upload(file: UploadFile, max_bytes: int, chunk_size: int = CHUNK_SIZE) -> UploadDigest:
+    """Size and hash the multipart parser's spooled file in one worker-thread pass, then rewind it
+
+    The file itself is handed to the image pipeline as is; only one chunk is held in memory here.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f"Upload is {file.size} bytes, limit is {max_bytes}")
+    return await asyncio.to_thread(_hash_file, file.file, max_bytes, chunk_size)
+
+
+class UploadSizeLimitMiddleware:
+    """Rejects multipart bodies over `max_body_bytes` with 413 before the form is parsed
+
+    Starlette's multipart parser stores every file part before a handler runs, so the
+    limit has to apply to the request body itself: a larger Content-Length is refused
+    without reading anything, and bodies without one are cut off once they pass the limit.
+    """
+
+    def __init__(self, app, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            response = JSONResponse({"detail": f"Upload exceeds {self.max_body_bytes} bytes"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes a 413
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {self.max_body_bytes} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class ProcessedUploadIndex:
+    """Remembers which blob an identical upload produced, so re-uploads skip image processing"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+
+    def get(self, profile: str, sha256: str) -> Optional[str]:
+        key = (profile, sha256)
+        url = self._entries.get(key)
+        if url is not None:
+            self._entries.move_to_end(key)
+        return url
+
+    def put(self, profile: str, sha256: str, url: str):
+        self._entries[(profile, sha256)] = url
+        self._entries.move_to_end((profile, sha256))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Authenticated request latency with and without the principal cache.
+
+Drives GET /api/users/me in-process through httpx's ASGI transport. Uses the
+MONGO_URL from backend/.env by default; pass --mongomock to run without mongod:
+
+    python benchmarks/bench_auth_cache.py --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+async def measure(client, headers, requests):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get("/api/users/me", headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return {
+        "requests": requests,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+async def run(args):
+    if args.mongomock:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import httpx
+    import server
+
+    server.db = server.client[f"bench_auth_cache_{int(time.time())}"]
+    user = server.User(name="Bench User", email="bench@example.com")
+    await server.db.users.insert_one(user.dict())
+    headers = {"Authorization": f"Bearer {server.create_jwt_token(user.dict())}"}
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, max_size in (("without_cache", 0), ("with_cache", 10000)):
+            server.principal_cache.max_size = max_size
+            server.principal_cache.clear()
+            await measure(client, headers, min(args.requests, 100))  # warm-up
+            results[name] = await measure(client, headers, args.requests)
+        results["with_cache"]["cache"] = server.principal_cache.stats()
+
+    if not args.mongomock:
+        await server.client.drop_database(server.db.name)
+    print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
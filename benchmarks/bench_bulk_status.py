@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Wall-clock time to approve N bookings: one bulk-status request vs N single-status requests.
+
+Runs the app in-process against MONGO_URL (or mongomock-motor) with the email
+worker disabled, so queued notifications are written but not sent:
+
+    python benchmarks/bench_bulk_status.py --bookings 1000
+    python benchmarks/bench_bulk_status.py --bookings 1000 --mongomock
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+async def seed(server, db, count):
+    admin = server.User(name="Admin", email="admin@example.com", role="admin")
+    members = [server.User(name=f"Member {i}", email=f"member{i}@example.com") for i in range(count)]
+    event = server.Event(title="Morning Flow", description="", date="2099-01-01", time="07:00",
+                         pricing={"daily": 100.0}, capacity=count, seats_available=0, created_by=admin.id)
+    bookings = [server.Booking(user_id=m.id, event_id=event.id, amount=100.0) for m in members]
+    await db.users.insert_many([admin.dict()] + [m.dict() for m in members])
+    await db.events.insert_one(event.dict())
+    await db.bookings.insert_many([b.dict() for b in bookings])
+    return admin, [b.id for b in bookings]
+
+
+async def run(args):
+    os.environ["EMAIL_WORKER_ENABLED"] = "false"
+    os.environ["STATS_RECONCILER_ENABLED"] = "false"
+    if args.mongomock:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import httpx
+    import server
+
+    results = {"bookings": args.bookings}
+    transport = httpx.ASGITransport(app=server.app)
+    for mode in ("bulk", "single"):
+        db = server.client[f"bench_bulk_status_{mode}_{int(time.time())}"]
+        for component in (server, server.dashboard_stats, server.seat_allocator,
+                          server.booking_events, server.email_worker):
+            component.db = db
+        admin, booking_ids = await seed(server, db, args.bookings)
+        headers = {"Authorization": f"Bearer {server.create_jwt_token(admin.dict())}"}
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            started = time.perf_counter()
+            if mode == "bulk":
+                response = await client.post("/api/admin/bookings/bulk-status",
+                                             json={"booking_ids": booking_ids, "status": "approved"})
+                response.raise_for_status()
+                assert response.json()["updated"] == args.bookings
+            else:
+                for booking_id in booking_ids:
+                    response = await client.put(f"/api/bookings/{booking_id}/status", json={"status": "approved"})
+                    response.raise_for_status()
+            elapsed = time.perf_counter() - started
+
+        results[f"{mode}_seconds"] = round(elapsed, 3)
+        results[f"{mode}_queued_emails"] = await db.email_outbox.count_documents({})
+        if not args.mongomock:
+            await server.client.drop_database(db.name)
+
+    results["speedup"] = round(results["single_seconds"] / results["bulk_seconds"], 1)
+    print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
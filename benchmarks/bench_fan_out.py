@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Per-endpoint wall-clock time with sequential vs concurrent independent queries.
+
+Every Mongo call is delayed by --latency-ms to model a remote database, which is
+where awaiting independent queries one after another hurts most:
+
+    python benchmarks/bench_fan_out.py --latency-ms 5 --requests 50
+    python benchmarks/bench_fan_out.py --mongomock --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+ASYNC_METHODS = {
+    "find_one", "find_one_and_update", "insert_one", "insert_many", "update_one",
+    "update_many", "replace_one", "count_documents", "delete_many",
+}
+
+
+class DelayedCursor:
+    def __init__(self, cursor, latency):
+        self._cursor = cursor
+        self._latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name in ("sort", "limit", "skip", "batch_size"):
+            return lambda *a, **kw: DelayedCursor(attr(*a, **kw), self._latency)
+        return attr
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self._latency)
+        return await self._cursor.to_list(length)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await asyncio.sleep(self._latency)
+        async for doc in self._cursor:
+            yield doc
+
+
+class DelayedCollection:
+    def __init__(self, collection, latency):
+        self._collection = collection
+        self._latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in ASYNC_METHODS:
+            async def delayed(*args, **kwargs):
+                await asyncio.sleep(self._latency)
+                return await attr(*args, **kwargs)
+            return delayed
+        if name in ("find", "aggregate"):
+            return lambda *a, **kw: DelayedCursor(attr(*a, **kw), self._latency)
+        return attr
+
+
+class DelayedDatabase:
+    def __init__(self, db, latency):
+        self._db = db
+        self._latency = latency
+        self.name = db.name
+
+    def __getattr__(self, name):
+        return DelayedCollection(self._db[name], self._latency)
+
+    def __getitem__(self, name):
+        return DelayedCollection(self._db[name], self._latency)
+
+
+async def sequential(*awaitables, timeout=None):
+    return [await aw for aw in awaitables]
+
+
+async def measure(client, method, url, requests, **kwargs):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return round(statistics.median(samples), 3)
+
+
+async def run(args):
+    if args.mongomock:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import httpx
+    import concurrency
+    import dashboard_stats
+    import server
+
+    raw_db = server.client[f"bench_fan_out_{int(time.time())}"]
+    db = DelayedDatabase(raw_db, args.latency_ms / 1000)
+    server.db = server.dashboard_stats.db = db
+
+    admin = server.User(name="Admin", email="admin@example.com", role="admin")
+    user = server.User(name="Member", email="member@example.com")
+    event = server.Event(title="Morning Flow", description="", date="2099-01-01", time="07:00",
+                         pricing={"daily": 100.0}, created_by=admin.id)
+    booking = server.Booking(user_id=user.id, event_id=event.id, amount=100.0)
+    await raw_db.users.insert_many([admin.dict(), user.dict()])
+    await raw_db.events.insert_one(event.dict())
+    await raw_db.bookings.insert_one(booking.dict())
+    headers = {"Authorization": f"Bearer {server.create_jwt_token(admin.dict())}"}
+
+    endpoints = {
+        "GET /api/admin/dashboard": ("GET", "/api/admin/dashboard", {}),
+        "POST /api/admin/dashboard/reconcile": ("POST", "/api/admin/dashboard/reconcile", {}),
+        "PUT /api/bookings/{id}/status": ("PUT", f"/api/bookings/{booking.id}/status",
+                                          {"json": {"status": "approved"}}),
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for mode, gather in (("sequential", sequential), ("concurrent", concurrency.gather_with_timeout)):
+            server.gather_with_timeout = gather
+            server.principal_cache.clear()
+            dashboard_stats.gather_with_timeout = gather
+            for name, (method, url, kwargs) in endpoints.items():
+                results.setdefault(name, {})[f"{mode}_p50_ms"] = await measure(
+                    client, method, url, args.requests, **kwargs
+                )
+
+    if not args.mongomock:
+        await server.client.drop_database(raw_db.name)
+    print(json.dumps({"latency_ms": args.latency_ms, "endpoints": results}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
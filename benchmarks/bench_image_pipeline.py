@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""CPU time and output size per upload class: legacy PNG re-encode vs image profiles.
+
+    python benchmarks/bench_image_pipeline.py --repeat 3
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from image_pipeline import IMAGE_PROFILES, process_image  # noqa: E402
+
+MAX_PIXELS = 40_000_000
+
+
+def qr_code() -> bytes:
+    rng = random.Random(1)
+    image = Image.new("RGB", (800, 800), "white")
+    draw = ImageDraw.Draw(image)
+    for x in range(0, 800, 20):
+        for y in range(0, 800, 20):
+            if rng.random() < 0.5:
+                draw.rectangle([x, y, x + 19, y + 19], fill="black")
+    out = BytesIO()
+    image.save(out, "PNG")
+    return out.getvalue()
+
+
+def screenshot() -> bytes:
+    rng = random.Random(2)
+    image = Image.new("RGB", (1080, 2400), (245, 245, 250))
+    draw = ImageDraw.Draw(image)
+    for y in range(80, 2400, 60):
+        draw.text((40, y), "UPI Ref No. %012d  Paid to Vibrant Yoga  Rs. %d" % (rng.randrange(10**12), rng.randrange(100, 5000)), fill=(30, 30, 30))
+    out = BytesIO()
+    image.save(out, "PNG")
+    return out.getvalue()
+
+
+def phone_photo() -> bytes:
+    image = Image.effect_noise((4000, 3000), 40).convert("RGB")
+    out = BytesIO()
+    image.save(out, "JPEG", quality=92)
+    return out.getvalue()
+
+
+def legacy_png(data: bytes):
+    started = time.process_time()
+    out = BytesIO()
+    Image.open(BytesIO(data)).save(out, format="PNG")
+    return len(out.getvalue()), time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("qr_code", qr_code(), "qr_code"),
+        ("payment_screenshot", screenshot(), "payment_proof"),
+        ("payment_photo_12mp", phone_photo(), "payment_proof"),
+    ]
+    results = {}
+    for name, data, profile in cases:
+        legacy = [legacy_png(data) for _ in range(args.repeat)]
+        current = [process_image(data, IMAGE_PROFILES[profile], MAX_PIXELS) for _ in range(args.repeat)]
+        results[name] = {
+            "input_bytes": len(data),
+            "legacy_png": {
+                "output_bytes": legacy[0][0],
+                "cpu_ms": round(min(cpu for _, cpu in legacy) * 1000, 1),
+            },
+            profile: {
+                "output_bytes": len(current[0][0]),
+                "dimensions": f"{current[0][1]}x{current[0][2]}",
+                "cpu_ms": round(min(r[3] for r in current) * 1000, 1),
+            },
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
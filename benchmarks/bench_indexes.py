@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Hot-query latency with and without the index registry against a local mongod.
+
+Seeds a scratch database at each size, times the queries behind login, auth
+and the booking screens, then applies INDEX_REGISTRY and times them again:
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/bench_indexes.py --sizes 10000 100000 1000000
+
+The scratch database is dropped afterwards.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from indexes import INDEX_REGISTRY  # noqa: E402
+
+USERS = 5000
+EVENTS = 200
+STATUSES = ["pending", "approved", "rejected"]
+
+
+def seed(db, bookings: int):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    users = [{"id": str(uuid.uuid4()), "email": f"user{i}@example.com", "name": f"User {i}", "role": "user"}
+             for i in range(USERS)]
+    events = [{"id": str(uuid.uuid4()), "title": f"Class {i}",
+               "date": (now + timedelta(days=i % 60)).strftime("%Y-%m-%d"), "time": "07:00"}
+              for i in range(EVENTS)]
+    db.users.insert_many(users)
+    db.events.insert_many(events)
+    batch = []
+    for i in range(bookings):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "user_id": rng.choice(users)["id"],
+            "event_id": rng.choice(events)["id"],
+            "booking_type": "daily",
+            "amount": 100.0,
+            "status": rng.choices(STATUSES, weights=[1, 8, 1])[0],
+            "created_at": now - timedelta(seconds=i),
+        })
+        if len(batch) == 10000:
+            db.bookings.insert_many(batch)
+            batch = []
+    if batch:
+        db.bookings.insert_many(batch)
+    return users, events
+
+
+def queries(db, users, events):
+    rng = random.Random(7)
+    booking_ids = [b["id"] for b in db.bookings.aggregate([{"$sample": {"size": 50}}, {"$project": {"id": 1}}])]
+    return {
+        "login_by_email": lambda: db.users.find_one({"email": rng.choice(users)["email"]}),
+        "auth_by_user_id": lambda: db.users.find_one({"id": rng.choice(users)["id"]}),
+        "booking_by_id": lambda: db.bookings.find_one({"id": rng.choice(booking_ids)}),
+        "user_bookings_page": lambda: list(
+            db.bookings.find({"user_id": rng.choice(users)["id"]}).sort("created_at", -1).limit(50)),
+        "pending_queue_page": lambda: list(
+            db.bookings.find({"status": "pending"}).sort("created_at", -1).limit(50)),
+        "event_pending_count": lambda: db.bookings.count_documents(
+            {"event_id": rng.choice(events)["id"], "status": "pending"}),
+    }
+
+
+def time_queries(named_queries, repeat: int):
+    results = {}
+    for name, run in named_queries.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - started) * 1000)
+        results[name] = {"p50_ms": round(statistics.median(samples), 3), "max_ms": round(max(samples), 3)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    report = {}
+    for size in args.sizes:
+        db = client[f"bench_indexes_{size}"]
+        client.drop_database(db.name)
+        users, events = seed(db, size)
+        named = queries(db, users, events)
+        without = time_queries(named, args.repeat)
+        for spec in INDEX_REGISTRY:
+            db[spec.collection].create_indexes([spec.model()])
+        with_indexes = time_queries(named, args.repeat)
+        report[str(size)] = {
+            name: {"without_indexes": without[name], "with_indexes": with_indexes[name]} for name in named
+        }
+        client.drop_database(db.name)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
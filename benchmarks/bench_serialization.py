@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Time to render list responses: serialize_doc + pydantic + response_model vs the projected orjson path.
+
+    python benchmarks/bench_serialization.py --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+from serialization import FastJSONResponse, as_response_docs  # noqa: E402
+
+
+def user_docs(n: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(), "id": str(uuid.uuid4()), "firebase_id": None, "name": f"Member {i}",
+        "email": f"member{i}@example.com", "password_hash": "$2b$12$" + "x" * 53, "role": "user",
+        "status": "active", "created_at": now - timedelta(minutes=i), "preferences": {"newsletter": True},
+        "booking_summary": {},
+    } for i in range(n)]
+
+def event_docs(n: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(), "id": str(uuid.uuid4()), "title": f"Class {i}", "description": "Vinyasa flow " * 8,
+        "date": "2099-01-01", "time": "07:00", "pricing": {"daily": 100.0, "weekly": 500.0, "monthly": 1500.0},
+        "qr_code_url": "/api/blobs/" + "a" * 64 + ".png", "upi_id": "studio@upi", "is_online": True,
+        "session_link": "https://meet.example.com/abc", "capacity": 50, "seats_available": 12,
+        "waitlist_enabled": True, "delivery_mode": "online", "created_at": now, "created_by": str(ObjectId()),
+    } for i in range(n)]
+
+
+async def legacy_users(docs):
+    users = []
+    for user_doc in docs:
+        user_data = server.serialize_doc(user_doc)
+        user_data.pop("password_hash", None)
+        users.append(server.User(**user_data))
+    field = create_response_field(name="response", type_=List[server.User])
+    return JSONResponse(await serialize_response(field=field, response_content=users)).body
+
+async def fast_users(docs):
+    for doc in docs:
+        doc.pop("password_hash")  # done by USER_PROJECTION in the query
+    return FastJSONResponse(as_response_docs(docs, server.USER_DEFAULTS, id_from_object_id=True)).body
+
+async def legacy_events(docs):
+    events = [server.Event(**server.serialize_doc(doc)) for doc in docs]
+    field = create_response_field(name="response", type_=List[server.Event])
+    return JSONResponse(await serialize_response(field=field, response_content=events)).body
+
+async def fast_events(docs):
+    for doc in docs:
+        del doc["_id"]  # done by EVENT_PROJECTION in the query
+    return FastJSONResponse(as_response_docs(docs, server.EVENT_DEFAULTS)).body
+
+async def legacy_bookings(docs):
+    return JSONResponse(jsonable_encoder(docs)).body
+
+async def fast_bookings(docs):
+    return FastJSONResponse(docs).body
+
+
+def measure(render, make_docs, size, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        docs = make_docs(size)  # fresh documents: the legacy path mutates them
+        started = time.perf_counter()
+        body = asyncio.run(render(docs))
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def booking_docs(n):
+        return [{k: v for k, v in doc.items() if k != "_id"} for doc in event_docs(n)]
+
+    cases = {
+        "users": (user_docs, legacy_users, fast_users),
+        "events": (event_docs, legacy_events, fast_events),
+        "bookings": (booking_docs, legacy_bookings, fast_bookings),
+    }
+    results = {}
+    for name, (make_docs, legacy, fast) in cases.items():
+        for size in args.sizes:
+            legacy_ms, _ = measure(legacy, make_docs, size, args.repeat)
+            fast_ms, body_bytes = measure(fast, make_docs, size, args.repeat)
+            results[f"{name}/{size}"] = {
+                "legacy_ms": legacy_ms,
+                "fast_ms": fast_ms,
+                "speedup": round(legacy_ms / fast_ms, 1) if fast_ms else None,
+                "body_bytes": body_bytes,
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Compare per-message SMTP sessions with the pooled, batched sender.
+
+Runs against a local aiosmtpd stand-in, so no real mail server is needed:
+
+    python benchmarks/bench_smtp_throughput.py --messages 500
+"""
+import argparse
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+from aiosmtpd.controller import Controller
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from smtp_pool import SMTPConnectionPool, build_message, open_smtp_connection  # noqa: E402
+
+
+class CountingHandler:
+    def __init__(self):
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def send_one_session_per_message(settings, messages):
+    for to_email, subject, body in messages:
+        server = open_smtp_connection(settings)
+        server.send_message(build_message(settings, to_email, subject, body))
+        server.quit()
+
+
+def send_pooled(settings, messages, batch_size):
+    pool = SMTPConnectionPool(max_connections=1)
+    for start in range(0, len(messages), batch_size):
+        pool.send_batch(settings, messages[start:start + batch_size])
+    pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    settings = {
+        "host": "127.0.0.1",
+        "port": controller.port,
+        "username": "",
+        "password": "",
+        "email": "info@vibrantyoga.test",
+        "encryption": "NONE",
+    }
+    messages = [
+        (f"user{i}@example.com", "Booking Approved - Vibrant Yoga", "<h2>Booking Approved!</h2>")
+        for i in range(args.messages)
+    ]
+
+    results = {}
+    try:
+        for name, runner in (
+            ("per_message_session", lambda: send_one_session_per_message(settings, messages)),
+            ("pooled_batches", lambda: send_pooled(settings, messages, args.batch_size)),
+        ):
+            started = time.perf_counter()
+            runner()
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                "messages": len(messages),
+                "seconds": round(elapsed, 4),
+                "messages_per_second": round(len(messages) / elapsed, 1),
+            }
+    finally:
+        controller.stop()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
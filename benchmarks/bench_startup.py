@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Worker cold start: `import server` time and time from process spawn to the first 200 on /api/health.
+
+Each run uses a fresh interpreter so nothing is cached between runs. Heavy optional
+subsystems (Firebase, PIL, smtplib) should not appear in `heavy_modules_loaded`:
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --mongomock --max-first-200-ms 3000   # exits 1 on regression
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+HEAVY_MODULES = ("firebase_admin", "google.auth", "PIL", "smtplib", "email.mime")
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+print(json.dumps({"import_s": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+SERVE = """
+import sys
+if %r:
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+    motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+import uvicorn
+import server
+uvicorn.run(server.app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(args) -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", args.mongo_url)
+    env.setdefault("DB_NAME", "bench_startup")
+    if args.mongomock:
+        env["MONGO_URL"] = "mongodb://localhost:27017"
+    return env
+
+
+def measure_import(args) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=server_env(args), text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_first_200(args) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVE % (args.mongomock,), str(port)], cwd=BACKEND_DIR, env=server_env(args),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < args.timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode} before answering")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError("Server did not answer /api/health in time")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def summary(samples) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main(args):
+    imports = [measure_import(args) for _ in range(args.runs)]
+    first_200 = [measure_first_200(args) for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "import_server": summary([run["import_s"] for run in imports]),
+        "heavy_modules_loaded": sorted({module for run in imports for module in run["heavy"]}),
+        "time_to_first_200": summary(first_200),
+    }
+    print(json.dumps(results, indent=2))
+
+    failures = []
+    if args.max_import_ms and results["import_server"]["median_ms"] > args.max_import_ms:
+        failures.append(f"import median {results['import_server']['median_ms']}ms > {args.max_import_ms}ms")
+    if args.max_first_200_ms and results["time_to_first_200"]["median_ms"] > args.max_first_200_ms:
+        failures.append(f"first 200 median {results['time_to_first_200']['median_ms']}ms > {args.max_first_200_ms}ms")
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mongomock", action="store_true", help="serve against mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-import-ms", type=float, help="fail when the median import time exceeds this")
+    parser.add_argument("--max-first-200-ms", type=float, help="fail when the median time to first 200 exceeds this")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Local load test: seeded API server, stub SMTP, mixed async workloads, JSON latency report.
+
+Starts backend/server.py (via serve.py) against mongomock-motor or a local mongod,
+points its SMTP settings at an in-process aiosmtpd stub and runs each workload for
+--duration seconds with --concurrency workers:
+
+    python benchmarks/loadtest/run.py --output before.json
+    python benchmarks/loadtest/run.py --mongo-url mongodb://localhost:27017 --scenarios browse rush
+    diff <(jq -S .scenarios before.json) <(jq -S .scenarios after.json)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from aiosmtpd.controller import Controller
+
+from workloads import WORKLOADS, Recorder
+
+HERE = Path(__file__).resolve().parent
+REPO_ROOT = HERE.parents[1]
+
+
+class CountingHandler:
+    def __init__(self):
+        self.messages = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def start_server(args, port: int, smtp_port: int, manifest_path: str, log_file):
+    env = dict(os.environ)
+    env.update({
+        "DB_NAME": args.db_name,
+        "EMAIL_OUTBOX_POLL_INTERVAL": "0.5",
+        "STATS_RECONCILER_ENABLED": "false",
+    })
+    command = [
+        sys.executable, str(HERE / "serve.py"), "--port", str(port), "--smtp-port", str(smtp_port),
+        "--manifest", manifest_path, "--users", str(args.users), "--events", str(args.events),
+        "--bookings", str(args.bookings), "--rush-capacity", str(args.rush_capacity),
+    ]
+    if args.mongo_url:
+        env["MONGO_URL"] = args.mongo_url
+    else:
+        command.append("--mongomock")
+    return subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT, cwd=REPO_ROOT / "backend")
+
+
+def wait_for_manifest(process, manifest_path: str, timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} while seeding")
+        path = Path(manifest_path)
+        if path.exists() and path.stat().st_size:
+            return json.loads(path.read_text())
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time")
+
+
+async def run_workload(base_url: str, manifest: dict, name: str, args) -> dict:
+    workload = WORKLOADS[name]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + args.duration
+
+        async def worker(seed: int):
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                await workload(client, manifest, recorder, rng)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(args.seed * 1000 + i) for i in range(args.concurrency)))
+        return recorder.report(time.perf_counter() - started)
+
+
+async def main(args):
+    smtp = CountingHandler()
+    controller = Controller(smtp, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    port = free_port()
+    manifest_path = tempfile.mktemp(prefix="loadtest-manifest-", suffix=".json")
+    with open(args.server_log, "w") as log_file:
+        process = start_server(args, port, controller.port, manifest_path, log_file)
+        try:
+            manifest = await asyncio.to_thread(wait_for_manifest, process, manifest_path, args.startup_timeout)
+            base_url = f"http://127.0.0.1:{port}"
+            scenarios = {}
+            for name in args.scenarios:
+                scenarios[name] = await run_workload(base_url, manifest, name, args)
+                print(f"{name}: {scenarios[name]['rps']} rps, {scenarios[name]['error_rate']:.2%} errors",
+                      file=sys.stderr)
+
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                response = await client.get("/api/admin/runtime-stats",
+                                            headers={"Authorization": f"Bearer {manifest['admin']['token']}"})
+                runtime_stats = response.json() if response.status_code == 200 else None
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            controller.stop()
+            Path(manifest_path).unlink(missing_ok=True)
+
+    if args.mongo_url and not args.keep_db:
+        from pymongo import MongoClient
+
+        MongoClient(args.mongo_url).drop_database(args.db_name)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "backend": "mongod" if args.mongo_url else "mongomock",
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "seeded": manifest["counts"],
+        },
+        "scenarios": scenarios,
+        "emails_delivered_to_stub": smtp.messages,
+        "runtime_stats": runtime_stats,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mongo-url", help="local mongod to use instead of mongomock-motor")
+    parser.add_argument("--db-name", default=f"loadtest_{os.getpid()}")
+    parser.add_argument("--keep-db", action="store_true")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=60)
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--rush-capacity", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--server-log", default=os.path.join(tempfile.gettempdir(), "loadtest-server.log"))
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
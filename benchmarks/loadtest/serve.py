@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Run backend/server.py for a load test: seeded data, stub SMTP settings, optional mongomock.
+
+Started by run.py, which waits for the manifest file before sending traffic:
+
+    python benchmarks/loadtest/serve.py --port 8765 --smtp-port 8025 --manifest /tmp/manifest.json --mongomock
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+PASSWORD = "loadtest123"
+INSERT_CHUNK = 1000
+
+
+async def insert_chunked(collection, docs):
+    for start in range(0, len(docs), INSERT_CHUNK):
+        await collection.insert_many(docs[start:start + INSERT_CHUNK])
+
+
+async def seed(server, args) -> dict:
+    """Write users, events, historical bookings and SMTP settings; return what the load generator needs"""
+    from password_hashing import hash_password
+
+    rng = random.Random(args.seed)
+    db = server.db
+    password_hash = hash_password(PASSWORD)  # one bcrypt hash shared by every seeded account
+    now = datetime.utcnow()
+
+    admin = server.User(name="Load Admin", email="admin@loadtest.example.com", role="admin", password_hash=password_hash)
+    users = [
+        server.User(name=f"Member {i}", email=f"member{i}@loadtest.example.com", password_hash=password_hash,
+                    created_at=now - timedelta(days=rng.randint(0, 365)))
+        for i in range(args.users)
+    ]
+    await insert_chunked(db.users, [admin.dict()] + [user.dict() for user in users])
+
+    events = [
+        server.Event(
+            title=f"Class {i}", description="Hatha, vinyasa and breathwork for every level. " * 3,
+            date=(now + timedelta(days=rng.randint(0, 60))).strftime("%Y-%m-%d"),
+            time=f"{rng.choice([6, 7, 8, 17, 18, 19]):02d}:{rng.choice(['00', '30'])}",
+            pricing={"daily": 300.0, "weekly": 1500.0, "monthly": 5000.0},
+            upi_id="studio@upi", capacity=rng.randint(20, 60),
+            delivery_mode=rng.choice(["online", "offline", "hybrid"]), created_by=admin.id,
+        )
+        for i in range(args.events)
+    ]
+    rush_event = server.Event(
+        title="Sunrise Special", description="Limited-seat class", date=(now + timedelta(days=7)).strftime("%Y-%m-%d"),
+        time="06:00", pricing={"daily": 500.0}, capacity=args.rush_capacity, created_by=admin.id,
+        # No waitlist, so the rush also exercises rejections once the class is full
+        waitlist_enabled=False,
+    )
+    events.append(rush_event)
+
+    held = {}
+    bookings = []
+    for _ in range(args.bookings):
+        user, event = rng.choice(users), rng.choice(events[:-1])
+        status = rng.choices(["pending", "approved", "rejected"], weights=[4, 5, 1])[0]
+        booking_type = rng.choice(["daily", "weekly", "monthly"])
+        created_at = now - timedelta(minutes=rng.randint(1, 30 * 24 * 60))
+        bookings.append(server.Booking(
+            user_id=user.id, event_id=event.id, booking_type=booking_type, amount=event.pricing[booking_type],
+            status=status, created_at=created_at, approved_at=created_at + timedelta(hours=2) if status == "approved" else None,
+        ))
+        if status != "rejected":
+            held[event.id] = held.get(event.id, 0) + 1
+    for event in events:
+        event.capacity = max(event.capacity, held.get(event.id, 0))
+        event.seats_available = event.capacity - held.get(event.id, 0)
+    await insert_chunked(db.events, [event.dict() for event in events])
+    await insert_chunked(db.bookings, [booking.dict() for booking in bookings])
+
+    await db.smtp_settings.delete_many({})
+    await db.smtp_settings.insert_one(server.SMTPSettings(
+        host="127.0.0.1", port=args.smtp_port, username="", password="", email="noreply@loadtest.example.com",
+        encryption="NONE",
+    ).dict())
+    await server.dashboard_stats.reconcile()
+
+    return {
+        "password": PASSWORD,
+        "admin": {"email": admin.email, "token": server.create_jwt_token(admin.dict())},
+        "users": [
+            {"email": user.email, "token": server.create_jwt_token(user.dict())}
+            for user in users[:args.token_users]
+        ],
+        "event_ids": [event.id for event in events[:-1]],
+        "rush_event_id": rush_event.id,
+        "counts": {"users": len(users), "events": len(events), "bookings": len(bookings)},
+    }
+
+
+async def main(args):
+    if args.mongomock:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import uvicorn
+    import server
+
+    manifest = await seed(server, args)
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=args.port, log_level="warning")
+    api = uvicorn.Server(config)
+
+    async def publish_when_ready():
+        while not api.started:
+            await asyncio.sleep(0.05)
+        Path(args.manifest).write_text(json.dumps(manifest))
+
+    await asyncio.gather(api.serve(), publish_when_ready())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--smtp-port", type=int, required=True)
+    parser.add_argument("--manifest", required=True)
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=60)
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--rush-capacity", type=int, default=50)
+    parser.add_argument("--token-users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,138 @@
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class Recorder:
+    """Latency samples and status codes per operation name"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.status_codes: Dict[str, Counter] = defaultdict(Counter)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str,
+                      expected: Iterable[int] = (200,), **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.samples[name].append((time.perf_counter() - started) * 1000)
+            self.errors[name] += 1
+            self.status_codes[name][type(e).__name__] += 1
+            return None
+        self.samples[name].append((time.perf_counter() - started) * 1000)
+        self.status_codes[name][str(response.status_code)] += 1
+        if response.status_code not in expected:
+            self.errors[name] += 1
+        return response
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        operations = {}
+        for name, samples in sorted(self.samples.items()):
+            operations[name] = {
+                "requests": len(samples),
+                "errors": self.errors[name],
+                "error_rate": round(self.errors[name] / len(samples), 4),
+                "rps": round(len(samples) / duration, 1),
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "max_ms": round(max(samples), 2),
+                "status_codes": dict(sorted(self.status_codes[name].items())),
+            }
+        total = sum(len(samples) for samples in self.samples.values())
+        errors = sum(self.errors.values())
+        return {
+            "duration_s": round(duration, 2),
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "rps": round(total / duration, 1),
+            "operations": operations,
+        }
+
+
+def bearer(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+# One iteration of each workload; run() calls them in a loop from many workers
+
+async def login_storm(client, manifest, recorder, rng):
+    user = rng.choice(manifest["users"])
+    await recorder.request(client, "login", "POST", "/api/auth/login",
+                           json={"email": user["email"], "password": manifest["password"]})
+
+async def event_browsing(client, manifest, recorder, rng):
+    response = await recorder.request(client, "list_events", "GET", "/api/events",
+                                      params={"view": "summary", "limit": 20})
+    cursor = response.headers.get("x-next-cursor") if response is not None else None
+    if cursor and rng.random() < 0.3:
+        await recorder.request(client, "list_events_next_page", "GET", "/api/events",
+                               params={"view": "summary", "limit": 20, "cursor": cursor})
+    await recorder.request(client, "get_event", "GET", f"/api/events/{rng.choice(manifest['event_ids'])}",
+                           expected=(200, 304))
+
+async def booking_rush(client, manifest, recorder, rng):
+    user = rng.choice(manifest["users"])
+    # 409 is the expected answer once the class is full and the waitlist is off
+    await recorder.request(client, "create_booking_rush", "POST", "/api/bookings",
+                           json={"event_id": manifest["rush_event_id"]}, headers=bearer(user["token"]),
+                           expected=(200, 409))
+
+async def admin_approvals(client, manifest, recorder, rng):
+    headers = bearer(manifest["admin"]["token"])
+    response = await recorder.request(client, "list_pending_bookings", "GET", "/api/bookings",
+                                      params={"status": "pending", "limit": 50, "fields": "id"}, headers=headers)
+    if response is None or response.status_code != 200 or not response.json():
+        return
+    booking_ids = [booking["id"] for booking in response.json()]
+    if rng.random() < 0.5:
+        await recorder.request(client, "bulk_approve", "POST", "/api/admin/bookings/bulk-status",
+                               json={"booking_ids": booking_ids, "status": "approved"}, headers=headers)
+    else:
+        for booking_id in booking_ids[:5]:
+            # Another worker may have approved it first
+            await recorder.request(client, "approve_booking", "PUT", f"/api/bookings/{booking_id}/status",
+                                   json={"status": "approved"}, headers=headers, expected=(200, 409))
+
+async def my_bookings(client, manifest, recorder, rng):
+    user = rng.choice(manifest["users"])
+    await recorder.request(client, "my_bookings", "GET", "/api/bookings", params={"limit": 20},
+                           headers=bearer(user["token"]))
+
+async def booking_new_event(client, manifest, recorder, rng):
+    user = rng.choice(manifest["users"])
+    await recorder.request(client, "create_booking", "POST", "/api/bookings",
+                           json={"event_id": rng.choice(manifest["event_ids"])}, headers=bearer(user["token"]),
+                           expected=(200, 409))
+
+MIXED_WEIGHTS = [
+    (event_browsing, 55),
+    (my_bookings, 15),
+    (booking_new_event, 10),
+    (login_storm, 8),
+    (booking_rush, 7),
+    (admin_approvals, 5),
+]
+
+async def mixed(client, manifest, recorder, rng):
+    workload = rng.choices([w for w, _ in MIXED_WEIGHTS], weights=[weight for _, weight in MIXED_WEIGHTS])[0]
+    await workload(client, manifest, recorder, rng)
+
+
+WORKLOADS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "login": login_storm,
+    "browse": event_browsing,
+    "rush": booking_rush,
+    "approvals": admin_approvals,
+    "mixed": mixed,
+}
@@ -549,6 +549,7 @@ const LoginPage = () => {
 
 const ClassesPage = () => {
   const [events, setEvents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const { isAuthenticated } = useAuth();
 
@@ -556,10 +557,13 @@ const ClassesPage = () => {
     fetchEvents();
   }, []);
 
-  const fetchEvents = async () => {
+  const fetchEvents = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/events`);
-      setEvents(response.data);
+      const response = await axios.get(`${API}/events`, {
+        params: cursor ? { view: 'summary', cursor } : { view: 'summary' }
+      });
+      setEvents(cursor ? [...events, ...response.data] : response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       toast.error('Failed to fetch events');
     } finally {
@@ -653,6 +657,17 @@ const ClassesPage = () => {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-8">
+            <button
+              onClick={() => fetchEvents(nextCursor)}
+              className="px-4 py-2 border border-gray-300 rounded-lg text-gray-700 hover:bg-gray-50"
+            >
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -700,6 +715,11 @@ const BookingPage = () => {
         booking_type: selectedBookingType
       });
       
+      if (response.data.status === 'waitlisted') {
+        toast.success("This class is full - you're on the waitlist. We'll email you when a spot opens up.");
+        return;
+      }
+      
       setBookingId(response.data.id);
       setShowPaymentForm(true);
       toast.success('Booking created successfully! Please upload payment proof.');
@@ -847,11 +867,11 @@ const BookingPage = () => {
               <div>
                 <h2 className="text-xl font-semibold text-gray-900 mb-4">Payment</h2>
                 
-                {event.qr_code_base64 && (
+                {(event.qr_code_url || event.qr_code_base64) && (
                   <div className="mb-6">
                     <p className="text-gray-600 mb-2">Scan this QR code to pay ₹{getPrice()}</p>
                     <img 
-                      src={event.qr_code_base64} 
+                      src={event.qr_code_url ? `${BACKEND_URL}${event.qr_code_url}` : event.qr_code_base64} 
                       alt="Payment QR Code" 
                       className="w-48 h-48 border border-gray-300 rounded-lg"
                     />
@@ -917,6 +937,8 @@ const BookingPage = () => {
 
 const DashboardPage = () => {
   const [bookings, setBookings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [counts, setCounts] = useState({ total: 0, by_status: {} });
   const [loading, setLoading] = useState(true);
   const { user } = useAuth();
 
@@ -924,10 +946,17 @@ const DashboardPage = () => {
     fetchBookings();
   }, []);
 
-  const fetchBookings = async () => {
+  const fetchBookings = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/bookings`);
-      setBookings(response.data);
+      const [response, countsResponse] = await Promise.all([
+        axios.get(`${API}/bookings`, { params: cursor ? { cursor } : {} }),
+        cursor ? Promise.resolve(null) : axios.get(`${API}/bookings/counts`)
+      ]);
+      setBookings(cursor ? [...bookings, ...response.data] : response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+      if (countsResponse) {
+        setCounts(countsResponse.data);
+      }
     } catch (error) {
       toast.error('Failed to fetch bookings');
     } finally {
@@ -941,6 +970,8 @@ const DashboardPage = () => {
         return 'bg-green-100 text-green-800';
       case 'rejected':
         return 'bg-red-100 text-red-800';
+      case 'waitlisted':
+        return 'bg-blue-100 text-blue-800';
       default:
         return 'bg-yellow-100 text-yellow-800';
     }
@@ -982,7 +1013,7 @@ const DashboardPage = () => {
             <div className="flex items-center justify-between">
               <div>
                 <p className="text-gray-600">Total Bookings</p>
-                <p className="text-3xl font-bold text-purple-600">{bookings.length}</p>
+                <p className="text-3xl font-bold text-purple-600">{counts.total}</p>
               </div>
               <BookOpen className="w-12 h-12 text-purple-400" />
             </div>
@@ -993,7 +1024,7 @@ const DashboardPage = () => {
               <div>
                 <p className="text-gray-600">Approved</p>
                 <p className="text-3xl font-bold text-green-600">
-                  {bookings.filter(b => b.status === 'approved').length}
+                  {counts.by_status.approved || 0}
                 </p>
               </div>
               <CheckCircle className="w-12 h-12 text-green-400" />
@@ -1005,7 +1036,7 @@ const DashboardPage = () => {
               <div>
                 <p className="text-gray-600">Pending</p>
                 <p className="text-3xl font-bold text-yellow-600">
-                  {bookings.filter(b => b.status === 'pending').length}
+                  {counts.by_status.pending || 0}
                 </p>
               </div>
               <Clock className="w-12 h-12 text-yellow-400" />
@@ -1080,6 +1111,17 @@ const DashboardPage = () => {
               </table>
             </div>
           )}
+
+          {nextCursor && (
+            <div className="p-4 text-center border-t border-gray-200">
+              <button
+                onClick={() => fetchBookings(nextCursor)}
+                className="px-4 py-2 border border-gray-300 rounded-lg text-gray-700 hover:bg-gray-50"
+              >
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -1251,6 +1293,7 @@ const AdminDashboardTab = ({ data }) => {
                   <span className={`px-2 py-1 rounded-full text-xs font-medium ${
                     booking.status === 'approved' ? 'bg-green-100 text-green-800' :
                     booking.status === 'rejected' ? 'bg-red-100 text-red-800' :
+                    booking.status === 'waitlisted' ? 'bg-blue-100 text-blue-800' :
                     'bg-yellow-100 text-yellow-800'
                   }`}>
                     {booking.status}
@@ -1267,6 +1310,7 @@ const AdminDashboardTab = ({ data }) => {
 
 const AdminEventsTab = () => {
   const [events, setEvents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showCreateForm, setShowCreateForm] = useState(false);
 
@@ -1274,10 +1318,13 @@ const AdminEventsTab = () => {
     fetchEvents();
   }, []);
 
-  const fetchEvents = async () => {
+  const fetchEvents = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/events`);
-      setEvents(response.data);
+      const response = await axios.get(`${API}/events`, {
+        params: cursor ? { include_past: true, cursor } : { include_past: true }
+      });
+      setEvents(cursor ? [...events, ...response.data] : response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       toast.error('Failed to fetch events');
     } finally {
@@ -1347,6 +1394,17 @@ const AdminEventsTab = () => {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={() => fetchEvents(nextCursor)}
+            className="px-4 py-2 border border-gray-300 rounded-lg text-gray-700 hover:bg-gray-50"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1566,16 +1624,20 @@ const CreateEventForm = ({ onClose, onSuccess }) => {
 
 const AdminBookingsTab = () => {
   const [bookings, setBookings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchBookings();
   }, []);
 
-  const fetchBookings = async () => {
+  const fetchBookings = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/bookings`);
-      setBookings(response.data);
+      const response = await axios.get(`${API}/bookings`, {
+        params: cursor ? { cursor } : {}
+      });
+      setBookings(cursor ? [...bookings, ...response.data] : response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       toast.error('Failed to fetch bookings');
     } finally {
@@ -1596,12 +1658,28 @@ const AdminBookingsTab = () => {
     }
   };
 
+  const viewPaymentProof = async (booking) => {
+    if (!booking.payment_proof_url) {
+      window.open(booking.payment_proof_base64, '_blank');
+      return;
+    }
+    // Payment proofs need the admin's bearer token, which a plain link would not send
+    try {
+      const response = await axios.get(`${BACKEND_URL}${booking.payment_proof_url}`, { responseType: 'blob' });
+      window.open(URL.createObjectURL(response.data), '_blank');
+    } catch (error) {
+      toast.error('Failed to load payment proof');
+    }
+  };
+
   const getStatusColor = (status) => {
     switch (status) {
       case 'approved':
         return 'bg-green-100 text-green-800';
       case 'rejected':
         return 'bg-red-100 text-red-800';
+      case 'waitlisted':
+        return 'bg-blue-100 text-blue-800';
       default:
         return 'bg-yellow-100 text-yellow-800';
     }
@@ -1681,9 +1759,9 @@ const AdminBookingsTab = () => {
                       </button>
                     </>
                   )}
-                  {booking.payment_proof_base64 && (
+                  {(booking.payment_proof_url || booking.payment_proof_base64) && (
                     <button
-                      onClick={() => window.open(booking.payment_proof_base64, '_blank')}
+                      onClick={() => viewPaymentProof(booking)}
                       className="text-blue-600 hover:text-blue-900"
                     >
                       <Eye className="w-4 h-4 inline" />
@@ -1695,6 +1773,17 @@ const AdminBookingsTab = () => {
           </tbody>
         </table>
       </div>
+
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={() => fetchBookings(nextCursor)}
+            className="px-4 py-2 border border-gray-300 rounded-lg text-gray-700 hover:bg-gray-50"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1888,6 +1977,7 @@ const AdminSettingsTab = () => {
               >
                 <option value="SSL">SSL</option>
                 <option value="TLS">TLS</option>
+                <option value="NONE">None</option>
               </select>
             </div>
           </div>
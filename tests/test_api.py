@@ -0,0 +1,261 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+server = None
+
+
+def setUpModule():
+    global server
+    os.environ.update(
+        MONGO_URL="mongodb://localhost:27017",
+        DB_NAME="api_test",
+        BLOB_STORE_BACKEND="local",
+        BLOB_STORE_PATH=tempfile.mkdtemp(),
+        METRICS_ENABLED="false",
+        QUERY_PROFILER_ENABLED="false",
+        IMAGE_EXECUTOR="thread",
+    )
+    with mock.patch("motor.motor_asyncio.AsyncIOMotorClient", AsyncMongoMockClient):
+        import server as server_module
+    server = server_module
+
+
+def run_async(coro):
+    return asyncio.run(coro)
+
+def png_bytes(size=(40, 30), color=(200, 30, 90)) -> bytes:
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class ApiTestCase(unittest.TestCase):
+    """Runs the app against an in-memory Mongo, without the lifespan's background workers"""
+
+    def setUp(self):
+        self.db = server.db
+        for name in run_async(self.db.list_collection_names()):
+            run_async(self.db.drop_collection(name))
+        server.principal_cache.clear()
+        server.event_response_cache.invalidate()
+        self.client = TestClient(server.app)
+
+    def create_user(self, role: str = "user") -> dict:
+        user = {"id": str(uuid.uuid4()), "email": f"{uuid.uuid4().hex[:8]}@example.com", "name": "Test",
+                "role": role, "status": "active"}
+        run_async(self.db.users.insert_one(user))
+        # The app knows users by their Mongo _id (see serialize_doc)
+        return server.serialize_doc(user)
+
+    def auth(self, user: dict) -> dict:
+        return {"Authorization": f"Bearer {server.create_jwt_token(user)}"}
+
+
+class BlobAccessTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        server.processed_uploads.clear()
+        self.owner, self.other, self.admin = self.create_user(), self.create_user(), self.create_user("admin")
+        self.booking_id = str(uuid.uuid4())
+        run_async(self.db.bookings.insert_one({"id": self.booking_id, "user_id": self.owner["id"], "status": "pending"}))
+        run_async(self.db.events.insert_one({"id": "e1", "title": "Flow", "date": "2030-01-01", "time": "07:00"}))
+
+    def upload_proof(self, color) -> str:
+        response = self.client.post(
+            f"/api/bookings/{self.booking_id}/payment-proof", headers=self.auth(self.owner),
+            files={"file": ("proof.png", png_bytes(color=color), "image/png")}, data={"utr_number": "UTR1"},
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()["payment_proof_url"]
+
+    def test_payment_proofs_stay_private_after_a_reupload(self):
+        replaced = self.upload_proof((10, 10, 10))
+        current = self.upload_proof((250, 250, 250))
+        self.assertNotEqual(replaced, current)
+
+        for url in (replaced, current):
+            self.assertEqual(self.client.get(url).status_code, 401)
+            self.assertEqual(self.client.get(url, headers=self.auth(self.other)).status_code, 403)
+            for user in (self.owner, self.admin):
+                response = self.client.get(url, headers=self.auth(user))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers["content-type"], "image/webp")
+                self.assertTrue(response.headers["cache-control"].startswith("private"))
+
+    def test_blobs_without_a_record_are_admin_only(self):
+        key = run_async(server.blob_store.put(b"legacy-" + uuid.uuid4().bytes, "image/png"))
+        self.assertEqual(self.client.get(f"/api/blobs/{key}", headers=self.auth(self.owner)).status_code, 403)
+        self.assertEqual(self.client.get(f"/api/blobs/{key}", headers=self.auth(self.admin)).status_code, 200)
+
+    def test_event_images_are_public_and_revalidate_on_exact_etag_only(self):
+        response = self.client.post("/api/events/e1/qr-code", headers=self.auth(self.admin),
+                                    files={"file": ("qr.png", png_bytes(), "image/png")})
+        self.assertEqual(response.status_code, 200, response.text)
+        url = run_async(self.db.events.find_one({"id": "e1"}))["qr_code_url"]
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], "public, max-age=31536000, immutable")
+        etag = response.headers["etag"]
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": f'"x{etag[1:]}'}).status_code, 200)
+
+    def test_rejected_images_are_reported_and_not_stored(self):
+        url = f"/api/bookings/{self.booking_id}/payment-proof"
+        cases = [
+            (b"definitely not an image", 400),
+            (png_bytes(size=(200, 100)), 413),
+            (b"\0" * (server.image_pipeline.max_bytes + 1), 413),
+        ]
+        with mock.patch.object(server.image_pipeline, "max_pixels", 10_000):
+            for data, status in cases:
+                response = self.client.post(url, headers=self.auth(self.owner), data={"utr_number": "UTR1"},
+                                            files={"file": ("proof.png", data, "image/png")})
+                self.assertEqual(response.status_code, status, response.text)
+
+        self.assertIsNone(run_async(self.db.blob_records.find_one({})))
+        self.assertNotIn("payment_proof_url", run_async(self.db.bookings.find_one({"id": self.booking_id})))
+
+
+class EventListingTest(ApiTestCase):
+    def test_legacy_events_have_the_same_shape_in_list_and_detail(self):
+        # Written before capacity, delivery_mode and waitlists existed
+        run_async(self.db.events.insert_one({"id": "legacy", "title": "Hatha", "description": "Slow",
+                                             "date": "2030-01-01", "time": "07:00", "created_by": "admin"}))
+
+        [listed] = self.client.get("/api/events").json()
+        detail = self.client.get("/api/events/legacy").json()
+        self.assertEqual((listed["capacity"], listed["delivery_mode"], listed["pricing"]), (50, "online", {}))
+        self.assertEqual({field: detail[field] for field in listed}, listed)
+        [summary] = self.client.get("/api/events", params={"view": "summary"}).json()
+        self.assertEqual(set(summary), set(server.EVENT_SUMMARY_FIELDS))
+
+
+class WaitlistPromotionTest(ApiTestCase):
+    def test_failed_promotion_lookup_does_not_fail_the_rejection(self):
+        admin, holder, waiting = self.create_user("admin"), self.create_user(), self.create_user()
+        run_async(self.db.events.insert_one({"id": "e1", "title": "Flow", "date": "2030-01-01", "time": "07:00",
+                                             "capacity": 1, "seats_available": 0}))
+        run_async(self.db.bookings.insert_many([
+            {"id": "held", "user_id": holder["id"], "event_id": "e1", "amount": 100.0, "status": "pending",
+             "booking_type": "daily"},
+            {"id": "next", "user_id": waiting["id"], "event_id": "e1", "amount": 100.0, "status": "waitlisted",
+             "waitlist_position": 1},
+        ]))
+        gather = server.gather_with_timeout
+        calls = []
+
+        async def first_lookup_times_out(*awaitables, timeout=None):
+            calls.append(len(awaitables))
+            if len(calls) == 1:
+                for awaitable in awaitables:
+                    awaitable.close()
+                raise asyncio.TimeoutError()
+            return await gather(*awaitables, timeout=timeout)
+
+        with mock.patch.object(server, "gather_with_timeout", first_lookup_times_out), \
+                self.assertLogs("server", "ERROR"):
+            response = self.client.put("/api/bookings/held/status", headers=self.auth(admin),
+                                       json={"status": "rejected"})
+
+        self.assertEqual(response.status_code, 200, response.text)
+        promoted = run_async(self.db.bookings.find_one({"id": "next"}))
+        self.assertEqual(promoted["status"], "pending")
+        timeline = run_async(server.booking_events.timeline("next"))
+        self.assertEqual([(e["from_status"], e["to_status"]) for e in timeline], [("waitlisted", "pending")])
+
+
+class PrincipalRevocationTest(ApiTestCase):
+    def test_role_and_status_changes_reach_other_workers(self):
+        admin, user = self.create_user("admin"), self.create_user("admin")
+        other_worker = server.PrincipalCache(self.db, version_check_interval=0)
+        run_async(other_worker.put(user["id"], user))
+
+        for path in (f"/api/users/{user['id']}/role?role=user", f"/api/users/{user['id']}/status?status=suspended"):
+            self.assertEqual(self.client.put(path, headers=self.auth(admin)).status_code, 200)
+            self.assertIsNone(run_async(other_worker.get(user["id"])))
+            run_async(other_worker.put(user["id"], user))
+
+        self.assertEqual(self.client.get("/api/users/me", headers=self.auth(user)).status_code, 403)
+
+
+class BookingCountsTest(ApiTestCase):
+    def test_counts_cover_bookings_beyond_the_first_page(self):
+        user, other = self.create_user(), self.create_user()
+        statuses = ["approved"] * 40 + ["pending"] * 15 + ["waitlisted"] * 5
+        run_async(self.db.bookings.insert_many(
+            [{"id": str(uuid.uuid4()), "user_id": user["id"], "status": status} for status in statuses]
+            + [{"id": str(uuid.uuid4()), "user_id": other["id"], "status": "approved"}]
+        ))
+
+        response = self.client.get("/api/bookings/counts", headers=self.auth(user))
+        self.assertEqual(response.json(), {"total": 60, "by_status": {"approved": 40, "pending": 15, "waitlisted": 5}})
+
+
+class BulkBookingStatusTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user("admin")
+        self.user = self.create_user()
+        run_async(self.db.events.insert_many([
+            {"id": "e1", "title": "Sunrise Flow", "date": "2030-01-01", "time": "07:00", "capacity": 5,
+             "seats_available": 2, "is_online": True},
+            {"id": "e2", "title": "Yin", "date": "2030-01-02", "time": "18:00", "capacity": 5,
+             "seats_available": 5, "is_online": True},
+        ]))
+
+    def add_booking(self, booking_id: str, event_id: str, status: str):
+        run_async(self.db.bookings.insert_one({
+            "id": booking_id, "user_id": self.user["id"], "event_id": event_id, "booking_type": "daily",
+            "amount": 100.0, "status": status, "created_at": server.datetime.utcnow(),
+        }))
+
+    def seats_available(self, event_id: str) -> int:
+        return run_async(self.db.events.find_one({"id": event_id}))["seats_available"]
+
+    def test_seats_are_reserved_per_event_and_races_are_reported(self):
+        for booking_id in ("r1", "r2", "r3"):
+            self.add_booking(booking_id, "e1", "rejected")
+        self.add_booking("w1", "e2", "waitlisted")
+        self.add_booking("p1", "e2", "pending")
+        self.add_booking("a1", "e2", "approved")
+
+        acquire_many = server.seat_allocator.acquire_many
+        calls = []
+
+        async def acquire_many_while_another_admin_approves(event_id, seats):
+            calls.append((event_id, seats))
+            # Another admin makes the same change to p1 after it was read
+            await self.db.bookings.update_one({"id": "p1"}, {"$set": {"status": "approved"}})
+            return await acquire_many(event_id, seats)
+
+        with mock.patch.object(server.seat_allocator, "acquire_many", acquire_many_while_another_admin_approves):
+            response = self.client.post("/api/admin/bookings/bulk-status", headers=self.auth(self.admin), json={
+                "booking_ids": ["r1", "r2", "r3", "w1", "p1", "a1", "missing"], "status": "approved",
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(calls), [("e1", 3), ("e2", 1)])
+        body = response.json()
+        self.assertEqual({item["booking_id"]: item["result"] for item in body["results"]}, {
+            "r1": "updated", "r2": "updated", "r3": "event_full", "w1": "updated",
+            "p1": "conflict", "a1": "unchanged", "missing": "not_found",
+        })
+        self.assertEqual(body["updated"], 3)
+        self.assertEqual((self.seats_available("e1"), self.seats_available("e2")), (0, 4))
+        statuses = {doc["id"]: doc["status"] for doc in run_async(self.db.bookings.find({}).to_list(None))}
+        self.assertEqual((statuses["r3"], statuses["w1"]), ("rejected", "approved"))
+
+
+if __name__ == "__main__":
+    unittest.main()
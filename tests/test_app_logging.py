@@ -0,0 +1,64 @@
+import io
+import json
+import logging
+import threading
+import unittest
+
+from app_logging import QueueLogging, parse_levels
+
+
+class QueueLoggingTest(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.root = logging.getLogger(f"queue_logging_test_{id(self)}")
+        self.root.propagate = False
+
+    def pipeline(self, **kwargs) -> QueueLogging:
+        pipeline = QueueLogging(stream=self.stream, **kwargs)
+        pipeline.install(self.root)
+        pipeline.start()
+        self.addCleanup(pipeline.stop)
+        return pipeline
+
+    def lines(self, pipeline: QueueLogging):
+        pipeline.stop()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_json_records_are_written_by_the_listener_thread(self):
+        pipeline = self.pipeline()
+        written_from = []
+        pipeline.listener.handlers[0].emit = (
+            lambda record, emit=pipeline.listener.handlers[0].emit: (written_from.append(threading.current_thread()),
+                                                                      emit(record))
+        )
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.root.exception("Email %s failed", "x@example.com", extra={"message_id": "m1"})
+
+        [line] = self.lines(pipeline)
+        self.assertEqual(line["message"], "Email x@example.com failed")
+        self.assertEqual((line["level"], line["message_id"]), ("ERROR", "m1"))
+        self.assertIn("ValueError: boom", line["exception"])
+        self.assertIsNot(written_from[0], threading.current_thread())
+
+    def test_debug_sampling_and_module_levels(self):
+        child = f"{self.root.name}.email_outbox"
+        pipeline = self.pipeline(level="DEBUG", debug_sample_rate=0.0, module_levels={child: "WARNING"})
+        for _ in range(50):
+            self.root.debug("high volume")
+        self.root.debug("always kept", extra={"sample_rate": 1.0})
+        self.root.info("kept")
+        logging.getLogger(child).info("below module level")
+
+        lines = self.lines(pipeline)
+        self.assertEqual([line["message"] for line in lines], ["always kept", "kept"])
+        self.assertEqual(pipeline.stats()["debug_sampled_out"], 50)
+
+    def test_parse_levels(self):
+        self.assertEqual(parse_levels("email_outbox=debug, pymongo=WARNING,,junk"),
+                         {"email_outbox": "DEBUG", "pymongo": "WARNING"})
+
+
+if __name__ == "__main__":
+    unittest.main()
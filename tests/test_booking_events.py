@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+
+from booking_events import APPROVAL_LATENCY_BUCKETS, BookingEventLog, histogram_percentile
+
+
+class HistogramPercentileTest(unittest.TestCase):
+    def test_interpolates_within_bucket(self):
+        bounds = (10, 20, float("inf"))
+        self.assertEqual(histogram_percentile([10, 0, 0], bounds, 0.5), 5)
+        self.assertEqual(histogram_percentile([5, 5, 0], bounds, 0.9), 18)
+        self.assertEqual(histogram_percentile([0, 0, 4], bounds, 0.99), 20)
+        self.assertIsNone(histogram_percentile([0, 0, 0], bounds, 0.5))
+
+
+class BookingEventLogTest(unittest.TestCase):
+    """Timeline and incremental analytics written by the booking event log"""
+
+    def setUp(self):
+        self.log = BookingEventLog(AsyncMongoMockClient()[f"events_{uuid.uuid4().hex}"])
+
+    def booking(self, age: timedelta) -> dict:
+        return {"id": str(uuid.uuid4()), "event_id": "event-1", "status": "pending",
+                "created_at": datetime.utcnow() - age}
+
+    def test_timeline_is_ordered_and_append_only(self):
+        async def scenario():
+            booking = self.booking(timedelta(0))
+            await self.log.booking_created(booking, "user-1")
+            await self.log.payment_proof_uploaded(booking, "user-1", "/api/blobs/x.webp", "UTR1")
+            await self.log.status_changed(booking, "rejected", "admin-1", "Blurry screenshot")
+            await self.log.status_changed({**booking, "status": "rejected"}, "approved", "admin-1")
+            return await self.log.timeline(booking["id"])
+
+        timeline = asyncio.run(scenario())
+        self.assertEqual([e["type"] for e in timeline],
+                         ["created", "payment_proof_uploaded", "status_changed", "status_changed"])
+        self.assertEqual([(e.get("from_status"), e.get("to_status")) for e in timeline[2:]],
+                         [("pending", "rejected"), ("rejected", "approved")])
+        self.assertEqual(timeline[2]["data"], {"admin_notes": "Blurry screenshot"})
+        self.assertEqual(len({e["id"] for e in timeline}), 4)
+
+    def test_approval_latency_and_admin_throughput(self):
+        async def scenario():
+            for minutes, admin in [(2, "admin-1"), (10, "admin-1"), (120, "admin-2")]:
+                await self.log.status_changed(self.booking(timedelta(minutes=minutes)), "approved", admin)
+            await self.log.status_changed(self.booking(timedelta(minutes=1)), "rejected", "admin-2")
+            # Waitlist promotions are logged without an actor
+            await self.log.status_changed({**self.booking(timedelta(0)), "status": "waitlisted"}, "pending", None)
+            # Re-approving an approved booking is not a new approval
+            await self.log.status_changed({**self.booking(timedelta(days=30)), "status": "approved"},
+                                          "approved", "admin-1")
+            return await self.log.approval_latency(), await self.log.admin_throughput(days=1)
+
+        latency, throughput = asyncio.run(scenario())
+        self.assertEqual(latency["count"], 3)
+        self.assertEqual(len(latency["buckets"]), len(APPROVAL_LATENCY_BUCKETS))
+        self.assertAlmostEqual(latency["min_seconds"], 120, delta=5)
+        self.assertAlmostEqual(latency["max_seconds"], 7200, delta=5)
+        self.assertLessEqual(latency["min_seconds"], latency["p50_seconds"])
+        self.assertLessEqual(latency["p50_seconds"], latency["p99_seconds"])
+        self.assertEqual(throughput[0], {"admin_id": "admin-1", "total": 3, "transitions": {"approved": 3}})
+        self.assertEqual(throughput[1]["transitions"], {"approved": 1, "rejected": 1})
+        self.assertEqual(len(throughput), 2)
+
+    def test_batched_transitions_match_single_ones(self):
+        bookings = [self.booking(timedelta(minutes=m)) for m in (1, 30, 600)]
+
+        async def scenario(log, batched):
+            if batched:
+                events = await log.statuses_changed(bookings, "approved", "admin-1", "Paid")
+            else:
+                events = [await log.status_changed(b, "approved", "admin-1", "Paid") for b in bookings]
+            return events, await log.approval_latency(), await log.admin_throughput(days=1)
+
+        other = BookingEventLog(AsyncMongoMockClient()[f"events_{uuid.uuid4().hex}"])
+        single_events, single_latency, single_throughput = asyncio.run(scenario(self.log, False))
+        batch_events, batch_latency, batch_throughput = asyncio.run(scenario(other, True))
+
+        self.assertEqual([e["booking_id"] for e in batch_events], [b["id"] for b in bookings])
+        self.assertEqual([b["count"] for b in batch_latency["buckets"]], [b["count"] for b in single_latency["buckets"]])
+        self.assertEqual(batch_throughput, single_throughput)
+        self.assertEqual(asyncio.run(other.timeline(bookings[0]["id"]))[0]["data"], {"admin_notes": "Paid"})
+
+
+if __name__ == "__main__":
+    unittest.main()
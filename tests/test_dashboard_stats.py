@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+import uuid
+
+from mongomock_motor import AsyncMongoMockClient
+
+from dashboard_stats import STATS_ID, DashboardStats
+
+
+class DashboardStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.db = AsyncMongoMockClient()[f"stats_{uuid.uuid4().hex}"]
+        self.stats = DashboardStats(self.db)
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    async def add_booking(self, status: str = "pending", event_id: str = "e1", amount: float = 100.0) -> dict:
+        booking = {"id": str(uuid.uuid4()), "event_id": event_id, "amount": amount, "status": status}
+        await self.db.bookings.insert_one(dict(booking))
+        await self.stats.booking_created(status)
+        return booking
+
+    async def set_status(self, booking: dict, status: str):
+        await self.db.bookings.update_one({"id": booking["id"]}, {"$set": {"status": status}})
+        await self.stats.booking_status_changed(booking["event_id"], booking["amount"], booking["status"], status)
+        booking["status"] = status
+
+    async def stored(self) -> dict:
+        return await self.db.dashboard_stats.find_one({"_id": STATS_ID}, {"_id": 0})
+
+    def test_counters_follow_writes(self):
+        async def scenario():
+            await self.stats.user_created()
+            await self.stats.event_created()
+            first, second = await self.add_booking(), await self.add_booking(event_id="e2", amount=250.0)
+            await self.set_status(first, "approved")
+            await self.set_status(second, "approved")
+            await self.set_status(first, "rejected")
+            return await self.stored()
+
+        stats = self.run_async(scenario())
+        self.assertEqual((stats["total_users"], stats["total_events"], stats["total_bookings"]), (1, 1, 2))
+        self.assertEqual(stats["status_counts"], {"pending": 0, "approved": 1, "rejected": 1})
+        self.assertEqual(stats["approved_revenue"], 250.0)
+        self.assertEqual(stats["event_revenue"], {"e1": 0, "e2": 250.0})
+
+    def test_reconcile_corrects_drift(self):
+        async def scenario():
+            approved = await self.add_booking()
+            await self.set_status(approved, "approved")
+            await self.add_booking()
+            await self.stats.reconcile()
+            # A crash between a booking write and its counter update
+            await self.db.bookings.insert_one({"id": "lost", "event_id": "e1", "amount": 40.0, "status": "approved"})
+            await self.db.dashboard_stats.update_one({"_id": STATS_ID}, {"$inc": {"status_counts.ghost": 3}})
+            return await self.stats.reconcile()
+
+        stats = self.run_async(scenario())
+        self.assertEqual(stats["total_bookings"], 3)
+        self.assertEqual(stats["status_counts"], {"pending": 1, "approved": 2})
+        self.assertEqual((stats["approved_revenue"], stats["event_revenue"]), (140.0, {"e1": 140.0}))
+        self.assertIn("reconciled_at", stats)
+
+    def test_reconcile_keeps_increments_that_race_with_it(self):
+        recompute = self.stats._recompute
+        raced = []
+
+        async def recompute_then_race():
+            # Bookings land after the counts were taken but before reconcile writes them back
+            result = await recompute()
+            if len(raced) < 2:
+                raced.append(await self.add_booking())
+            return result
+
+        async def scenario():
+            for _ in range(3):
+                await self.add_booking()
+            await self.stats.reconcile()
+            self.stats._recompute = recompute_then_race
+            await asyncio.gather(self.stats.reconcile(), *(self.add_booking() for _ in range(5)))
+            self.stats._recompute = recompute
+            before = await self.stored()
+            return before, await self.stats.reconcile()
+
+        before, after = self.run_async(scenario())
+        self.assertEqual(len(raced), 2)
+        self.assertEqual(before["total_bookings"], 10)
+        self.assertEqual(before["status_counts"], {"pending": 10})
+        self.assertEqual((after["total_bookings"], after["status_counts"]), (10, {"pending": 10}))
+
+    def test_read_bootstraps_missing_counters(self):
+        async def scenario():
+            await self.db.users.insert_many([{"id": "u1"}, {"id": "u2"}])
+            await self.db.bookings.insert_one({"id": "b1", "event_id": "e1", "amount": 10.0, "status": "approved"})
+            return await self.stats.read()
+
+        stats = self.run_async(scenario())
+        self.assertEqual((stats["total_users"], stats["total_bookings"], stats["approved_revenue"]), (2, 1, 10.0))
+        self.assertEqual(stats["version"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import socket
+import unittest
+
+from aiosmtpd.controller import Controller
+from mongomock_motor import AsyncMongoMockClient
+
+from email_outbox import OUTBOX_DEAD, OUTBOX_PENDING, OUTBOX_SENT, EmailOutboxWorker
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class EmailOutboxWorkerTest(unittest.TestCase):
+    """Tests for the outbox worker against a local aiosmtpd stand-in"""
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=free_port())
+        self.controller.start()
+        self.db = AsyncMongoMockClient()["outbox_test"]
+        self.settings = {
+            "host": "127.0.0.1",
+            "port": self.controller.port,
+            "username": "",
+            "password": "",
+            "email": "info@vibrantyoga.test",
+            "encryption": "NONE",
+        }
+
+    def tearDown(self):
+        self.controller.stop()
+
+    def make_worker(self, **kwargs):
+        async def load_settings():
+            return self.settings
+
+        return EmailOutboxWorker(self.db, load_settings, **kwargs)
+
+    def test_enqueued_messages_are_delivered(self):
+        worker = self.make_worker()
+
+        async def scenario():
+            for i in range(3):
+                await worker.enqueue(f"user{i}@example.com", "Booking Confirmation", "<p>Hi</p>")
+            processed = await worker.drain()
+            statuses = [doc["status"] async for doc in self.db.email_outbox.find({})]
+            return processed, statuses
+
+        processed, statuses = asyncio.run(scenario())
+        self.assertEqual(processed, 3)
+        self.assertEqual(statuses, [OUTBOX_SENT] * 3)
+        self.assertEqual(len(self.handler.messages), 3)
+        self.assertEqual(self.handler.messages[0].rcpt_tos, ["user0@example.com"])
+        self.assertEqual(worker.smtp_pool.stats()["connections_opened"], 1)
+
+    def test_pooled_session_is_reused_across_drains(self):
+        worker = self.make_worker(batch_size=2)
+
+        async def scenario():
+            await worker.enqueue_many([(f"user{i}@example.com", "Class update", "<p>Hi</p>") for i in range(5)])
+            first = await worker.drain()
+            await worker.enqueue("late@example.com", "Class update", "<p>Hi</p>")
+            second = await worker.drain()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual((first, second), (5, 1))
+        self.assertEqual(len(self.handler.messages), 6)
+        self.assertEqual(worker.smtp_pool.stats()["connections_opened"], 1)
+
+    def test_failures_back_off_then_dead_letter(self):
+        self.settings["port"] = free_port()  # nothing listening
+        worker = self.make_worker(max_attempts=2, backoff_base=0)
+
+        async def scenario():
+            await worker.enqueue("user@example.com", "Booking Update", "<p>Hi</p>")
+            await worker.drain()
+            return await self.db.email_outbox.find_one({})
+
+        message = asyncio.run(scenario())
+        self.assertEqual(message["status"], OUTBOX_DEAD)
+        self.assertEqual(message["attempts"], 2)
+        self.assertTrue(message["last_error"])
+
+    def test_retry_is_scheduled_with_backoff(self):
+        self.settings["port"] = free_port()
+        worker = self.make_worker(max_attempts=5, backoff_base=60)
+
+        async def scenario():
+            await worker.enqueue("user@example.com", "Booking Update", "<p>Hi</p>")
+            processed = await worker.drain()
+            return processed, await self.db.email_outbox.find_one({})
+
+        processed, message = asyncio.run(scenario())
+        self.assertEqual(processed, 1)
+        self.assertEqual(message["status"], OUTBOX_PENDING)
+        self.assertEqual(message["attempts"], 1)
+        self.assertGreater(message["next_attempt_at"], message["created_at"])
+        self.assertEqual(worker.backoff(3), 240)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import csv
+import io
+import json
+import tracemalloc
+import unittest
+from datetime import datetime
+
+from exports import csv_rows, export_response, ndjson_rows
+
+ROWS = 50_000
+COLUMNS = ["id", "status", "amount", "created_at", "pricing"]
+
+
+class LazyCursor:
+    """Async cursor generating documents on demand, like a Motor cursor fetching batches"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for i in range(self.count):
+            yield {"id": f"booking-{i}", "status": "approved", "amount": 100.0,
+                   "created_at": datetime(2025, 1, 1, 7, 0), "pricing": {"daily": 100.0}}
+
+    async def close(self):
+        self.closed = True
+
+
+async def consume(rows) -> int:
+    total = 0
+    async for chunk in rows:
+        total += len(chunk)
+    return total
+
+
+class ExportStreamingTest(unittest.TestCase):
+    """Exports stream rows in bounded chunks instead of materializing the result set"""
+
+    def measure(self, rows):
+        tracemalloc.start()
+        try:
+            total = asyncio.run(consume(rows))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return total, peak
+
+    def assert_constant_memory(self, make_rows):
+        small_total, small_peak = self.measure(make_rows(ROWS // 5))
+        total, peak = self.measure(make_rows(ROWS))
+        self.assertGreater(total, 4 * small_total)
+        self.assertLess(peak, 2 * small_peak)
+        self.assertLess(peak, total // 4)
+
+    def test_ndjson_memory_is_independent_of_row_count(self):
+        self.assert_constant_memory(lambda count: ndjson_rows(LazyCursor(count).__aiter__()))
+
+    def test_csv_memory_is_independent_of_row_count(self):
+        self.assert_constant_memory(lambda count: csv_rows(LazyCursor(count).__aiter__(), COLUMNS))
+
+    def test_csv_rows_encode_values(self):
+        async def collect():
+            return b"".join([chunk async for chunk in csv_rows(LazyCursor(2).__aiter__(), COLUMNS)])
+
+        rows = list(csv.reader(io.StringIO(asyncio.run(collect()).decode())))
+        self.assertEqual(rows[0], COLUMNS)
+        self.assertEqual(rows[1], ["booking-0", "approved", "100.0", "2025-01-01T07:00:00", '{"daily":100.0}'])
+        self.assertEqual(len(rows), 3)
+
+    def test_response_closes_cursor_and_sets_headers(self):
+        cursor = LazyCursor(3)
+        response = export_response(cursor, "ndjson", COLUMNS, "bookings")
+
+        async def collect():
+            return b"".join([chunk async for chunk in response.body_iterator])
+
+        lines = asyncio.run(collect()).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], ["booking-0", "booking-1", "booking-2"])
+        self.assertTrue(cursor.closed)
+        self.assertEqual(response.media_type, "application/x-ndjson")
+        self.assertIn('filename="bookings.ndjson"', response.headers["content-disposition"])
+
+
+if __name__ == "__main__":
+    unittest.main()
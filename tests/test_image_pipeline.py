@@ -0,0 +1,84 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image, ImageFile
+
+from image_pipeline import IMAGE_PROFILES, ImagePipeline, ImageTooLarge, InvalidImage, process_image
+
+
+def encode(size, format="PNG", color=(120, 80, 200)) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format=format)
+    return output.getvalue()
+
+
+class ProcessImageTest(unittest.TestCase):
+    def test_profiles_set_format_and_bound_dimensions(self):
+        cases = [("qr_code", (2400, 1200), "PNG", (1024, 512)), ("payment_proof", (1200, 3200), "WEBP", (600, 1600))]
+        for profile_name, size, output_format, expected in cases:
+            data, width, height, cpu_time = process_image(encode(size, "JPEG"), IMAGE_PROFILES[profile_name], 40_000_000)
+            with Image.open(io.BytesIO(data)) as output:
+                self.assertEqual((output.format, output.size), (output_format, expected))
+            self.assertEqual((width, height), expected)
+            self.assertGreaterEqual(cpu_time, 0)
+
+    def test_small_images_are_not_upscaled(self):
+        data, width, height, _ = process_image(encode((300, 200)), IMAGE_PROFILES["payment_proof"], 40_000_000)
+        self.assertEqual((width, height), (300, 200))
+
+    def test_pixel_limit_is_checked_before_decoding(self):
+        data = encode((2000, 1000))
+        with mock.patch.object(ImageFile.ImageFile, "load", side_effect=AssertionError("pixels decoded")):
+            with self.assertRaisesRegex(ImageTooLarge, "2000000 pixels"):
+                process_image(data, IMAGE_PROFILES["payment_proof"], 1_500_000)
+
+    def test_decompression_bombs_are_too_large(self):
+        # Over twice the limit, Pillow itself refuses the image on open
+        with self.assertRaisesRegex(ImageTooLarge, "decompression bomb"):
+            process_image(encode((2000, 1000)), IMAGE_PROFILES["payment_proof"], 500_000)
+
+    def test_undecodable_input_is_invalid(self):
+        truncated = encode((400, 400), color=(1, 2, 3))[:200]
+        for data in (b"definitely not an image", truncated):
+            with self.assertRaises(InvalidImage):
+                process_image(data, IMAGE_PROFILES["payment_proof"], 40_000_000)
+
+
+class ImagePipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = ImagePipeline(max_workers=2, max_bytes=512 * 1024, use_processes=False)
+        self.addCleanup(self.pipeline.shutdown)
+
+    def test_accepts_bytes_paths_and_open_files(self):
+        data = encode((2000, 1500), "JPEG")
+        fd, path = tempfile.mkstemp(suffix=".jpg")
+        with os.fdopen(fd, "wb") as spool:
+            spool.write(data)
+        self.addCleanup(os.unlink, path)
+
+        async def scenario():
+            with open(path, "rb") as file:
+                return await asyncio.gather(
+                    self.pipeline.process(data, "payment_proof"),
+                    self.pipeline.process(path, "payment_proof"),
+                    self.pipeline.process(file, "payment_proof"),
+                )
+
+        results = asyncio.run(scenario())
+        self.assertEqual({(r.content_type, r.width, r.height) for r in results}, {("image/webp", 1600, 1200)})
+        stats = self.pipeline.stats()["profiles"]["payment_proof"]
+        self.assertEqual((stats["count"], stats["input_bytes"]), (3, 3 * len(data)))
+
+    def test_byte_limit_is_checked_before_any_work(self):
+        with mock.patch("image_pipeline.process_image") as worker:
+            with self.assertRaises(ImageTooLarge):
+                asyncio.run(self.pipeline.process(b"\0" * (512 * 1024 + 1), "qr_code"))
+        worker.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import HTTPMetrics, MetricsMiddleware, MetricsRegistry, MongoCommandMetrics
+from request_context import RequestContext, current_request
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def render(self) -> str:
+        return asyncio.run(self.registry.render())
+
+    def test_histogram_exposition_is_cumulative(self):
+        histogram = self.registry.histogram("job_seconds", "Job time", ("kind",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, "resize")
+
+        text = self.render()
+        self.assertIn("# TYPE job_seconds histogram", text)
+        self.assertIn('job_seconds_bucket{kind="resize",le="0.1"} 1', text)
+        self.assertIn('job_seconds_bucket{kind="resize",le="1.0"} 3', text)
+        self.assertIn('job_seconds_bucket{kind="resize",le="+Inf"} 4', text)
+        self.assertIn('job_seconds_count{kind="resize"} 4', text)
+        self.assertIn('job_seconds_sum{kind="resize"} 4.05', text)
+
+    def test_middleware_labels_by_route_template(self):
+        http_metrics = HTTPMetrics(self.registry)
+        app = FastAPI()
+        seen_in_flight = []
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            seen_in_flight.append(http_metrics._in_flight())
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware, http_metrics=http_metrics)
+        client = TestClient(app)
+        for item_id in ("a", "b"):
+            self.assertEqual(client.get(f"/items/{item_id}").status_code, 200)
+        self.assertEqual(client.get("/nowhere").status_code, 404)
+
+        self.assertEqual(seen_in_flight[0], {("GET", "/items/{item_id}"): 1})
+        self.assertEqual(http_metrics.requests.value("GET", "/items/{item_id}", "200"), 2)
+        self.assertEqual(http_metrics.requests.value("GET", "unmatched", "404"), 1)
+        self.assertEqual(http_metrics.latency.count("GET", "/items/{item_id}"), 2)
+        self.assertIn('http_requests_in_flight', self.render())
+
+    def test_mongo_commands_are_attributed_to_the_current_route(self):
+        listener = MongoCommandMetrics(self.registry)
+
+        def run_command(command_name, command, request_id):
+            common = dict(command_name=command_name, connection_id=("db", 27017), request_id=request_id)
+            listener.started(SimpleNamespace(command=command, **common))
+            listener.succeeded(SimpleNamespace(duration_micros=1500, **common))
+
+        token = current_request.set(RequestContext({"method": "GET", "route": SimpleNamespace(path="/api/events")}))
+        try:
+            run_command("find", {"find": "events"}, 1)
+            run_command("getMore", {"getMore": 123, "collection": "events"}, 2)
+        finally:
+            current_request.reset(token)
+        run_command("update", {"update": "email_outbox"}, 3)
+
+        self.assertEqual(listener.commands.value("/api/events", "events", "find", "ok"), 1)
+        self.assertEqual(listener.commands.value("/api/events", "events", "getMore", "ok"), 1)
+        self.assertEqual(listener.commands.value("background", "email_outbox", "update", "ok"), 1)
+        self.assertEqual(listener.latency.count("/api/events", "events", "find"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import base64
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+
+from pagination import decode_cursor, encode_cursor, fetch_page, keyset_filter
+
+SORT = [("created_at", -1), ("id", -1)]
+
+
+class CursorTest(unittest.TestCase):
+    def test_round_trip_keeps_datetimes(self):
+        doc = {"id": "b7", "created_at": datetime(2025, 3, 1, 9, 30, 15, 123000), "status": "pending"}
+        self.assertEqual(decode_cursor(encode_cursor(doc, SORT), SORT), [doc["created_at"], "b7"])
+
+    def test_malformed_cursors_are_rejected_with_400(self):
+        wrong_length = encode_cursor({"id": "b1", "created_at": datetime(2025, 1, 1)}, [("id", 1)])
+        not_a_list = base64.urlsafe_b64encode(b'{"id": "b1"}').decode()
+        not_json = base64.urlsafe_b64encode(b"\xff\xfe").decode()
+        bad_date = base64.urlsafe_b64encode(b'[{"$date": "yesterday"}, "b1"]').decode()
+        for cursor in ("not base64!", not_json, not_a_list, wrong_length, bad_date):
+            with self.assertRaises(HTTPException) as raised:
+                decode_cursor(cursor, SORT)
+            self.assertEqual(raised.exception.status_code, 400, cursor)
+
+    def test_keyset_filter_breaks_ties_on_later_fields(self):
+        at = datetime(2025, 1, 1)
+        self.assertEqual(keyset_filter(SORT, [at, "b5"]), {"$or": [
+            {"created_at": {"$lt": at}},
+            {"created_at": at, "id": {"$lt": "b5"}},
+        ]})
+        self.assertEqual(keyset_filter([("date", 1), ("id", 1)], ["2025-01-01", "e1"])["$or"][1],
+                         {"date": "2025-01-01", "id": {"$gt": "e1"}})
+
+
+class FetchPageTest(unittest.TestCase):
+    def test_pages_cover_every_document_once_when_sort_keys_tie(self):
+        collection = AsyncMongoMockClient()[f"pagination_{uuid.uuid4().hex}"].bookings
+        start = datetime(2025, 1, 1)
+        # Three documents share each timestamp, so pages split inside runs of equal created_at
+        docs = [{"id": f"b{i:02d}", "created_at": start + timedelta(minutes=i // 3)} for i in range(11)]
+
+        async def scenario():
+            await collection.insert_many([dict(doc) for doc in docs])
+            pages, cursor = [], None
+            while True:
+                page, cursor = await fetch_page(collection, {}, SORT, 2, {"_id": 0}, cursor)
+                pages.append([doc["id"] for doc in page])
+                if cursor is None:
+                    return pages
+
+        pages = asyncio.run(scenario())
+        expected = [doc["id"] for doc in sorted(docs, key=lambda d: (d["created_at"], d["id"]), reverse=True)]
+        self.assertEqual([booking_id for page in pages for booking_id in page], expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 2, 2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
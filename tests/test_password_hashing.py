@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from password_hashing import HashingPoolBusy, PasswordHasher
+
+
+class PasswordHasherTest(unittest.TestCase):
+    """Tests for the bounded password hashing pool"""
+
+    def setUp(self):
+        self.hasher = PasswordHasher(max_workers=1, max_queue=1)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    def test_hash_and_verify_round_trip(self):
+        async def scenario():
+            hashed = await self.hasher.hash("Password123!")
+            return (
+                await self.hasher.verify("Password123!", hashed),
+                await self.hasher.verify("wrong", hashed),
+            )
+
+        ok, wrong = asyncio.run(scenario())
+        self.assertTrue(ok)
+        self.assertFalse(wrong)
+        stats = self.hasher.stats()
+        self.assertEqual(stats["completed"], 3)
+        self.assertGreater(stats["hash_time_avg"], 0)
+
+    def test_rejects_when_queue_is_full(self):
+        async def scenario():
+            return await asyncio.gather(
+                *(self.hasher.hash("Password123!") for _ in range(4)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(scenario())
+        rejected = [r for r in results if isinstance(r, HashingPoolBusy)]
+        self.assertEqual(len(rejected), 2)
+        self.assertEqual(self.hasher.stats()["rejected"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+import uuid
+from unittest import mock
+
+from mongomock_motor import AsyncMongoMockClient
+
+from principal_cache import PrincipalCache
+
+
+class PrincipalCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = 1000.0
+        patcher = mock.patch("principal_cache.time.monotonic", lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db = AsyncMongoMockClient()[f"principals_{uuid.uuid4().hex}"]
+
+    def test_entries_expire_after_ttl(self):
+        cache = PrincipalCache(self.db, max_size=10, ttl=30)
+
+        async def scenario():
+            await cache.put("u1", {"id": "u1", "role": "user"})
+            self.clock += 29
+            self.assertEqual(await cache.get("u1"), {"id": "u1", "role": "user"})
+            self.clock += 1
+            self.assertIsNone(await cache.get("u1"))
+
+        asyncio.run(scenario())
+        self.assertEqual((cache.stats()["size"], cache.stats()["hits"], cache.stats()["misses"]), (0, 1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PrincipalCache(self.db, max_size=2, ttl=30)
+
+        async def scenario():
+            await cache.put("u1", {"id": "u1"})
+            await cache.put("u2", {"id": "u2"})
+            await cache.get("u1")
+            await cache.put("u3", {"id": "u3"})
+            self.assertIsNone(await cache.get("u2"))
+            self.assertIsNotNone(await cache.get("u1"))
+            self.assertIsNotNone(await cache.get("u3"))
+
+        asyncio.run(scenario())
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidate_and_copies(self):
+        cache = PrincipalCache(self.db)
+
+        async def scenario():
+            await cache.put("u1", {"id": "u1", "status": "active"})
+            await cache.put("u2", {"id": "u2", "status": "active"})
+            (await cache.get("u1"))["status"] = "suspended"
+            self.assertEqual((await cache.get("u1"))["status"], "active")
+            await cache.invalidate("u1", "unknown")
+            self.assertIsNone(await cache.get("u1"))
+            # Our own bump does not empty the rest of the cache
+            self.clock += 5
+            self.assertIsNotNone(await cache.get("u2"))
+
+        asyncio.run(scenario())
+        self.assertEqual((cache.stats()["invalidations"], cache.stats()["resets"]), (1, 0))
+
+    def test_invalidation_reaches_other_workers_within_the_check_interval(self):
+        here, there = PrincipalCache(self.db, version_check_interval=1), PrincipalCache(self.db, version_check_interval=1)
+
+        async def scenario():
+            await there.put("u1", {"id": "u1", "role": "admin"})
+            await here.invalidate("u1")
+            self.assertIsNotNone(await there.get("u1"))
+            self.clock += 1
+            self.assertIsNone(await there.get("u1"))
+
+        asyncio.run(scenario())
+        self.assertEqual((there.stats()["resets"], there.stats()["version"]), (1, 1))
+
+    def test_principals_loaded_before_a_change_elsewhere_are_not_cached(self):
+        here, there = PrincipalCache(self.db, version_check_interval=1), PrincipalCache(self.db, version_check_interval=1)
+
+        async def scenario():
+            await there.put("u2", {"id": "u2"})
+            self.assertIsNone(await there.get("u1"))
+            # Another worker changes u1 while this one is still reading the old document
+            await here.invalidate("u1")
+            self.clock += 1
+            await there.put("u1", {"id": "u1", "role": "admin"})
+            self.assertIsNone(await there.get("u1"))
+            await there.put("u1", {"id": "u1", "role": "user"})
+            self.assertEqual((await there.get("u1"))["role"], "user")
+
+        asyncio.run(scenario())
+
+    def test_zero_size_or_ttl_disables_caching(self):
+        async def scenario(cache):
+            await cache.put("u1", {"id": "u1"})
+            return await cache.get("u1")
+
+        for cache in (PrincipalCache(self.db, max_size=0), PrincipalCache(self.db, ttl=0)):
+            self.assertFalse(cache.enabled)
+            self.assertIsNone(asyncio.run(scenario(cache)))
+
+
+if __name__ == "__main__":
+    unittest.main()
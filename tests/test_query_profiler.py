@@ -0,0 +1,96 @@
+import asyncio
+import itertools
+import unittest
+from types import SimpleNamespace
+
+from query_profiler import QueryProfiler, plan_summary, query_shape
+from request_context import RequestContext, current_request
+
+request_ids = itertools.count(1)
+
+
+def run_command(profiler, command_name, command, reply, duration_ms=1.0):
+    common = dict(command_name=command_name, connection_id=("db", 27017), request_id=next(request_ids))
+    profiler.started(SimpleNamespace(command=command, database_name="app", **common))
+    profiler.succeeded(SimpleNamespace(reply=reply, duration_micros=int(duration_ms * 1000), **common))
+
+
+def in_route(path):
+    return current_request.set(RequestContext({"method": "GET", "route": SimpleNamespace(path=path)}))
+
+
+class QueryShapeTest(unittest.TestCase):
+    def test_values_are_normalised_but_structure_is_kept(self):
+        first = query_shape("find", {"find": "bookings", "filter": {"user_id": "u1", "status": {"$in": ["a", "b"]}},
+                                     "sort": {"created_at": -1}})
+        second = query_shape("find", {"find": "bookings", "filter": {"user_id": "u2", "status": {"$in": ["c"]}},
+                                      "sort": {"created_at": -1}})
+        self.assertEqual(first, second)
+        self.assertIn('"$in": "?"', first)
+        self.assertNotEqual(first, query_shape("find", {"find": "bookings", "filter": {"event_id": "e1"}}))
+        self.assertEqual(query_shape("update", {"update": "events", "updates": [
+            {"q": {"id": "e1"}, "u": {"$inc": {"seats_available": -1}}, "multi": False}]}),
+            '{"updates": {"q": {"id": "?"}, "u": {"$inc": {"seats_available": "?"}}}}')
+
+    def test_plan_summary_flags_collection_scans(self):
+        explain = {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}
+        self.assertEqual(plan_summary(explain), {"stages": ["SORT", "COLLSCAN"], "indexes": [],
+                                                 "collection_scan": True})
+        indexed = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"queryPlan": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "user_id_1"}}}}}}]}
+        self.assertEqual(plan_summary(indexed)["indexes"], ["user_id_1"])
+
+
+class QueryProfilerTest(unittest.TestCase):
+    def test_top_shapes_are_grouped_per_route_with_getmore_attribution(self):
+        profiler = QueryProfiler(slow_ms=50)
+        token = in_route("/api/bookings")
+        try:
+            for user_id in ("u1", "u2"):
+                run_command(profiler, "find", {"find": "bookings", "filter": {"user_id": user_id}},
+                            {"cursor": {"id": 0, "firstBatch": [{}, {}]}}, duration_ms=5)
+            run_command(profiler, "find", {"find": "bookings", "filter": {"status": "pending"}},
+                        {"cursor": {"id": 42, "firstBatch": [{}] * 101}}, duration_ms=80)
+            run_command(profiler, "getMore", {"getMore": 42, "collection": "bookings"},
+                        {"cursor": {"id": 0, "nextBatch": [{}] * 20}}, duration_ms=10)
+        finally:
+            current_request.reset(token)
+        run_command(profiler, "update", {"update": "email_outbox", "updates": [{"q": {"id": "m"}, "u": {}}]},
+                    {"n": 1})
+
+        report = profiler.top(limit=2)
+        self.assertEqual(report["tracked_shapes"], 3)
+        slowest, by_user = report["shapes"]
+        self.assertEqual((slowest["route"], slowest["count"], slowest["docs_returned"]), ("/api/bookings", 2, 121))
+        self.assertEqual(slowest["total_ms"], 90)
+        self.assertEqual((by_user["count"], by_user["docs_returned"], by_user["avg_ms"]), (2, 4, 5))
+        self.assertEqual(profiler.top(sort="count", limit=3)["shapes"][-1]["route"], "background")
+
+        [slow] = profiler.slow_queries()
+        self.assertEqual((slow["route"], slow["collection"], slow["duration_ms"]), ("/api/bookings", "bookings", 80))
+
+    def test_first_slow_call_of_a_shape_is_explained(self):
+        explained = []
+
+        class FakeDatabase:
+            async def command(self, command):
+                explained.append(command)
+                return {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+
+        async def scenario():
+            profiler = QueryProfiler(slow_ms=10, explain=True)
+            profiler.attach({"app": FakeDatabase()}, asyncio.get_running_loop())
+            for _ in range(3):
+                run_command(profiler, "find", {"find": "users", "filter": {"email": "x"}, "lsid": {"id": 1},
+                                               "$db": "app"}, {"cursor": {"id": 0, "firstBatch": []}}, 20)
+            await asyncio.sleep(0.05)
+            return profiler.top()["shapes"][0]
+
+        shape = asyncio.run(scenario())
+        self.assertEqual(explained, [{"explain": {"find": "users", "filter": {"email": "x"}},
+                                      "verbosity": "queryPlanner"}])
+        self.assertTrue(shape["plan"]["collection_scan"])
+
+
+if __name__ == "__main__":
+    unittest.main()
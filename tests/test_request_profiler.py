@@ -0,0 +1,71 @@
+import asyncio
+import time
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from request_profiler import AWAIT_FRAME, RequestProfilingMiddleware, to_collapsed, to_speedscope
+
+
+def burn_cpu(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class RequestProfilingMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.profiles = []
+        app = FastAPI()
+
+        @app.get("/reports/{report_id}")
+        async def build_report(report_id: str):
+            burn_cpu(0.1)
+            await asyncio.sleep(0.1)
+            return {"id": report_id}
+
+        async def authorize(token):
+            return {"id": "admin-1", "role": "admin"} if token == "admin-token" else None
+
+        async def store(profile):
+            self.profiles.append(profile)
+
+        app.add_middleware(RequestProfilingMiddleware, authorize=authorize, store=store, interval=0.002)
+        self.client = TestClient(app)
+
+    def test_admin_request_is_profiled(self):
+        response = self.client.get("/reports/r1?__profile=1", headers={"Authorization": "Bearer admin-token"})
+
+        self.assertEqual(response.json(), {"id": "r1"})
+        [profile] = self.profiles
+        self.assertEqual(response.headers["x-profile-id"], profile["id"])
+        self.assertEqual((profile["route"], profile["status"], profile["admin_id"]),
+                         ("/reports/{report_id}", 200, "admin-1"))
+        on_cpu = sum(e["count"] for e in profile["stacks"] if "burn_cpu" in e["stack"])
+        waiting = sum(e["count"] for e in profile["stacks"]
+                      if "build_report" in e["stack"] and e["stack"].endswith(AWAIT_FRAME))
+        self.assertGreater(on_cpu, 3)
+        self.assertGreater(waiting, 3)
+
+        collapsed = to_collapsed(profile["stacks"])
+        self.assertRegex(collapsed.splitlines()[0], r"^\S.* \d+$")
+        speedscope = to_speedscope(profile)
+        [sampled] = speedscope["profiles"]
+        self.assertEqual(len(sampled["samples"]), len(sampled["weights"]))
+        self.assertTrue(any(frame["name"].endswith("build_report") for frame in speedscope["shared"]["frames"]))
+
+    def test_flag_is_ignored_without_an_admin_token(self):
+        for headers in ({"X-Profile": "1"}, {"X-Profile": "1", "Authorization": "Bearer user-token"}):
+            response = self.client.get("/reports/r2", headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("x-profile-id", response.headers)
+        self.client.get("/reports/r3", headers={"Authorization": "Bearer admin-token"})
+        for query in ("__profile=0", "x__profile=1", "q=__profile=1"):
+            response = self.client.get(f"/reports/r4?{query}", headers={"Authorization": "Bearer admin-token"})
+            self.assertNotIn("x-profile-id", response.headers)
+        self.assertEqual(self.profiles, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import time
+import unittest
+
+from response_cache import ResponseCache, etag_matches
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """Memory bound, expiry and conditional-request matching of the response cache"""
+
+    def test_evicts_least_recently_used_past_byte_bound(self):
+        cache = ResponseCache(max_bytes=250, ttl=60)
+        cache.put("a", b"x" * 100)
+        cache.put("b", b"y" * 100)
+        cache.get("a")
+        cache.put("c", b"z" * 100)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 250)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_oversized_and_expired_entries_are_not_served(self):
+        cache = ResponseCache(max_bytes=50, ttl=0.01)
+        cache.put("big", b"x" * 100)
+        cache.put("small", b"x")
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get("big"))
+        self.assertIsNone(cache.get("small"))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_etag_is_stable_and_matches_if_none_match(self):
+        cache = ResponseCache()
+        etag = cache.put("a", b'{"id":1}').etag
+
+        self.assertEqual(cache.put("b", b'{"id":1}').etag, etag)
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import unittest
+import uuid
+
+from mongomock_motor import AsyncMongoMockClient
+
+from booking_events import BookingEventLog
+from dashboard_stats import DashboardStats
+from seat_allocation import SEAT_HOLDING_STATUSES, WAITLISTED, EventFull, SeatAllocator
+
+CAPACITY = 50
+CONCURRENT_BOOKINGS = 3000
+
+
+def make_booking(event_id: str) -> dict:
+    return {"id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "event_id": event_id,
+            "amount": 100.0, "status": "pending"}
+
+
+class SeatAllocatorTest(unittest.TestCase):
+    """Seat counting and waitlist promotion under concurrent bookings"""
+
+    def setUp(self):
+        self.db = AsyncMongoMockClient()[f"seats_{uuid.uuid4().hex}"]
+        self.promoted = []
+
+        async def on_promoted(booking):
+            self.promoted.append(booking["id"])
+
+        self.allocator = SeatAllocator(self.db, on_promoted=on_promoted)
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    async def create_event(self, **fields) -> str:
+        event = {"id": str(uuid.uuid4()), "capacity": CAPACITY, "seats_available": CAPACITY, **fields}
+        await self.db.events.insert_one(event)
+        return event["id"]
+
+    async def count(self, event_id: str, statuses) -> int:
+        return await self.db.bookings.count_documents({"event_id": event_id, "status": {"$in": list(statuses)}})
+
+    def test_rush_never_oversells(self):
+        async def scenario():
+            event_id = await self.create_event()
+            bookings = await asyncio.gather(*(
+                self.allocator.book(make_booking(event_id)) for _ in range(CONCURRENT_BOOKINGS)
+            ))
+            event = await self.db.events.find_one({"id": event_id})
+            positions = [b["waitlist_position"] for b in bookings if b["status"] == WAITLISTED]
+            return (await self.count(event_id, SEAT_HOLDING_STATUSES), event["seats_available"], positions)
+
+        held, seats_available, positions = self.run_async(scenario())
+        self.assertEqual(held, CAPACITY)
+        self.assertEqual(seats_available, 0)
+        self.assertEqual(sorted(positions), list(range(1, CONCURRENT_BOOKINGS - CAPACITY + 1)))
+
+    def test_releases_promote_waitlist_in_order(self):
+        async def scenario():
+            event_id = await self.create_event()
+            bookings = [await self.allocator.book(make_booking(event_id)) for _ in range(CAPACITY + 5)]
+            waitlisted = [b["id"] for b in bookings if b["status"] == WAITLISTED]
+
+            # Concurrent rejections: each frees a seat and promotes the head of the queue
+            holders = [b for b in bookings if b["status"] != WAITLISTED][:3]
+            for holder in holders:
+                await self.db.bookings.update_one({"id": holder["id"]}, {"$set": {"status": "rejected"}})
+            await asyncio.gather(*(self.allocator.release(event_id) for _ in holders))
+
+            event = await self.db.events.find_one({"id": event_id})
+            return waitlisted, await self.count(event_id, SEAT_HOLDING_STATUSES), event["seats_available"]
+
+        waitlisted, held, seats_available = self.run_async(scenario())
+        self.assertCountEqual(self.promoted, waitlisted[:3])
+        self.assertEqual(held, CAPACITY)
+        self.assertEqual(seats_available, 0)
+
+    def test_failing_hook_does_not_stop_promotions(self):
+        async def flaky_hook(booking):
+            self.promoted.append(booking["id"])
+            raise RuntimeError("email lookup timed out")
+
+        allocator = SeatAllocator(self.db, on_promoted=flaky_hook)
+
+        async def scenario():
+            event_id = await self.create_event(capacity=1, seats_available=0)
+            waitlisted = [await allocator.book(make_booking(event_id)) for _ in range(3)]
+            await self.db.events.update_one({"id": event_id}, {"$inc": {"seats_available": 2}})
+            promoted = await allocator.promote(event_id)
+            return [b["id"] for b in waitlisted], [b["id"] for b in promoted]
+
+        with self.assertLogs("seat_allocation", "ERROR") as logs:
+            waitlisted, promoted = self.run_async(scenario())
+        self.assertEqual(promoted, waitlisted[:2])
+        self.assertEqual(self.promoted, waitlisted[:2])
+        self.assertEqual(len(logs.records), 2)
+
+    def test_full_event_without_waitlist_rejects(self):
+        async def scenario():
+            event_id = await self.create_event()
+            results = await asyncio.gather(*(
+                self.allocator.book(make_booking(event_id), waitlist_enabled=False) for _ in range(200)
+            ), return_exceptions=True)
+            return results, await self.count(event_id, SEAT_HOLDING_STATUSES)
+
+        results, held = self.run_async(scenario())
+        self.assertEqual(sum(isinstance(r, EventFull) for r in results), 200 - CAPACITY)
+        self.assertEqual(held, CAPACITY)
+
+    def test_bulk_acquire_takes_what_is_left(self):
+        async def scenario():
+            event_id = await self.create_event()
+            granted = await asyncio.gather(*(self.allocator.acquire_many(event_id, 7) for _ in range(10)))
+            event_doc = await self.db.events.find_one({"id": event_id})
+            return granted, event_doc["seats_available"]
+
+        granted, left = self.run_async(scenario())
+        self.assertEqual(sum(granted), CAPACITY)
+        self.assertEqual(left, 0)
+        self.assertTrue(all(0 <= seats <= 7 for seats in granted))
+
+    def test_legacy_event_counter_is_derived_from_bookings(self):
+        async def scenario():
+            event_id = str(uuid.uuid4())
+            await self.db.events.insert_one({"id": event_id, "capacity": 3})
+            await self.db.bookings.insert_many([make_booking(event_id), make_booking(event_id)])
+            return [(await self.allocator.book(make_booking(event_id)))["status"] for _ in range(2)]
+
+        self.assertEqual(self.run_async(scenario()), ["pending", WAITLISTED])
+
+    def test_self_promotion_is_recorded_as_a_new_booking(self):
+        # Wired like server.create_booking: promotions are counted and logged by the hook,
+        # new bookings by the caller after book() returns
+        stats, log = DashboardStats(self.db), BookingEventLog(self.db)
+
+        async def on_promoted(booking):
+            self.promoted.append(booking["id"])
+            await stats.booking_status_changed(booking["event_id"], booking["amount"], WAITLISTED, booking["status"])
+            await log.status_changed({**booking, "status": WAITLISTED}, booking["status"], None)
+
+        allocator = SeatAllocator(self.db, on_promoted=on_promoted)
+        acquire = allocator.acquire
+
+        async def seat_released_in_the_gap(event_id):
+            # The acquire fails, then a seat comes back before the waitlisted insert
+            allocator.acquire = acquire
+            return False
+
+        async def scenario():
+            event_id = await self.create_event(capacity=1, seats_available=1)
+            allocator.acquire = seat_released_in_the_gap
+            booking = await allocator.book(make_booking(event_id))
+            await stats.booking_created(booking["status"])
+            await log.booking_created(booking, booking["user_id"])
+            counters = await self.db.dashboard_stats.find_one({})
+            return booking, counters, await log.timeline(booking["id"])
+
+        booking, counters, timeline = self.run_async(scenario())
+        self.assertEqual((booking["status"], booking["waitlist_position"]), ("pending", None))
+        self.assertEqual(self.promoted, [])
+        self.assertEqual(counters["status_counts"], {"pending": 1})
+        self.assertEqual(counters["total_bookings"], 1)
+        self.assertEqual([event["type"] for event in timeline], ["created"])
+        self.assertEqual(timeline[0]["to_status"], "pending")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+import uuid
+from unittest import mock
+
+from mongomock_motor import AsyncMongoMockClient
+
+from settings_cache import SettingsCache
+
+
+class SettingsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.db = AsyncMongoMockClient()[f"settings_{uuid.uuid4().hex}"]
+        self.settings = {"smtp_host": "smtp.example.com"}
+        self.clock = 1000.0
+
+    async def load(self) -> dict:
+        return dict(self.settings)
+
+    def make_cache(self, **options) -> SettingsCache:
+        return SettingsCache(self.db, "smtp_settings", self.load, **options)
+
+    def run_async(self, coro):
+        with mock.patch("settings_cache.time.monotonic", lambda: self.clock):
+            return asyncio.run(coro)
+
+    def test_hits_until_ttl_expires(self):
+        cache = self.make_cache(ttl=60, version_check_interval=60)
+
+        async def scenario():
+            first = await cache.get()
+            self.settings["smtp_host"] = "changed.example.com"
+            second = await cache.get()
+            self.clock += 61
+            return first, second, await cache.get()
+
+        first, second, third = self.run_async(scenario())
+        self.assertEqual((first["smtp_host"], second["smtp_host"]), ("smtp.example.com", "smtp.example.com"))
+        self.assertEqual(third["smtp_host"], "changed.example.com")
+        self.assertEqual((cache.stats()["hits"], cache.stats()["loads"]), (1, 2))
+
+    def test_other_workers_reload_when_the_version_stamp_moves(self):
+        writer, reader = self.make_cache(), self.make_cache(ttl=300, version_check_interval=5)
+
+        async def scenario():
+            await reader.get()
+            self.settings["smtp_host"] = "changed.example.com"
+            await writer.invalidate()
+            before_check = await reader.get()
+            self.clock += 5
+            after_check = await reader.get()
+            self.clock += 5
+            unchanged = await reader.get()
+            return before_check, after_check, unchanged
+
+        before_check, after_check, unchanged = self.run_async(scenario())
+        self.assertEqual(before_check["smtp_host"], "smtp.example.com")
+        self.assertEqual(after_check["smtp_host"], "changed.example.com")
+        self.assertEqual(unchanged, after_check)
+        self.assertEqual(reader.stats()["version_checks"], 2)
+        self.assertEqual((reader.stats()["loads"], reader.stats()["version"]), (2, 1))
+
+    def test_invalidate_waits_for_a_load_in_flight(self):
+        release = None
+
+        async def slow_load() -> dict:
+            value = dict(self.settings)
+            await release.wait()
+            return value
+
+        cache = SettingsCache(self.db, "smtp_settings", slow_load)
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            loading = asyncio.create_task(cache.get())
+            await asyncio.sleep(0)
+            self.settings["smtp_host"] = "changed.example.com"
+            invalidating = asyncio.create_task(cache.invalidate())
+            await asyncio.sleep(0)
+            release.set()
+            stale = await loading
+            await invalidating
+            return stale, await cache.get()
+
+        stale, fresh = self.run_async(scenario())
+        self.assertEqual(stale["smtp_host"], "smtp.example.com")
+        self.assertEqual(fresh["smtp_host"], "changed.example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
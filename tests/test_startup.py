@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from firebase_app import FirebaseApp, FirebaseDisabled
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_importing_server_skips_heavy_subsystems(self):
+        probe = ("import json, sys; import server; "
+                 "print(json.dumps([m for m in ('firebase_admin', 'PIL', 'smtplib') if m in sys.modules]))")
+        env = {**os.environ, "MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "startup_test"}
+        output = subprocess.check_output([sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env, text=True)
+        self.assertEqual(json.loads(output.strip().splitlines()[-1]), [])
+
+    def test_disabled_firebase_is_never_initialized(self):
+        firebase = FirebaseApp(enabled=False, credentials_config={"type": "service_account"})
+        with self.assertRaises(FirebaseDisabled):
+            firebase.get()
+        self.assertEqual(firebase.stats(), {"enabled": False, "initialized": False, "last_error": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
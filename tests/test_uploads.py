@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import UploadSizeLimitMiddleware, UploadTooLarge, hash_upload
+
+UPLOAD_SIZE = 16 * 1024 * 1024
+
+
+def make_upload(size: int) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    block = os.urandom(1024 * 1024)
+    for _ in range(size // len(block)):
+        spooled.write(block)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename="proof.png")
+
+
+class HashUploadTest(unittest.TestCase):
+    """Tests for hashing the multipart parser's spooled file in place"""
+
+    def test_peak_memory_is_bounded_by_chunk_size(self):
+        upload = make_upload(UPLOAD_SIZE)
+        expected = hashlib.sha256()
+        while True:
+            block = upload.file.read(1024 * 1024)
+            if not block:
+                break
+            expected.update(block)
+        upload.file.seek(123)
+
+        tracemalloc.start()
+        try:
+            digest = asyncio.run(hash_upload(upload, max_bytes=UPLOAD_SIZE))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual((digest.size, digest.sha256), (UPLOAD_SIZE, expected.hexdigest()))
+        # The file is rewound for the image pipeline
+        self.assertEqual(upload.file.tell(), 0)
+        # A full in-memory read would peak above the upload size
+        self.assertLess(peak, UPLOAD_SIZE // 8)
+
+    def test_rejects_uploads_over_the_limit(self):
+        with self.assertRaises(UploadTooLarge):
+            asyncio.run(hash_upload(make_upload(4 * 1024 * 1024), max_bytes=1024 * 1024))
+
+
+class UploadSizeLimitMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.handled = []
+        app = FastAPI()
+
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            self.handled.append(file.filename)
+            return {"size": len(await file.read())}
+
+        app.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=64 * 1024)
+        self.client = TestClient(app)
+
+    def test_small_uploads_pass_through(self):
+        response = self.client.post("/upload", files={"file": ("a.png", b"x" * 1000, "image/png")})
+        self.assertEqual(response.json(), {"size": 1000})
+
+    def test_large_content_length_is_refused_before_parsing(self):
+        response = self.client.post("/upload", files={"file": ("a.png", b"x" * 100_000, "image/png")})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.handled, [])
+
+    def test_bodies_without_content_length_are_cut_off(self):
+        boundary = "limit"
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n"
+                f"Content-Type: image/png\r\n\r\n").encode() + b"x" * 200_000 + f"\r\n--{boundary}--\r\n".encode()
+
+        def chunks():
+            for start in range(0, len(body), 16 * 1024):
+                yield body[start:start + 16 * 1024]
+
+        response = self.client.post("/upload", content=chunks(),
+                                    headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.handled, [])
+
+
+if __name__ == "__main__":
+    unittest.main()